@@ -12,6 +12,7 @@ class ChEMBLCoreDBConfig(AppConfig):
 
     def ready(self):
         from chembl_core_db.db.models.lookups import OracleIContains
+        from chembl_core_db.db.models.lookups import TrigramIContains
 
 default_app_config = 'chembl_core_db.ChEMBLCoreDBConfig'
 
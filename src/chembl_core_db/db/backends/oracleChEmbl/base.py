@@ -23,6 +23,8 @@ from django.utils.duration import duration_string
 from django.utils.encoding import force_bytes, force_text
 from django.utils.functional import cached_property
 
+from chembl_core_db.db.backends.pool import PooledDatabaseWrapperMixin
+
 
 def _setup_environment(environ):
     # Cygwin requires some special voodoo to set the environment variables
@@ -64,10 +66,31 @@ from .introspection import DatabaseIntrospection            # isort:skip
 from .operations import DatabaseOperations                  # isort:skip
 from django.db.backends.oracle.schema import DatabaseSchemaEditor                    # isort:skip
 from .utils import Oracle_datetime, convert_unicode         # isort:skip
+from .sessionpool import SESSION_TAG                        # isort:skip
+from .sessionpool import SessionPool                        # isort:skip
+from .sessionpool import get_session_pool                   # isort:skip
 
 DatabaseError = Database.DatabaseError
 IntegrityError = Database.IntegrityError
 
+# Cursor tuning, overridden per database by the same keys in the OPTIONS of its DATABASES entry.
+CURSOR_DEFAULTS = {
+    # rows fetched per round trip
+    'arraysize': 100,
+    # rows fetched along with the execute call (cx_Oracle 8 and up), None keeps the driver default
+    'prefetchrows': None,
+    # CLOB and BLOB values are fetched with the rows as str and bytes, through a buffer of this size per value
+    # (grown by the driver for larger values), instead of one LOB locator read per row, 0 fetches the locators
+    'lob_inline_size': 64 * 1024,
+}
+
+# Types of the LOB columns and the long types they are fetched inline as.
+INLINE_LOB_TYPES = {
+    Database.CLOB: Database.LONG_STRING,
+    Database.NCLOB: Database.LONG_STRING,
+    Database.BLOB: Database.LONG_BINARY,
+}
+
 
 class _UninitializedOperatorsDescriptor(object):
 
@@ -82,7 +105,7 @@ class _UninitializedOperatorsDescriptor(object):
         return instance.__dict__['operators']
 
 
-class DatabaseWrapper(BaseDatabaseWrapper):
+class DatabaseWrapper(PooledDatabaseWrapperMixin, BaseDatabaseWrapper):
     vendor = 'oracle'
     # This dictionary maps Field objects to their associated Oracle column
     # types, as strings. Column-type strings can contain format strings; they'll
@@ -190,31 +213,75 @@ class DatabaseWrapper(BaseDatabaseWrapper):
         super(DatabaseWrapper, self).__init__(*args, **kwargs)
         use_returning_into = self.settings_dict["OPTIONS"].get('use_returning_into', True)
         self.features.can_return_id_from_insert = use_returning_into
+        self.cursor_options = {key: self.settings_dict["OPTIONS"].get(key, default)
+                               for key, default in CURSOR_DEFAULTS.items()}
 
-    def _connect_string(self):
+    def _dsn(self):
         settings_dict = self.settings_dict
         if not settings_dict['HOST'].strip():
             settings_dict['HOST'] = 'localhost'
         if settings_dict['PORT'].strip():
-            dsn = Database.makedsn(settings_dict['HOST'],
-                                   int(settings_dict['PORT']),
-                                   settings_dict['NAME'])
-        else:
-            dsn = settings_dict['NAME']
-        return "%s/%s@%s" % (settings_dict['USER'],
-                             settings_dict['PASSWORD'], dsn)
+            return Database.makedsn(settings_dict['HOST'],
+                                    int(settings_dict['PORT']),
+                                    settings_dict['NAME'])
+        return settings_dict['NAME']
+
+    def _connect_string(self):
+        return "%s/%s@%s" % (self.settings_dict['USER'],
+                             self.settings_dict['PASSWORD'], self._dsn())
+
+    @property
+    def session_pool(self):
+        """
+        The cx_Oracle session pool of this alias when its settings have a ``SESSION_POOL`` entry (see
+        ``sessionpool.SESSION_POOL_DEFAULTS``), it then replaces the ``POOL`` connection pool.
+        """
+        options = self.settings_dict.get('SESSION_POOL')
+        if options is None:
+            return None
+        key = tuple(self.settings_dict.get(name) for name in ('NAME', 'USER', 'HOST', 'PORT'))
+        return get_session_pool(self.alias, key, lambda: SessionPool(
+            self.alias, options, self.settings_dict['USER'], self.settings_dict['PASSWORD'], self._dsn(),
+            self.get_connection_params()))
 
     def get_connection_params(self):
         conn_params = self.settings_dict['OPTIONS'].copy()
         if 'use_returning_into' in conn_params:
             del conn_params['use_returning_into']
+        for key in CURSOR_DEFAULTS:
+            conn_params.pop(key, None)
         return conn_params
 
     def get_new_connection(self, conn_params):
+        session_pool = self.session_pool
+        if session_pool is not None:
+            connection, self.connection_reused = session_pool.acquire()
+            return connection
         conn_string = convert_unicode(self._connect_string())
-        return Database.connect(conn_string, **conn_params)
+        return self.pooled_connect(lambda: Database.connect(conn_string, **conn_params))
+
+    def _close(self):
+        if self.connection is not None:
+            session_pool = self.session_pool
+            if session_pool is not None:
+                # same rules as pooled_close
+                reusable = not self.in_atomic_block
+                if reusable and (not self.autocommit or self.errors_occurred):
+                    try:
+                        self.connection.rollback()
+                    except Database.Error:
+                        reusable = False
+                session_pool.release(self.connection, reusable)
+                return
+            if self.pooled_close():
+                return
+        return super(DatabaseWrapper, self)._close()
 
     def init_connection_state(self):
+        if self.connection_reused:
+            # the session settings below survive in a pooled connection
+            self._init_operators()
+            return
         cursor = self.create_cursor()
         # Set the territory first. The territory overrides NLS_DATE_FORMAT
         # and NLS_TIMESTAMP_FORMAT to the territory default. When all of
@@ -230,6 +297,23 @@ class DatabaseWrapper(BaseDatabaseWrapper):
             " NLS_TIMESTAMP_FORMAT = 'YYYY-MM-DD HH24:MI:SS.FF'"
             + (" TIME_ZONE = 'UTC'" if settings.USE_TZ else ''))
         cursor.close()
+        self._init_operators()
+
+        if 'SESSION_POOL' in self.settings_dict:
+            # the pool sizes the statement cache, the tag tells the session is initialised when acquired again
+            self.connection.tag = SESSION_TAG
+        else:
+            try:
+                self.connection.stmtcachesize = 20
+            except AttributeError:
+                # Django docs specify cx_Oracle version 4.3.1 or higher, but
+                # stmtcachesize is available only in 4.3.2 and up.
+                pass
+        # Ensure all changes are preserved even when AUTOCOMMIT is False.
+        if not self.get_autocommit():
+            self.commit()
+
+    def _init_operators(self):
         if 'operators' not in self.__dict__:
             # Ticket #14149: Check whether our LIKE implementation will
             # work for this connection or we need to fall back on LIKEC.
@@ -249,18 +333,8 @@ class DatabaseWrapper(BaseDatabaseWrapper):
                 self.pattern_ops = self._standard_pattern_ops
             cursor.close()
 
-        try:
-            self.connection.stmtcachesize = 20
-        except AttributeError:
-            # Django docs specify cx_Oracle version 4.3.1 or higher, but
-            # stmtcachesize is available only in 4.3.2 and up.
-            pass
-        # Ensure all changes are preserved even when AUTOCOMMIT is False.
-        if not self.get_autocommit():
-            self.commit()
-
     def create_cursor(self, name=None):
-        return FormatStylePlaceholderCursor(self.connection)
+        return FormatStylePlaceholderCursor(self.connection, **self.cursor_options)
 
     def _commit(self):
         if self.connection is not None:
@@ -302,8 +376,11 @@ class DatabaseWrapper(BaseDatabaseWrapper):
         self.cursor().execute('SET CONSTRAINTS ALL DEFERRED')
 
     def is_usable(self):
+        return self.ping_connection(self.connection)
+
+    def ping_connection(self, connection):
         try:
-            self.connection.ping()
+            connection.ping()
         except Database.Error:
             return False
         else:
@@ -414,12 +491,27 @@ class FormatStylePlaceholderCursor(object):
     """
     charset = 'utf-8'
 
-    def __init__(self, connection):
+    def __init__(self, connection, arraysize=100, prefetchrows=None, lob_inline_size=0):
         self.cursor = connection.cursor()
         # Necessary to retrieve decimal values without rounding error.
         self.cursor.numbersAsStrings = True
         # Default arraysize of 1 is highly sub-optimal.
-        self.cursor.arraysize = 100
+        self.cursor.arraysize = arraysize
+        if prefetchrows is not None:
+            try:
+                self.cursor.prefetchrows = prefetchrows
+            except AttributeError:
+                # prefetchrows is available only in cx_Oracle 8 and up
+                pass
+        self.lob_inline_size = lob_inline_size
+        if lob_inline_size:
+            self.cursor.outputtypehandler = self._inline_lobs
+
+    def _inline_lobs(self, cursor, name, default_type, size, precision, scale):
+        # molfiles, abstracts... come with the rows instead of costing a round trip each
+        long_type = INLINE_LOB_TYPES.get(default_type)
+        if long_type is not None:
+            return cursor.var(long_type, self.lob_inline_size, cursor.arraysize)
 
     def _format_params(self, params):
         try:
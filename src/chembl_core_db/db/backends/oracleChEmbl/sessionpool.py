@@ -0,0 +1,157 @@
+__author__ = 'mnowotka'
+
+import os
+import time
+import logging
+import threading
+import cx_Oracle as Database
+
+log = logging.getLogger(__name__)
+
+# Session pool settings, read from the ``SESSION_POOL`` entry of a ``DATABASES`` alias.
+SESSION_POOL_DEFAULTS = {
+    # sessions opened when the pool is created and kept open
+    'MIN': 1,
+    # maximum number of sessions a process keeps open to the database
+    'MAX': 4,
+    # sessions opened at once when all the open ones are busy
+    'INCREMENT': 1,
+    # statements cached per session
+    'STMT_CACHE_SIZE': 20,
+    # seconds a session stays idle before it is pinged when acquired (cx_Oracle 8.2 and up), negative to never ping
+    'PING_INTERVAL': 60,
+    # seconds an idle session above MIN stays open, 0 for ever
+    'IDLE_TIMEOUT': 300,
+    # seconds an acquire waits for a session when MAX are busy, 0 waits for ever
+    'WAIT_TIMEOUT': 10,
+    # seconds between two utilization reports in the log, 0 to disable them
+    'REPORT_INTERVAL': 300,
+}
+
+# Tag of the sessions whose NLS settings have been initialised, they keep it when released to the pool.
+SESSION_TAG = 'chembl_ws'
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+
+class SessionPool(object):
+    """
+    Process wide cx_Oracle session pool of one database alias, shared by the per thread Django connection wrappers.
+    Logons happen once per session instead of once per request, the driver pings idle sessions before handing them
+    out and closes the ones idle for ``IDLE_TIMEOUT`` above ``MIN``.
+    """
+
+    def __init__(self, alias, options, user, password, dsn, conn_params):
+        self.alias = alias
+        self.options = dict(SESSION_POOL_DEFAULTS, **(options or {}))
+        self.pid = os.getpid()
+        kwargs = dict(conn_params, threaded=True)
+        if self.options['WAIT_TIMEOUT']:
+            kwargs.update(getmode=Database.SPOOL_ATTRVAL_TIMEDWAIT,
+                          waitTimeout=int(self.options['WAIT_TIMEOUT'] * 1000))
+        else:
+            kwargs['getmode'] = Database.SPOOL_ATTRVAL_WAIT
+        self.pool = Database.SessionPool(user, password, dsn, min=self.options['MIN'], max=self.options['MAX'],
+                                         increment=self.options['INCREMENT'], **kwargs)
+        self._set('stmtcachesize', self.options['STMT_CACHE_SIZE'])
+        self._set('timeout', int(self.options['IDLE_TIMEOUT']))
+        self._set('ping_interval', int(self.options['PING_INTERVAL']))
+        self.lock = threading.Lock()
+        self.counters = {'acquired': 0, 'reused': 0, 'released': 0, 'dropped': 0, 'errors': 0, 'max_busy': 0}
+        self.reported_at = time.time()
+
+    def _set(self, attribute, value):
+        try:
+            setattr(self.pool, attribute, value)
+        except AttributeError:
+            # not available in this version of cx_Oracle
+            pass
+
+    def acquire(self):
+        """
+        Returns a session and whether its NLS settings are already initialised.
+        """
+        try:
+            connection = self.pool.acquire(tag=SESSION_TAG)
+        except Database.Error:
+            with self.lock:
+                self.counters['errors'] += 1
+            raise
+        reused = getattr(connection, 'tag', None) == SESSION_TAG
+        with self.lock:
+            self.counters['acquired'] += 1
+            self.counters['reused'] += int(reused)
+            self._track(time.time())
+        return connection, reused
+
+    def release(self, connection, reusable):
+        """
+        Gives a session back to the pool, or closes it if it is not ``reusable``.
+        """
+        try:
+            if reusable:
+                self.pool.release(connection)
+            else:
+                self.pool.drop(connection)
+        except Database.Error as e:
+            log.debug('Error releasing a session of %s: %r', self.alias, e)
+            reusable = False
+        with self.lock:
+            self.counters['released' if reusable else 'dropped'] += 1
+            self._track(time.time())
+
+    def _track(self, now):
+        self.counters['max_busy'] = max(self.counters['max_busy'], self.pool.busy)
+        interval = self.options['REPORT_INTERVAL']
+        if interval and now - self.reported_at >= interval:
+            self.reported_at = now
+            log.info('Session pool %s: %s', self.alias,
+                     ', '.join('{0}={1}'.format(key, value) for key, value in sorted(self._stats().items())))
+
+    def _stats(self):
+        stats = dict(self.counters)
+        stats.update({
+            'min': self.pool.min,
+            'max': self.pool.max,
+            'opened': self.pool.opened,
+            'busy': self.pool.busy,
+        })
+        stats['utilization'] = round(float(stats['busy']) / stats['max'], 3) if stats['max'] else 0.0
+        return stats
+
+    def stats(self):
+        with self.lock:
+            return self._stats()
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+
+_session_pools = {}
+_session_pools_lock = threading.Lock()
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+
+def get_session_pool(alias, key, create):
+    """
+    The session pool of an alias in this process, made by ``create()`` on first use and again after a fork, the
+    sessions of the parent process can not be shared.
+    """
+    with _session_pools_lock:
+        pool = _session_pools.get((alias, key))
+        if pool is None or pool.pid != os.getpid():
+            pool = _session_pools[(alias, key)] = create()
+        return pool
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+
+def session_pool_stats():
+    """
+    Utilization of the session pools of this process, by database alias.
+    """
+    with _session_pools_lock:
+        pools = [pool for pool in _session_pools.values() if pool.pid == os.getpid()]
+    return {pool.alias: pool.stats() for pool in pools}
+
+# ----------------------------------------------------------------------------------------------------------------------
@@ -0,0 +1,289 @@
+__author__ = 'mnowotka'
+
+import os
+import time
+import logging
+import threading
+
+log = logging.getLogger(__name__)
+
+# Pool settings, read from the ``POOL`` entry of a ``DATABASES`` alias.
+POOL_DEFAULTS = {
+    # maximum number of connections (in use and idle) a process keeps open to the database
+    'SIZE': 4,
+    # idle connections kept open regardless of IDLE_TIMEOUT
+    'MIN_SIZE': 1,
+    # seconds after which a connection is closed instead of being reused, 0 for no limit
+    'MAX_LIFETIME': 1800,
+    # seconds an idle connection above MIN_SIZE stays open
+    'IDLE_TIMEOUT': 300,
+    # a connection idle for more than PRE_PING seconds is pinged before being handed out, 0 pings every checkout
+    'PRE_PING': 30,
+    # seconds a checkout waits for a connection when SIZE connections are in use
+    'TIMEOUT': 10,
+    # seconds between two utilization reports in the log, 0 to disable them
+    'REPORT_INTERVAL': 300,
+}
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+
+class PoolExhausted(Exception):
+    pass
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+
+class _Entry(object):
+
+    __slots__ = ('connection', 'created_at', 'released_at')
+
+    def __init__(self, connection):
+        self.connection = connection
+        self.created_at = self.released_at = time.time()
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+
+class ConnectionPool(object):
+    """
+    Process wide pool of raw DB-API connections to one database alias, shared by the per thread Django connection
+    wrappers. Connections over ``MAX_LIFETIME`` are replaced, idle ones are reaped after ``IDLE_TIMEOUT`` (on the next
+    checkout or release, the pool has no thread of its own) and the ones idle for a while are pinged before reuse.
+    """
+
+    def __init__(self, alias, options=None):
+        self.alias = alias
+        self.options = dict(POOL_DEFAULTS, **(options or {}))
+        self.condition = threading.Condition()
+        self.pid = os.getpid()
+        self.idle = []
+        self.in_use = {}
+        # connections being opened outside of the lock
+        self.connecting = 0
+        self.counters = {'created': 0, 'reused': 0, 'closed': 0, 'failed_pings': 0, 'waits': 0, 'timeouts': 0,
+                         'max_in_use': 0}
+        self.reported_at = time.time()
+
+    def _after_fork(self):
+        # the sockets belong to the parent process, drop them without closing
+        if self.pid != os.getpid():
+            self.pid = os.getpid()
+            self.idle = []
+            self.in_use = {}
+            self.connecting = 0
+
+    def _expired(self, entry, now):
+        max_lifetime = self.options['MAX_LIFETIME']
+        return bool(max_lifetime) and now - entry.created_at > max_lifetime
+
+    def _discard(self, entry, close):
+        self.counters['closed'] += 1
+        try:
+            close(entry.connection)
+        except Exception as e:
+            log.debug('Error closing a pooled connection to %s: %r', self.alias, e)
+
+    def _reap(self, now, close):
+        # the most recently used connections are at the end of the idle list and are the ones kept for MIN_SIZE
+        keep = []
+        for entry in reversed(self.idle):
+            idle_for = now - entry.released_at
+            if self._expired(entry, now) or \
+                    (len(keep) >= self.options['MIN_SIZE'] and idle_for > self.options['IDLE_TIMEOUT']):
+                self._discard(entry, close)
+            else:
+                keep.append(entry)
+        self.idle = keep[::-1]
+
+    def checkout(self, connect, ping, close):
+        """
+        Returns an open connection, reused when possible, and whether it was reused.
+        ``connect()`` opens a new connection, ``ping(connection)`` tells if a connection still works and
+        ``close(connection)`` closes it. Raises ``PoolExhausted`` after waiting ``TIMEOUT`` seconds for a connection.
+        """
+        deadline = time.time() + self.options['TIMEOUT']
+        with self.condition:
+            self._after_fork()
+            while True:
+                now = time.time()
+                self._reap(now, close)
+                if self.idle:
+                    # most recently used first, the least used ones age out
+                    entry = self.idle.pop()
+                    break
+                if len(self.in_use) + self.connecting < self.options['SIZE']:
+                    entry = None
+                    self.connecting += 1
+                    break
+                remaining = deadline - now
+                if remaining <= 0:
+                    self.counters['timeouts'] += 1
+                    raise PoolExhausted('all {0} connections to {1} are in use'.format(self.options['SIZE'],
+                                                                                    self.alias))
+                self.counters['waits'] += 1
+                self.condition.wait(remaining)
+            if entry is not None:
+                self.in_use[id(entry.connection)] = entry
+        if entry is not None:
+            pre_ping = self.options['PRE_PING']
+            if now - entry.released_at >= pre_ping and not ping(entry.connection):
+                self.counters['failed_pings'] += 1
+                with self.condition:
+                    del self.in_use[id(entry.connection)]
+                    self._discard(entry, close)
+                    self.condition.notify()
+                return self.checkout(connect, ping, close)
+            with self.condition:
+                self.counters['reused'] += 1
+                self._track(now)
+            return entry.connection, True
+        try:
+            connection = connect()
+        except Exception:
+            with self.condition:
+                self.connecting -= 1
+                self.condition.notify()
+            raise
+        with self.condition:
+            self.connecting -= 1
+            self.in_use[id(connection)] = _Entry(connection)
+            self.counters['created'] += 1
+            self._track(time.time())
+        return connection, False
+
+    def release(self, connection, reusable, close):
+        """
+        Gives a connection back to the pool, it is closed if it is not ``reusable``, too old or not from this pool.
+        """
+        with self.condition:
+            self._after_fork()
+            entry = self.in_use.pop(id(connection), None)
+            now = time.time()
+            if entry is None:
+                self._discard(_Entry(connection), close)
+            elif not reusable or self._expired(entry, now):
+                self._discard(entry, close)
+            else:
+                entry.released_at = now
+                self.idle.append(entry)
+            self._reap(now, close)
+            self.condition.notify()
+            self._track(now)
+
+    def _track(self, now):
+        in_use = len(self.in_use)
+        self.counters['max_in_use'] = max(self.counters['max_in_use'], in_use)
+        interval = self.options['REPORT_INTERVAL']
+        if interval and now - self.reported_at >= interval:
+            self.reported_at = now
+            log.info('Connection pool %s: %s', self.alias,
+                     ', '.join('{0}={1}'.format(key, value) for key, value in sorted(self._stats().items())))
+
+    def _stats(self):
+        stats = dict(self.counters)
+        stats.update({
+            'size': self.options['SIZE'],
+            'in_use': len(self.in_use),
+            'connecting': self.connecting,
+            'idle': len(self.idle),
+        })
+        stats['utilization'] = round(float(stats['in_use']) / stats['size'], 3) if stats['size'] else 0.0
+        return stats
+
+    def stats(self):
+        with self.condition:
+            return self._stats()
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+
+def get_pool(alias, options=None, key=None):
+    with _pools_lock:
+        if (alias, key) not in _pools:
+            _pools[(alias, key)] = ConnectionPool(alias, options)
+        return _pools[(alias, key)]
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+
+def pool_stats():
+    """
+    Utilization of the connection pools of this process, by database alias.
+    """
+    with _pools_lock:
+        pools = list(_pools.values())
+    return {pool.alias: pool.stats() for pool in pools}
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+
+class PooledDatabaseWrapperMixin(object):
+    """
+    Lets a Django ``DatabaseWrapper`` take its connections from a ``ConnectionPool`` and give them back when Django
+    closes them (at the end of every request with ``CONN_MAX_AGE = 0``) instead of disconnecting.
+    Pooling is enabled by a ``POOL`` dictionary (see ``POOL_DEFAULTS``) in the settings of the alias.
+    Backends call ``pooled_connect`` and ``pooled_close`` from ``get_new_connection`` and ``_close`` and implement
+    ``ping_connection(connection)``.
+    """
+
+    connection_reused = False
+
+    @property
+    def connection_pool(self):
+        options = self.settings_dict.get('POOL')
+        if options is None:
+            return None
+        # the test runner points the alias to another database
+        key = tuple(self.settings_dict.get(name) for name in ('NAME', 'USER', 'HOST', 'PORT'))
+        return get_pool(self.alias, options, key)
+
+    def ping_connection(self, connection):
+        raise NotImplementedError
+
+    def pooled_connect(self, connect):
+        """
+        Returns a connection from the pool, or from ``connect()`` when pooling is disabled.
+        """
+        pool = self.connection_pool
+        if pool is None:
+            self.connection_reused = False
+            return connect()
+        try:
+            connection, self.connection_reused = pool.checkout(connect, self.ping_connection, _close_connection)
+        except PoolExhausted as e:
+            raise self.Database.OperationalError(str(e))
+        return connection
+
+    def pooled_close(self):
+        """
+        Gives the current connection back to the pool, returns ``False`` when pooling is disabled.
+        """
+        pool = self.connection_pool
+        if pool is None:
+            return False
+        connection = self.connection
+        # Django keeps the connection of a block closed inside a transaction, it cannot go to another thread
+        reusable = not self.in_atomic_block
+        if reusable and (not self.autocommit or self.errors_occurred):
+            # leave no transaction open and no broken connection behind
+            try:
+                connection.rollback()
+            except self.Database.Error:
+                reusable = False
+        pool.release(connection, reusable, _close_connection)
+        return True
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+
+def _close_connection(connection):
+    connection.close()
+
+# ----------------------------------------------------------------------------------------------------------------------
@@ -0,0 +1,59 @@
+"""
+PostgreSQL database backend for Django keeping its connections in a process wide pool.
+
+Pooling is configured by the ``POOL`` entry of the database settings, see ``chembl_core_db.db.backends.pool``.
+Server side prepared statements are enabled by the ``PREPARED_STATEMENTS`` entry, see ``prepared``.
+"""
+
+from django.conf import settings
+from django.db.backends.postgresql.base import Database
+from django.db.backends.postgresql.base import DatabaseWrapper as PostgresDatabaseWrapper
+from django.db.backends.postgresql.utils import utc_tzinfo_factory
+
+from chembl_core_db.db.backends.pool import PooledDatabaseWrapperMixin
+from chembl_core_db.db.backends.postgresChEmbl.prepared import PREPARED_STATEMENTS_DEFAULTS
+from chembl_core_db.db.backends.postgresChEmbl.prepared import PreparedStatementsConnection
+from chembl_core_db.db.backends.postgresChEmbl.prepared import PreparingCursor
+
+
+class DatabaseWrapper(PooledDatabaseWrapperMixin, PostgresDatabaseWrapper):
+
+    def __init__(self, *args, **kwargs):
+        super(DatabaseWrapper, self).__init__(*args, **kwargs)
+        options = self.settings_dict.get('PREPARED_STATEMENTS')
+        self.prepared_statements = dict(PREPARED_STATEMENTS_DEFAULTS, **options) if options is not None else None
+
+    def get_connection_params(self):
+        conn_params = super(DatabaseWrapper, self).get_connection_params()
+        # remembers the statements prepared in the session, even while prepared_statements is off
+        conn_params.setdefault('connection_factory', PreparedStatementsConnection)
+        return conn_params
+
+    def get_new_connection(self, conn_params):
+        return self.pooled_connect(lambda: super(DatabaseWrapper, self).get_new_connection(conn_params))
+
+    def create_cursor(self, name=None):
+        if name or not self.prepared_statements or not isinstance(self.connection, PreparedStatementsConnection):
+            return super(DatabaseWrapper, self).create_cursor(name)
+        cursor = self.connection.cursor(cursor_factory=PreparingCursor)
+        cursor.tzinfo_factory = utc_tzinfo_factory if settings.USE_TZ else None
+        cursor.prepare_options = self.prepared_statements
+        return cursor
+
+    def _close(self):
+        if self.connection is not None and self.pooled_close():
+            return
+        return super(DatabaseWrapper, self)._close()
+
+    def ping_connection(self, connection):
+        if connection.closed:
+            return False
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT 1')
+        except Database.Error:
+            return False
+        return True
+
+    def is_usable(self):
+        return self.ping_connection(self.connection)
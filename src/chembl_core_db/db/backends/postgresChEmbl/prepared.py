@@ -0,0 +1,156 @@
+"""
+Server side prepared statements for the SELECT statements a connection runs most often.
+
+The ORM sends every query as text, PostgreSQL parses and plans it each time. Once a statement (its SQL text, the
+parameters apart) has been run ``THRESHOLD`` times on a connection it is prepared in the session of the connection and
+run with ``EXECUTE``, the least recently used ones are deallocated above ``SIZE``. Connections kept by the pool keep
+their prepared statements across requests.
+"""
+
+import re
+from collections import OrderedDict
+
+from django.db.backends.postgresql.base import Database
+
+# Prepared statements settings, read from the ``PREPARED_STATEMENTS`` entry of a ``DATABASES`` alias.
+PREPARED_STATEMENTS_DEFAULTS = {
+    # statements kept prepared per connection
+    'SIZE': 100,
+    # executions of a statement on a connection before it is prepared
+    'THRESHOLD': 3,
+}
+
+# Prefix added by ``chembl_webservices.core.timeouts.statement_timeout``, kept in front of the prepared statement.
+SET_LOCAL_PREFIX = re.compile(r'^(SET LOCAL statement_timeout = \d+; )(.*)$', re.DOTALL)
+
+PLACEHOLDER = re.compile(r'%([%s])')
+
+# SQLSTATE of an EXECUTE whose statement is not prepared in the session, and class of the errors (syntax, undetermined
+# parameter types...) a statement failing to prepare may also fail with when run as is.
+INVALID_SQL_STATEMENT_NAME = '26000'
+SYNTAX_ERROR_CLASS = '42'
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+
+def positional_sql(sql):
+    """
+    Turns the ``%s`` placeholders of a query into ``$1``, ``$2``... Returns the query and its number of parameters.
+    ``%%`` is left as is, the statement still goes through the parameter interpolation of psycopg2.
+    """
+    count = [0]
+
+    def replace(match):
+        if match.group(1) == '%':
+            return '%%'
+        count[0] += 1
+        return '${0}'.format(count[0])
+
+    return PLACEHOLDER.sub(replace, sql), count[0]
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+
+class PreparedStatementsConnection(Database.extensions.connection):
+    """
+    psycopg2 connection remembering the statements prepared in its session.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super(PreparedStatementsConnection, self).__init__(*args, **kwargs)
+        # SQL text -> statement name, None for the statements that can not be prepared
+        self.prepared = OrderedDict()
+        # SQL text -> executions, for the statements not prepared yet
+        self.executions = OrderedDict()
+        self.prepared_count = 0
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+
+class PreparingCursor(Database.extensions.cursor):
+    """
+    Cursor running the frequent SELECT statements of its connection as prepared statements, see the module docstring.
+    Only in autocommit mode: a failed PREPARE then leaves no aborted transaction behind and the statement is run as is.
+    """
+
+    prepare_options = None
+
+    def execute(self, sql, params=None):
+        connection = self.connection
+        if not self.prepare_options or params is None or isinstance(params, dict) or not connection.autocommit:
+            return super(PreparingCursor, self).execute(sql, params)
+        match = SET_LOCAL_PREFIX.match(sql)
+        prefix, statement = match.groups() if match else ('', sql)
+        if not statement.startswith('SELECT'):
+            return super(PreparingCursor, self).execute(sql, params)
+
+        name = connection.prepared.get(statement, False)
+        if name is None:
+            return super(PreparingCursor, self).execute(sql, params)
+        if name:
+            connection.prepared.move_to_end(statement)
+            try:
+                return super(PreparingCursor, self).execute(prefix + self.execute_sql(name, len(params)), params)
+            except Database.Error as e:
+                if getattr(e, 'pgcode', None) != INVALID_SQL_STATEMENT_NAME:
+                    # cancelled, connection lost... the statement is prepared again if it is run again
+                    del connection.prepared[statement]
+                    self.deallocate(name)
+                    raise
+                # the session lost its prepared statements (DISCARD ALL...)
+                connection.prepared.clear()
+                return super(PreparingCursor, self).execute(sql, params)
+
+        executions = connection.executions.pop(statement, 0) + 1
+        if executions < self.prepare_options['THRESHOLD']:
+            connection.executions[statement] = executions
+            while len(connection.executions) > 4 * self.prepare_options['SIZE']:
+                connection.executions.popitem(last=False)
+            return super(PreparingCursor, self).execute(sql, params)
+
+        text, count = positional_sql(statement)
+        if count != len(params):
+            connection.prepared[statement] = None
+            return super(PreparingCursor, self).execute(sql, params)
+        connection.prepared_count += 1
+        name = 'chembl_ws_{0}'.format(connection.prepared_count)
+        # the least recently used statements are deallocated in the same round trip
+        deallocate = ''
+        while len(connection.prepared) >= self.prepare_options['SIZE']:
+            evicted = connection.prepared.popitem(last=False)[1]
+            if evicted:
+                deallocate += 'DEALLOCATE {0}; '.format(evicted)
+        try:
+            result = super(PreparingCursor, self).execute(
+                '{0}{1}PREPARE {2} AS {3}; {4}'.format(prefix, deallocate, name, text, self.execute_sql(name, count)),
+                params)
+        except Database.Error as e:
+            # PREPARE is not undone with the failed statements following it
+            self.deallocate(name)
+            if not (getattr(e, 'pgcode', None) or '').startswith(SYNTAX_ERROR_CLASS):
+                # cancelled, connection lost... running it again would not help
+                raise
+            # e.g. a parameter whose type can not be inferred, the statement is not prepared again
+            connection.prepared[statement] = None
+            return super(PreparingCursor, self).execute(sql, params)
+        connection.prepared[statement] = name
+        return result
+
+    def deallocate(self, name):
+        """
+        Drops a statement from the session, if it is prepared there, after a failed execution.
+        """
+        try:
+            with self.connection.cursor() as cursor:
+                cursor.execute('DEALLOCATE {0}'.format(name))
+        except Database.Error:
+            # not prepared, or the connection is lost and the statement with it
+            pass
+
+    @staticmethod
+    def execute_sql(name, count):
+        if not count:
+            return 'EXECUTE {0}'.format(name)
+        return 'EXECUTE {0}({1})'.format(name, ', '.join(['%s'] * count))
+
+# ----------------------------------------------------------------------------------------------------------------------
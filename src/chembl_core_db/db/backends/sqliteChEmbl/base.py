@@ -0,0 +1,93 @@
+"""
+SQLite database backend for Django serving the SQLite file of a ChEMBL release, for single node mirrors.
+
+The file is opened read only through an ``immutable`` URI: SQLite takes no locks and reads no journal or WAL file, the
+file must not change while it is served. It is memory mapped and every connection keeps a page cache, the connections
+are kept across requests by the pool (``POOL`` entry of the database settings, see ``chembl_core_db.db.backends.pool``).
+Tuned by the ``SQLITE`` entry of the database settings, see ``SQLITE_DEFAULTS``.
+"""
+
+import os
+from urllib.parse import quote
+
+from django.db.backends.sqlite3.base import Database
+from django.db.backends.sqlite3.base import DatabaseWrapper as SQLiteDatabaseWrapper
+
+from chembl_core_db.db.backends.pool import PooledDatabaseWrapperMixin
+from chembl_core_db.db.backends.sqliteChEmbl.functions import STRUCTURE_FUNCTIONS
+from chembl_core_db.db.backends.sqliteChEmbl.functions import register_functions
+
+# SQLite settings, read from the ``SQLITE`` entry of a ``DATABASES`` alias.
+SQLITE_DEFAULTS = {
+    # open the file read only, statements writing to it fail
+    'READ_ONLY': True,
+    # declare the file immutable: no locking, no journal or WAL, no detection of changes made by other processes
+    'IMMUTABLE': True,
+    # bytes of the file read through a memory mapping instead of read calls, 0 disables it
+    'MMAP_SIZE': 1 << 30,
+    # page cache of a connection, in pages or, if negative, in KiB
+    'CACHE_SIZE': -64 * 1024,
+    # serve the structure searches with RDKit, parsing every molfile of the release for each search
+    'STRUCTURE_SEARCH': False,
+}
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+
+def database_uri(name, options):
+    """
+    The URI opening the database file ``name`` according to ``options``. URIs and in memory databases are left as is.
+    """
+    if name == ':memory:' or name.startswith('file:'):
+        return name
+    parameters = []
+    if options['READ_ONLY']:
+        parameters.append('mode=ro')
+    if options['IMMUTABLE']:
+        parameters.append('immutable=1')
+    uri = 'file:' + quote(os.path.abspath(name))
+    return uri + '?' + '&'.join(parameters) if parameters else uri
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+
+class DatabaseWrapper(PooledDatabaseWrapperMixin, SQLiteDatabaseWrapper):
+
+    def __init__(self, *args, **kwargs):
+        super(DatabaseWrapper, self).__init__(*args, **kwargs)
+        self.sqlite_options = dict(SQLITE_DEFAULTS, **(self.settings_dict.get('SQLITE') or {}))
+        # the RDKit functions of the structure searches are registered, see ``CompoundMolsMixin``
+        self.structure_functions = STRUCTURE_FUNCTIONS and bool(self.sqlite_options['STRUCTURE_SEARCH'])
+
+    def get_connection_params(self):
+        conn_params = super(DatabaseWrapper, self).get_connection_params()
+        conn_params['database'] = database_uri(conn_params['database'], self.sqlite_options)
+        return conn_params
+
+    def get_new_connection(self, conn_params):
+        return self.pooled_connect(lambda: self.open_connection(conn_params))
+
+    def open_connection(self, conn_params):
+        connection = super(DatabaseWrapper, self).get_new_connection(conn_params)
+        connection.execute('PRAGMA mmap_size = {0:d}'.format(int(self.sqlite_options['MMAP_SIZE'])))
+        connection.execute('PRAGMA cache_size = {0:d}'.format(int(self.sqlite_options['CACHE_SIZE'])))
+        connection.execute('PRAGMA temp_store = MEMORY')
+        if self.sqlite_options['READ_ONLY']:
+            connection.execute('PRAGMA query_only = ON')
+        register_functions(connection, self.structure_functions)
+        return connection
+
+    def _close(self):
+        if self.connection is not None and self.pooled_close():
+            return
+        return super(DatabaseWrapper, self)._close()
+
+    def ping_connection(self, connection):
+        try:
+            connection.execute('SELECT 1')
+        except Database.Error:
+            return False
+        return True
+
+    def is_usable(self):
+        return self.ping_connection(self.connection)
@@ -0,0 +1,159 @@
+"""
+SQL functions registered on the SQLite connections, standing in for what PostgreSQL and Oracle do in the database.
+
+``regexp`` accepts the POSIX bracket classes and word boundaries of the PostgreSQL regular expressions the API clients
+send. The structure searches of ``CompoundMolsMixin`` call the ``chembl_*`` functions below, computed with RDKit from
+the molfiles of ``compound_structures`` row by row (there is no chemical index): they are only registered when RDKit
+is installed and the ``STRUCTURE_SEARCH`` option of the database enables them, every search parses all the molfiles.
+"""
+
+import re
+from functools import lru_cache
+
+try:
+    from rdkit import Chem
+    from rdkit import DataStructs
+    from rdkit import RDLogger
+    from rdkit.Chem import AllChem
+    RDLogger.DisableLog('rdApp.*')
+except ImportError:
+    Chem = None
+
+# True when the functions of the structure searches can be registered.
+STRUCTURE_FUNCTIONS = Chem is not None
+
+# PostgreSQL regular expression escapes and bracket classes without a Python equivalent.
+POSIX_CLASSES = {
+    'alnum': 'a-zA-Z0-9',
+    'alpha': 'a-zA-Z',
+    'blank': ' \\t',
+    'digit': '0-9',
+    'lower': 'a-z',
+    'punct': re.escape('!"#$%&\'()*+,-./:;<=>?@[\\]^_`{|}~'),
+    'space': '\\s',
+    'upper': 'A-Z',
+    'word': '\\w',
+    'xdigit': '0-9A-Fa-f',
+}
+
+POSIX_SYNTAX = re.compile(r'\[:(\w+):\]|\\[yYmM]')
+
+POSIX_ESCAPES = {
+    '\\y': '\\b',
+    '\\Y': '\\B',
+    '\\m': '\\b(?=\\w)',
+    '\\M': '\\b(?<=\\w)',
+}
+
+# Morgan fingerprints compared by ``chembl_similarity``, the defaults of ``morganbv_fp`` in the RDKit cartridge.
+MORGAN_RADIUS = 2
+MORGAN_BITS = 512
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+
+@lru_cache(maxsize=256)
+def compile_regexp(pattern):
+    def replace(match):
+        if match.group(1):
+            return POSIX_CLASSES.get(match.group(1), match.group(0))
+        return POSIX_ESCAPES[match.group(0)]
+
+    return re.compile(POSIX_SYNTAX.sub(replace, pattern))
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+
+def regexp(pattern, value):
+    if value is None or pattern is None:
+        return False
+    return bool(compile_regexp(pattern).search(str(value)))
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+
+def parse_structure(structure):
+    """
+    A molecule from a molfile or a SMILES, ``None`` if RDKit can not read it.
+    """
+    if not structure:
+        return None
+    if 'M  END' in structure:
+        return Chem.MolFromMolBlock(structure)
+    return Chem.MolFromSmiles(structure)
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+
+@lru_cache(maxsize=64)
+def query_structure(structure):
+    mol = parse_structure(structure)
+    if mol is None:
+        raise ValueError('Invalid structure: {0}'.format(structure))
+    return mol
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+
+@lru_cache(maxsize=64)
+def substructure_query(structure):
+    # the ``mol_adjust_query_properties`` of the RDKit cartridge
+    return Chem.AdjustQueryProperties(query_structure(structure))
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+
+@lru_cache(maxsize=64)
+def query_smiles(structure):
+    return Chem.MolToSmiles(query_structure(structure))
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+
+def fingerprint(mol):
+    return AllChem.GetMorganFingerprintAsBitVect(mol, MORGAN_RADIUS, nBits=MORGAN_BITS)
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+
+@lru_cache(maxsize=64)
+def query_fingerprint(structure):
+    return fingerprint(query_structure(structure))
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+
+def has_substructure(ctab, structure):
+    mol = parse_structure(ctab)
+    return int(mol is not None and mol.HasSubstructMatch(substructure_query(structure)))
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+
+def same_structure(ctab, structure):
+    mol = parse_structure(ctab)
+    return int(mol is not None and Chem.MolToSmiles(mol) == query_smiles(structure))
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+
+def similarity(ctab, structure):
+    mol = parse_structure(ctab)
+    if mol is None:
+        return None
+    return DataStructs.TanimotoSimilarity(fingerprint(mol), query_fingerprint(structure))
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+
+def register_functions(connection, structure_search=False):
+    """
+    Registers the functions on a ``sqlite3`` connection, the ones of the structure searches if ``structure_search``.
+    """
+    connection.create_function('regexp', 2, regexp)
+    if structure_search and STRUCTURE_FUNCTIONS:
+        connection.create_function('chembl_has_substructure', 2, has_substructure)
+        connection.create_function('chembl_same_structure', 2, same_structure)
+        connection.create_function('chembl_similarity', 2, similarity)
+
+# ----------------------------------------------------------------------------------------------------------------------
@@ -158,6 +158,14 @@ class ChemblIndexedCharField(ChemblCharField):
 # ----------------------------------------------------------------------------------------------------------------------
 
 
+class ChemblTrigramCharField(models.CharField):
+    # a column with a pg_trgm index (see the create_trigram_indexes command), its case insensitive pattern lookups
+    # are written so the index can serve them
+    pass
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+
 class ChemblDateField(models.DateField):
 
     def db_type(self, connection):
@@ -8,6 +8,16 @@ from django.conf import settings
 # ----------------------------------------------------------------------------------------------------------------------
 
 
+def has_structure_functions(connection):
+    """
+    True if the backend registers SQL functions computing the structure searches (SQLite with RDKit, see
+    ``chembl_core_db.db.backends.sqliteChEmbl.functions``).
+    """
+    return getattr(connection, 'structure_functions', False)
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+
 class CompoundMolsMixin(object):
 
     def get_column(self, name):
@@ -51,6 +61,12 @@ class CompoundMolsMixin(object):
                 params=[structure, structure, (sim / 100.0)])
             cursor.execute('set rdkit.tanimoto_threshold=0.5;')
             return ret
+        if has_structure_functions(connection):
+            return self.extra(select={'similarity': "chembl_similarity(" + ctab_column + ", %s)"},
+                select_params=(structure,),
+                where=["chembl_similarity(" + ctab_column + ", %s) BETWEEN %s AND 1.0"],
+                order_by=['-similarity'],
+                params=(structure, sim / 100.0))
         else:
             raise NotImplementedError
 
@@ -61,6 +77,8 @@ class CompoundMolsMixin(object):
             return self.extra(where=["(sss(" + ctab_column + ",%s)=1)"], params=('smiles:' + structure,))
         if connection.vendor == 'postgresql':
             return self.extra(where=[ctab_column + "@>mol_adjust_query_properties(%s)"], params=(structure,))
+        if has_structure_functions(connection):
+            return self.extra(where=["chembl_has_substructure(" + ctab_column + ", %s) = 1"], params=(structure,))
         else:
             raise NotImplementedError
 
@@ -79,6 +97,8 @@ class CompoundMolsMixin(object):
                 return self.extra(where=[ctab_column + "@=%s"], params=(structure,))
             return self.extra(
                 where=[ctab_column + "@>%s" + " AND " + ctab_column + "<@%s"], params=(structure, structure))
+        if has_structure_functions(connection):
+            return self.extra(where=["chembl_same_structure(" + ctab_column + ", %s) = 1"], params=(structure,))
         else:
             raise NotImplementedError
 
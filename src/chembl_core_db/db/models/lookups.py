@@ -1,5 +1,6 @@
-from django.db.models.lookups import IContains, BuiltinLookup
+from django.db.models.lookups import IContains, IEndsWith, IExact, IStartsWith, BuiltinLookup
 from chembl_core_db.db.customFields import ChemblIndexedCharField
+from chembl_core_db.db.customFields import ChemblTrigramCharField
 from django.db.models.expressions import Value
 
 
@@ -45,4 +46,44 @@ class OracleIContains(IContains):
         return 'CONTAINS(%s, %s) > 0' % (lhs, rhs), params
 
 
-ChemblIndexedCharField.register_lookup(OracleIContains)
\ No newline at end of file
+ChemblIndexedCharField.register_lookup(OracleIContains)
+
+
+class TrigramPatternMixin(object):
+    """
+    Case insensitive pattern lookups written as ``column ILIKE pattern`` on PostgreSQL instead of
+    ``UPPER(column::text) LIKE UPPER(pattern)``, so a pg_trgm GIN index on the column can serve them
+    (see the ``create_trigram_indexes`` command). Other backends are unchanged.
+    """
+    # the value is not a LIKE pattern yet, its wildcards must be escaped
+    escape_rhs = False
+
+    def as_postgresql(self, compiler, connection):
+        if not self.rhs_is_direct_value() or self.bilateral_transforms:
+            return self.as_sql(compiler, connection)
+        lhs_sql, lhs_params = super(BuiltinLookup, self).process_lhs(compiler, connection)
+        rhs_sql, rhs_params = self.process_rhs(compiler, connection)
+        rhs_params = list(rhs_params)
+        if self.escape_rhs and rhs_params:
+            rhs_params[0] = connection.ops.prep_for_like_query(rhs_params[0])
+        return '%s ILIKE %s' % (lhs_sql, rhs_sql), list(lhs_params) + rhs_params
+
+
+class TrigramIExact(TrigramPatternMixin, IExact):
+    escape_rhs = True
+
+
+class TrigramIContains(TrigramPatternMixin, IContains):
+    pass
+
+
+class TrigramIStartsWith(TrigramPatternMixin, IStartsWith):
+    pass
+
+
+class TrigramIEndsWith(TrigramPatternMixin, IEndsWith):
+    pass
+
+
+for trigram_lookup in (TrigramIExact, TrigramIContains, TrigramIStartsWith, TrigramIEndsWith):
+    ChemblTrigramCharField.register_lookup(trigram_lookup)
@@ -50,16 +50,16 @@ class Products(six.with_metaclass(ChemblModelMetaClass, ChemblCoreAbstractModel)
 
 class AtcClassification(six.with_metaclass(ChemblModelMetaClass, ChemblCoreAbstractModel)):
 
-    who_name = models.CharField(max_length=150, blank=True, null=True, help_text='WHO/INN name for the compound')
+    who_name = ChemblTrigramCharField(max_length=150, blank=True, null=True, help_text='WHO/INN name for the compound')
     level1 = models.CharField(max_length=10, blank=True, null=True, help_text='First level of classification')
     level2 = models.CharField(max_length=10, blank=True, null=True, help_text='Second level of classification')
     level3 = models.CharField(max_length=10, blank=True, null=True, help_text='Third level of classification')
     level4 = models.CharField(max_length=10, blank=True, null=True, help_text='Fourth level of classification')
     level5 = models.CharField(primary_key=True, max_length=10, help_text='Complete ATC code for compound')
-    level1_description = models.CharField(max_length=150, blank=True, null=True, help_text='Description of first level of classification')
-    level2_description = models.CharField(max_length=150, blank=True, null=True, help_text='Description of second level of classification')
-    level3_description = models.CharField(max_length=150, blank=True, null=True, help_text='Description of third level of classification')
-    level4_description = models.CharField(max_length=150, blank=True, null=True, help_text='Description of fourth level of classification')
+    level1_description = ChemblTrigramCharField(max_length=150, blank=True, null=True, help_text='Description of first level of classification')
+    level2_description = ChemblTrigramCharField(max_length=150, blank=True, null=True, help_text='Description of second level of classification')
+    level3_description = ChemblTrigramCharField(max_length=150, blank=True, null=True, help_text='Description of third level of classification')
+    level4_description = ChemblTrigramCharField(max_length=150, blank=True, null=True, help_text='Description of fourth level of classification')
     molecules = models.ManyToManyField(MoleculeDictionary, through='MoleculeAtcClassification')
 
     class Meta(ChemblCoreAbstractModel.Meta):
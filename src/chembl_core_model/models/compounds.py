@@ -212,7 +212,7 @@ class MoleculeDictionary(six.with_metaclass(ChemblModelMetaClass, ChemblCoreAbst
         return None
 
     molregno = ChemblAutoField(primary_key=True, length=9, help_text='Internal Primary Key for the molecule')
-    pref_name = models.CharField(max_length=255, db_index=True, blank=True, null=True, help_text='Preferred name for the molecule')
+    pref_name = ChemblTrigramCharField(max_length=255, db_index=True, blank=True, null=True, help_text='Preferred name for the molecule')
     chembl = models.OneToOneField(ChemblIdLookup, on_delete=models.PROTECT, blank=True, null=False, help_text='ChEMBL identifier for this compound (for use on web interface etc)') # This combination of null and blank is actually very important!
     max_phase = ChemblPositiveIntegerField(length=1, db_index=True, default=0, choices=MAX_PHASE_CHOICES, help_text='Maximum phase of development reached for the compound (4 = approved). Null where max phase has not yet been assigned.')
     therapeutic_flag = ChemblBooleanField(db_index=True, default=False, help_text='Indicates that a drug has a therapeutic application (as opposed to e.g., an imaging agent, additive etc).')
@@ -245,16 +245,16 @@ class MoleculeDictionary(six.with_metaclass(ChemblModelMetaClass, ChemblCoreAbst
     usan_stem = models.CharField(max_length=50, blank=True, null=True, help_text='Where the compound has been assigned a USAN name, this indicates the stem, as described in the USAN_STEM table.')
     polymer_flag = ChemblNullableBooleanField(help_text='Indicates whether a molecule is a small molecule polymer (e.g., polistyrex)')
     usan_substem = models.CharField(max_length=50, blank=True, null=True, help_text='Where the compound has been assigned a USAN name, this indicates the substem')
-    usan_stem_definition = models.CharField(max_length=1000, blank=True, null=True, help_text='Definition of the USAN stem')
-    indication_class = models.CharField(max_length=1000, blank=True, null=True, help_text='Indication class(es) assigned to a drug in the USP dictionary')
+    usan_stem_definition = ChemblTrigramCharField(max_length=1000, blank=True, null=True, help_text='Definition of the USAN stem')
+    indication_class = ChemblTrigramCharField(max_length=1000, blank=True, null=True, help_text='Indication class(es) assigned to a drug in the USP dictionary')
     products = models.ManyToManyField('Products', through="Formulations", blank=True)
     docs = models.ManyToManyField('Docs', through="CompoundRecords", blank=True)
     assays = models.ManyToManyField('Assays', through="Activities", blank=True)
     withdrawn_flag = ChemblBooleanField(default=False, help_text="Flag indicating whether the drug has been withdrawn in at least one country (not necessarily in the US)")
     withdrawn_year = ChemblPositiveIntegerField(length=4, blank=True, null=True, help_text='Year the drug was first withdrawn in any country')
-    withdrawn_country = models.CharField(max_length=2000, blank=True, null=True, help_text='List of countries/regions where the drug has been withdrawn')
-    withdrawn_reason = models.CharField(max_length=2000, blank=True, null=True, help_text='Reasons for withdrawal (e.g., safety)')
-    withdrawn_class = models.CharField(max_length=1000, blank=True, null=True)
+    withdrawn_country = ChemblTrigramCharField(max_length=2000, blank=True, null=True, help_text='List of countries/regions where the drug has been withdrawn')
+    withdrawn_reason = ChemblTrigramCharField(max_length=2000, blank=True, null=True, help_text='Reasons for withdrawal (e.g., safety)')
+    withdrawn_class = ChemblTrigramCharField(max_length=1000, blank=True, null=True)
 
     def __str__(self):
         return 'Molecule {0} ({1}) {2}'.format(self.molregno, self.chembl_id, self.pref_name)
@@ -334,7 +334,7 @@ class CompoundProperties(six.with_metaclass(ChemblModelMetaClass, ChemblCoreAbst
     qed_weighted = ChemblPositiveDecimalField(blank=True, null=True, max_digits=3, decimal_places=2, help_text='Weighted quantitative estimate of drug likeness (as defined by Bickerton et al., Nature Chem 2012)')
     updated_on = ChemblDateField(blank=True, null=True, help_text='Shows date properties were last recalculated')
     mw_monoisotopic = ChemblPositiveDecimalField(blank=True, null=True, max_digits=11, decimal_places=4, help_text='Monoisotopic parent molecular weight')
-    full_molformula = models.CharField(max_length=100, blank=True, null=True, help_text='Molecular formula for the full compound (including any salt)')
+    full_molformula = ChemblTrigramCharField(max_length=100, blank=True, null=True, help_text='Molecular formula for the full compound (including any salt)')
     hba_lipinski = ChemblPositiveIntegerField(length=3, blank=True, null=True, help_text="Number of hydrogen bond acceptors calculated according to Lipinski's original rules (i.e., N + O count))")
     hbd_lipinski = ChemblPositiveIntegerField(length=3, blank=True, null=True, help_text="Number of hydrogen bond donors calculated according to Lipinski's original rules (i.e., NH + OH count)")
     num_lipinski_ro5_violations = ChemblPositiveIntegerField(length=1, blank=True, null=True, choices=NUM_RO5_VIOLATIONS_CHOICES, help_text="Number of violations of Lipinski's rule of five using HBA_LIPINSKI and HBD_LIPINSKI counts")
@@ -407,11 +407,11 @@ class MoleculeHierarchy(six.with_metaclass(ChemblModelMetaClass, ChemblCoreAbstr
 class MoleculeSynonyms(six.with_metaclass(ChemblModelMetaClass, ChemblCoreAbstractModel)):
 
     molecule = models.ForeignKey(MoleculeDictionary, on_delete=models.PROTECT,  db_column='molregno', help_text='Foreign key to molecule_dictionary')
-    synonyms = models.CharField(max_length=200, db_index=True, blank=True, null=True, help_text='Synonym for the compound')
+    synonyms = ChemblTrigramCharField(max_length=200, db_index=True, blank=True, null=True, help_text='Synonym for the compound')
     syn_type = models.CharField(max_length=50, help_text='Type of name/synonym (e.g., TRADE_NAME, RESEARCH_CODE, USAN)')
     molsyn_id = ChemblAutoField(primary_key=True, length=9, help_text='Primary key.')
     res_stem = models.ForeignKey(ResearchStem, on_delete=models.PROTECT,  blank=True, null=True, help_text='Foreign key to the research_stem table. Where a synonym is a research code, this links to further information about the company associated with that code.')
-    molecule_synonym = models.CharField(max_length=200, blank=True, null=True, help_text='Synonym for the compound')
+    molecule_synonym = ChemblTrigramCharField(max_length=200, blank=True, null=True, help_text='Synonym for the compound')
 
     class Meta(ChemblCoreAbstractModel.Meta):
         unique_together = (("molecule", "synonyms", "syn_type"),)
@@ -439,7 +439,7 @@ class Biotherapeutics(six.with_metaclass(ChemblModelMetaClass, ChemblCoreAbstrac
 
     molecule = models.OneToOneField(MoleculeDictionary, on_delete=models.PROTECT, primary_key=True, db_column='molregno', help_text='Foreign key to molecule_dictionary')
     description = models.CharField(max_length=2000, blank=True, null=True, help_text='Description of the biotherapeutic.')
-    helm_notation = models.CharField(max_length=4000, blank=True, null=True, help_text='Sequence notation generated according to the HELM standard (http://www.openhelm.org/home). Currently for peptides only')
+    helm_notation = ChemblTrigramCharField(max_length=4000, blank=True, null=True, help_text='Sequence notation generated according to the HELM standard (http://www.openhelm.org/home). Currently for peptides only')
     bio_component_sequences = models.ManyToManyField('BioComponentSequences', through="BiotherapeuticComponents", blank=True)
 
     class Meta(ChemblCoreAbstractModel.Meta):
@@ -506,7 +506,7 @@ class CompoundStructures(six.with_metaclass(ChemblModelMetaClass, ChemblCoreAbst
     molfile = ChemblTextField(blank=True, null=True, help_text='MDL Connection table representation of compound')
     standard_inchi = models.CharField(max_length=4000, db_index=True, unique=True, blank=True, null=True, help_text='IUPAC standard InChI for the compound')
     standard_inchi_key = models.CharField(max_length=27, db_index=True, help_text='IUPAC standard InChI key for the compound')
-    canonical_smiles = models.CharField(max_length=4000, db_index=True, blank=True, null=True, help_text='Canonical smiles, generated using pipeline pilot')
+    canonical_smiles = ChemblTrigramCharField(max_length=4000, db_index=True, blank=True, null=True, help_text='Canonical smiles, generated using pipeline pilot')
     structure_exclude_flag = ChemblBooleanField(default=False, help_text='Indicates whether the structure for this compound should be hidden from users (e.g., organometallic compounds with bad valence etc)')
 
     class Meta(ChemblCoreAbstractModel.Meta):
@@ -136,16 +136,16 @@ class Assays(six.with_metaclass(ChemblModelMetaClass, ChemblCoreAbstractModel)):
 
     assay_id = ChemblAutoField(primary_key=True, length=9, help_text='Unique ID for the assay')
     doc = models.ForeignKey(Docs, on_delete=models.PROTECT,  help_text='Foreign key to documents table')
-    description = models.CharField(max_length=4000, db_index=True, blank=True, null=True, help_text='Description of the reported assay')
+    description = ChemblTrigramCharField(max_length=4000, db_index=True, blank=True, null=True, help_text='Description of the reported assay')
     assay_type = models.ForeignKey(AssayType, on_delete=models.PROTECT,  blank=True, null=True, db_column='assay_type', help_text='Assay classification, e.g. B=Binding assay, A=ADME assay, F=Functional assay')
     assay_test_type = models.CharField(max_length=20, blank=True, null=True, choices=ASSAY_TEST_TYPE_CHOICES, help_text='Type of assay system (i.e., in vivo or in vitro)')
     assay_category = models.CharField(max_length=20, blank=True, null=True, choices=ASSAY_CATEGORY_CHOICES, help_text='screening, confirmatory (ie: dose-response), summary, panel or other.')
-    assay_organism = models.CharField(max_length=250, blank=True, null=True, help_text='Name of the organism for the assay system (e.g., the organism, tissue or cell line in which an assay was performed). May differ from the target organism (e.g., for a human protein expressed in non-human cells, or pathogen-infected human cells).')
+    assay_organism = ChemblTrigramCharField(max_length=250, blank=True, null=True, help_text='Name of the organism for the assay system (e.g., the organism, tissue or cell line in which an assay was performed). May differ from the target organism (e.g., for a human protein expressed in non-human cells, or pathogen-infected human cells).')
     assay_tax_id = ChemblPositiveIntegerField(length=11, blank=True, null=True, help_text='NCBI tax ID for the assay organism.')  # TODO: should be FK to OrganismClass.tax_id
-    assay_strain = models.CharField(max_length=200, blank=True, null=True, help_text='Name of specific strain of the assay organism used (where known)')
-    assay_tissue = models.CharField(max_length=100, blank=True, null=True, help_text='Name of tissue used in the assay system (e.g., for tissue-based assays) or from which the assay system was derived (e.g., for cell/subcellular fraction-based assays).')
-    assay_cell_type = models.CharField(max_length=100, blank=True, null=True, help_text='Name of cell type or cell line used in the assay system (e.g., for cell-based assays).')
-    assay_subcellular_fraction = models.CharField(max_length=100, blank=True, null=True, help_text='Name of subcellular fraction used in the assay system (e.g., microsomes, mitochondria).')
+    assay_strain = ChemblTrigramCharField(max_length=200, blank=True, null=True, help_text='Name of specific strain of the assay organism used (where known)')
+    assay_tissue = ChemblTrigramCharField(max_length=100, blank=True, null=True, help_text='Name of tissue used in the assay system (e.g., for tissue-based assays) or from which the assay system was derived (e.g., for cell/subcellular fraction-based assays).')
+    assay_cell_type = ChemblTrigramCharField(max_length=100, blank=True, null=True, help_text='Name of cell type or cell line used in the assay system (e.g., for cell-based assays).')
+    assay_subcellular_fraction = ChemblTrigramCharField(max_length=100, blank=True, null=True, help_text='Name of subcellular fraction used in the assay system (e.g., microsomes, mitochondria).')
     target = models.ForeignKey(TargetDictionary, on_delete=models.PROTECT,  blank=True, null=True, db_column='tid', help_text='Target identifier to which this assay has been mapped. Foreign key to target_dictionary. From ChEMBL_15 onwards, an assay will have only a single target assigned.')
     relationship_type = models.ForeignKey(RelationshipType, on_delete=models.PROTECT,  blank=True, null=True, db_column='relationship_type', help_text='Flag indicating of the relationship between the reported target in the source document and the assigned target from TARGET_DICTIONARY. Foreign key to RELATIONSHIP_TYPE table.')
     confidence_score = models.ForeignKey(ConfidenceScoreLookup, on_delete=models.PROTECT,  blank=True, null=True, db_column='confidence_score', help_text='Confidence score, indicating how accurately the assigned target(s) represents the actually assay target. Foreign key to CONFIDENCE_SCORE table. 0 means uncurated/unassigned, 1 = low confidence to 9 = high confidence.')
@@ -181,9 +181,9 @@ class Assays(six.with_metaclass(ChemblModelMetaClass, ChemblCoreAbstractModel)):
 class AssayClassification(six.with_metaclass(ChemblModelMetaClass, ChemblCoreAbstractModel)):
 
     assay_class_id = ChemblPositiveIntegerField(primary_key=True, length=9, help_text='Primary Key')
-    l1 = models.CharField(max_length=100, blank=True, null=True, help_text='High level classification e.g., by anatomical/therapeutic area')
-    l2 = models.CharField(max_length=100, blank=True, null=True, help_text='Mid-level classification e.g., by phenotype/biological process')
-    l3 = models.CharField(max_length=1000, db_index=True, blank=True, null=True, help_text='Fine-grained classification e.g., by assay type')
+    l1 = ChemblTrigramCharField(max_length=100, blank=True, null=True, help_text='High level classification e.g., by anatomical/therapeutic area')
+    l2 = ChemblTrigramCharField(max_length=100, blank=True, null=True, help_text='Mid-level classification e.g., by phenotype/biological process')
+    l3 = ChemblTrigramCharField(max_length=1000, db_index=True, blank=True, null=True, help_text='Fine-grained classification e.g., by assay type')
     class_type = models.CharField(max_length=50, blank=True, null=True, help_text='The type of assay being classified e.g., in vivo efficacy')
     bao_id = models.CharField(max_length=11, blank=True, null=True, help_text='BAO ID')
     source = models.CharField(max_length=50, blank=True, null=True, help_text='Source')
@@ -207,15 +207,15 @@ class AssayParameters(six.with_metaclass(ChemblModelMetaClass, ChemblCoreAbstrac
 
     assay_param_id = ChemblAutoField(primary_key=True, length=9, help_text='Numeric primary key')
     assay = models.ForeignKey(Assays, on_delete=models.PROTECT,  help_text='Foreign key to assays table. The assay to which this parameter belongs')
-    type = models.CharField(max_length=250, help_text='The type of parameter being described, according to the original data source')
+    type = ChemblTrigramCharField(max_length=250, help_text='The type of parameter being described, according to the original data source')
     relation = models.CharField(max_length=50, blank=True, null=True, help_text='The relation symbol for the parameter being described, according to the original data source')
     value = ChemblNoLimitDecimalField(blank=True, null=True, help_text='The value of the parameter being described, according to the original data source. Used for numeric data')
-    units = models.CharField(max_length=100, blank=True, null=True, help_text='The units for the parameter being described, according to the original data source')
+    units = ChemblTrigramCharField(max_length=100, blank=True, null=True, help_text='The units for the parameter being described, according to the original data source')
     text_value = models.CharField(max_length=4000, blank=True, null=True, help_text='The text value of the parameter being described, according to the original data source. Used for non-numeric/qualitative data')
-    standard_type = models.CharField(max_length=250, blank=True, null=True, help_text='Standardized form of the TYPE')
+    standard_type = ChemblTrigramCharField(max_length=250, blank=True, null=True, help_text='Standardized form of the TYPE')
     standard_relation = models.CharField(max_length=50, blank=True, null=True, help_text='Standardized form of the RELATION')
     standard_value = ChemblNoLimitDecimalField(blank=True, null=True, help_text='Standardized form of the VALUE')
-    standard_units = models.CharField(max_length=100, blank=True, null=True, help_text='Standardized form of the UNITS')
+    standard_units = ChemblTrigramCharField(max_length=100, blank=True, null=True, help_text='Standardized form of the UNITS')
     standard_text_value = models.CharField(max_length=4000, blank=True, null=True, help_text='Standardized form of the TEXT_VALUE')
     comments = models.CharField(max_length=4000, blank=True, null=True, help_text='Additional comments describing the parameter')
     standard_type_fixed = ChemblPositiveIntegerField(length=1, default=0, help_text='If set to 1, indicates that the normalized_type has been set manually, and should not be automatically overwritten')
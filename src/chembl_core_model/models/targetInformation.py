@@ -138,7 +138,7 @@ class ComponentSequences(six.with_metaclass(ChemblModelMetaClass, ChemblCoreAbst
     accession = models.CharField(max_length=25, unique=True, blank=True, null=True, help_text='Accession for the sequence in the source database from which it was taken (e.g., UniProt accession for proteins).')
     sequence = ChemblTextField(blank=True, null=True, help_text='A representative sequence for the molecular component, as given in the source sequence database (not necessarily the exact sequence used in the assay).')
     sequence_md5sum = models.CharField(max_length=32, blank=True, null=True, help_text='MD5 checksum of the sequence.')
-    description = models.CharField(max_length=200, blank=True, null=True, help_text='Description/name for the molecular component, usually taken from the source sequence database.')
+    description = ChemblTrigramCharField(max_length=200, blank=True, null=True, help_text='Description/name for the molecular component, usually taken from the source sequence database.')
     tax_id = ChemblPositiveIntegerField(length=11, blank=True, null=True, help_text='NCBI tax ID for the sequence in the source database (i.e., species that the protein/nucleic acid sequence comes from).') # TODO: should be FK to Organism class
     organism = models.CharField(max_length=150, blank=True, null=True, help_text='Name of the organism the sequence comes from.')
     db_source = models.CharField(max_length=25, blank=True, null=True, choices=DB_SOURCE_CHOICES, help_text='The name of the source sequence database from which sequences/accessions are taken. For UniProt proteins, this field indicates whether the sequence is from SWISS-PROT or TREMBL.')
@@ -195,9 +195,9 @@ class TargetDictionary(six.with_metaclass(ChemblModelMetaClass, ChemblCoreAbstra
 
     tid = ChemblAutoField(primary_key=True, length=9, help_text='Unique ID for the target')
     target_type = models.ForeignKey(TargetType, on_delete=models.PROTECT,  blank=True, null=True, db_column='target_type', help_text='Describes whether target is a protein, an organism, a tissue etc. Foreign key to TARGET_TYPE table.')
-    pref_name = models.CharField(max_length=200, db_index=True, help_text='Preferred target name: manually curated')
+    pref_name = ChemblTrigramCharField(max_length=200, db_index=True, help_text='Preferred target name: manually curated')
     tax_id = ChemblPositiveIntegerField(length=11, db_index=True, blank=True, null=True, help_text='NCBI taxonomy id of target') # TODO: should be FK to OrganismClass.tax_id
-    organism = models.CharField(max_length=150, db_index=True, blank=True, null=True, help_text='Source organism of molecuar target or tissue, or the target organism if compound activity is reported in an organism rather than a protein or tissue')
+    organism = ChemblTrigramCharField(max_length=150, db_index=True, blank=True, null=True, help_text='Source organism of molecuar target or tissue, or the target organism if compound activity is reported in an organism rather than a protein or tissue')
     updated_on = ChemblDateField(blank=True, null=True)
     updated_by = models.CharField(max_length=100, blank=True, null=True)
     chembl = models.ForeignKey(ChemblIdLookup, on_delete=models.PROTECT,  blank=True, null=False, help_text='ChEMBL identifier for this target (for use on web interface etc)') # This combination of null and blank is actually very important!
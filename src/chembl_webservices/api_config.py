@@ -87,3 +87,9 @@ class WebServicesConfig(AppConfig):
         api.register(DrugsResource())
         api.register(OrganismResource())
         api.register(XrefSourceResource())
+
+        # derive the relation loading and filter plans up front, once every related resource can be imported
+        for resource in api._registry.values():
+            if hasattr(resource, 'get_relation_plan'):
+                resource.get_relation_plan()
+                resource.prebuild_filter_plans()
@@ -0,0 +1,159 @@
+__author__ = 'mnowotka'
+
+import time
+from urllib.parse import urlencode
+from contextlib import contextmanager, ExitStack
+from django.db import connections
+from django.test import Client
+from tastypie.cache import NoCache
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+
+@contextmanager
+def resource_overrides(resource, **meta_overrides):
+    """
+    Temporarily overrides ``resource._meta`` options, the cache is always disabled so every request hits the database.
+    """
+    meta_overrides.setdefault('cache', NoCache())
+    saved = {key: getattr(resource._meta, key) for key in meta_overrides if hasattr(resource._meta, key)}
+    for key, value in meta_overrides.items():
+        setattr(resource._meta, key, value)
+    try:
+        yield resource
+    finally:
+        for key in meta_overrides:
+            if key in saved:
+                setattr(resource._meta, key, saved[key])
+            else:
+                delattr(resource._meta, key)
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+
+@contextmanager
+def connection_overrides(**attributes):
+    """
+    Temporarily sets attributes (e.g. ``prepared_statements``) of the connection wrappers of every database that has
+    them.
+    """
+    saved = []
+    for alias in connections:
+        connection = connections[alias]
+        for key, value in attributes.items():
+            if hasattr(connection, key):
+                saved.append((connection, key, getattr(connection, key)))
+                setattr(connection, key, value)
+    try:
+        yield
+    finally:
+        for connection, key, value in saved:
+            setattr(connection, key, value)
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+
+def has_url(resource, url_name):
+    return any(getattr(pattern, 'name', None) == url_name for pattern in resource.prepend_urls())
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+
+def endpoint_urls(resource, limit=20, set_size=5, fmt='json', search=True, search_query=None):
+    """
+    Returns the list, detail, set and (for ElasticSearch backed resources) search urls of a resource,
+    identifiers are taken from the first rows of its queryset and also used as the default search query.
+    Resources declaring ``Meta.endpoint_paths`` are measured on those paths only.
+    """
+    list_url = resource.get_resource_uri(None, 'api_dispatch_list').rstrip('/')
+    endpoint_paths = getattr(resource._meta, 'endpoint_paths', None)
+    if endpoint_paths:
+        return {kind: '{0}/{1}'.format(list_url, path.format(fmt=fmt, limit=limit))
+                for kind, path in endpoint_paths.items()}
+    urls = {'list': '{0}.{1}?limit={2}'.format(list_url, fmt, limit)}
+    if resource._meta.queryset is None:
+        return urls
+    detail_uri_name = resource._meta.detail_uri_name
+    identifiers = [str(x) for x in resource._meta.queryset.values_list(detail_uri_name, flat=True)[:set_size]
+                   if x is not None]
+    if identifiers:
+        urls['detail'] = '{0}/{1}.{2}'.format(list_url, identifiers[0], fmt)
+        if has_url(resource, 'api_get_multiple'):
+            urls['set'] = '{0}/set/{1}.{2}'.format(list_url, ';'.join(identifiers), fmt)
+    search_query = search_query or (identifiers[0] if identifiers else None)
+    if search and has_url(resource, 'api_get_search') and search_query and len(search_query) >= 3:
+        urls['search'] = '{0}/search.{1}?{2}'.format(list_url, fmt, urlencode({'q': search_query, 'limit': limit}))
+    return urls
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+
+def filter_urls(resource, filters, limit=20, fmt='json'):
+    """
+    Returns a filtered list url of a resource per filter expression of ``filters`` (expression -> value),
+    keyed by the expression.
+    """
+    list_url = resource.get_resource_uri(None, 'api_dispatch_list').rstrip('/')
+    return {filter_expr: '{0}.{1}?{2}'.format(list_url, fmt, urlencode({filter_expr: value, 'limit': limit}))
+            for filter_expr, value in filters.items()}
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+
+def get_query_budget(resource, kind):
+    """
+    Maximum number of SQL queries allowed for an endpoint ``kind`` (list, detail, set or search),
+    ``Meta.query_budget`` is either a number applying to every kind or a dictionary keyed by kind.
+    """
+    budget = getattr(resource._meta, 'query_budget', None)
+    if isinstance(budget, dict):
+        return budget.get(kind)
+    return budget
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+
+def measure(url, repeat=3, client=None, using=None, method='get', data=None, **extra):
+    """
+    Requests ``url`` ``repeat`` times and returns the status code, the number of SQL queries issued by the last
+    request and their total database time, and the best and mean latency in milliseconds.
+    Queries are counted on the ``using`` database, on every configured database (read replicas) by default.
+    """
+    client = client or Client()
+    aliases = [using] if using else list(connections)
+    timings = []
+    status = None
+    queries = 0
+    db_time = 0.0
+    for _ in range(max(repeat, 1)):
+        durations = []
+
+        def record(execute, sql, params, many, context):
+            query_start = time.time()
+            try:
+                return execute(sql, params, many, context)
+            finally:
+                durations.append(time.time() - query_start)
+
+        with ExitStack() as stack:
+            for alias in aliases:
+                stack.enter_context(connections[alias].execute_wrapper(record))
+            start = time.time()
+            response = getattr(client, method)(url, data, **extra) if data is not None \
+                else getattr(client, method)(url, **extra)
+            if getattr(response, 'streaming', False):
+                b''.join(response.streaming_content)
+            timings.append((time.time() - start) * 1000.0)
+        status = response.status_code
+        queries = len(durations)
+        db_time = sum(durations) * 1000.0
+    return {
+        'url': url,
+        'status': status,
+        'queries': queries,
+        'db_ms': round(db_time, 2),
+        'best_ms': round(min(timings), 2),
+        'mean_ms': round(sum(timings) / len(timings), 2),
+    }
+
+# ----------------------------------------------------------------------------------------------------------------------
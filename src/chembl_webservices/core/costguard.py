@@ -0,0 +1,122 @@
+__author__ = 'mnowotka'
+
+import json
+import uuid
+from django.core.exceptions import EmptyResultSet
+from django.db import connections
+
+# What happens to a list whose estimated cost exceeds ``Meta.max_query_cost``.
+COST_ACTIONS = ('reject', 'estimate_count')
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+
+def _postgres_plan(cursor, sql, params):
+    cursor.execute('EXPLAIN (FORMAT JSON) ' + sql, params)
+    plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return plan[0]['Plan']
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+
+def _postgres_estimate(cursor, sql, params):
+    top = _postgres_plan(cursor, sql, params)
+    return float(top['Total Cost']), int(top['Plan Rows'])
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+
+def _postgres_full_scans(cursor, sql, params):
+    scans = set()
+    nodes = [_postgres_plan(cursor, sql, params)]
+    while nodes:
+        node = nodes.pop()
+        if node.get('Node Type') == 'Seq Scan':
+            scans.add(node['Relation Name'].lower())
+        nodes.extend(node.get('Plans', []))
+    return scans
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+
+def _oracle_estimate(cursor, sql, params):
+    statement_id = uuid.uuid4().hex[:30]
+    cursor.execute("EXPLAIN PLAN SET STATEMENT_ID = '" + statement_id + "' FOR " + sql, params)
+    try:
+        cursor.execute('SELECT cost, cardinality FROM plan_table WHERE statement_id = %s AND id = 0', [statement_id])
+        row = cursor.fetchone()
+    finally:
+        cursor.execute('DELETE FROM plan_table WHERE statement_id = %s', [statement_id])
+    if row is None or row[0] is None:
+        return None
+    return float(row[0]), int(row[1] or 0)
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+
+def _oracle_full_scans(cursor, sql, params):
+    statement_id = uuid.uuid4().hex[:30]
+    cursor.execute("EXPLAIN PLAN SET STATEMENT_ID = '" + statement_id + "' FOR " + sql, params)
+    try:
+        cursor.execute("SELECT object_name FROM plan_table WHERE statement_id = %s AND operation = 'TABLE ACCESS' "
+                       "AND options = 'FULL'", [statement_id])
+        rows = cursor.fetchall()
+    finally:
+        cursor.execute('DELETE FROM plan_table WHERE statement_id = %s', [statement_id])
+    return set(row[0].lower() for row in rows if row[0])
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+
+ESTIMATORS = {
+    'postgresql': _postgres_estimate,
+    'oracle': _oracle_estimate,
+}
+
+SCAN_FINDERS = {
+    'postgresql': _postgres_full_scans,
+    'oracle': _oracle_full_scans,
+}
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+
+def estimate_query(queryset):
+    """
+    Asks the planner of the database the ``queryset`` reads from for the estimated cost and number of rows of the
+    query, without running it. Returns a tuple ``(cost, rows)`` or ``None`` when the backend can not tell.
+    Costs are in the planner units of the backend, they are not comparable across backends.
+    """
+    connection = connections[queryset.db]
+    estimator = ESTIMATORS.get(connection.vendor)
+    if estimator is None:
+        return None
+    try:
+        sql, params = queryset.query.get_compiler(queryset.db).as_sql()
+    except EmptyResultSet:
+        return 0.0, 0
+    with connection.cursor() as cursor:
+        return estimator(cursor, sql, params)
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+
+def full_table_scans(queryset):
+    """
+    The (lower case) names of the tables the plan of the ``queryset`` query reads in full, without running it, or
+    ``None`` when the backend can not tell.
+    """
+    connection = connections[queryset.db]
+    finder = SCAN_FINDERS.get(connection.vendor)
+    if finder is None:
+        return None
+    try:
+        sql, params = queryset.query.get_compiler(queryset.db).as_sql()
+    except EmptyResultSet:
+        return set()
+    with connection.cursor() as cursor:
+        return finder(cursor, sql, params)
+
+# ----------------------------------------------------------------------------------------------------------------------
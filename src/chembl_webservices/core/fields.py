@@ -1,7 +1,15 @@
 from tastypie.exceptions import ApiFieldError
 from tastypie.fields import ApiField, NOT_PROVIDED
+from tastypie.fields import RelatedField
 from django.utils import six
 
+# Request attribute holding the parts of the ``only`` tree requested for the related field being dehydrated.
+ONLY_STACK_ATTRIBUTE = '_chembl_only_stack'
+
+# Request attribute holding the heavy fields (``Meta.heavy_fields``) a list request asked for, the other ones are left
+# out of the dehydrated objects. Not set when dehydrating details.
+HEAVY_FIELDS_ATTRIBUTE = '_chembl_heavy_fields'
+
 # ----------------------------------------------------------------------------------------------------------------------
 
 
@@ -113,8 +121,33 @@ def __init__(self, attribute=None, default=NOT_PROVIDED, null=False, blank=False
 # ----------------------------------------------------------------------------------------------------------------------
 
 
+def dehydrate_related(self, bundle, related_resource, for_list=True):
+    """
+    Based on the ``full_resource``, returns either the endpoint or the data
+    from ``full_dehydrate`` for the related resource, restricted to the
+    nested fields requested with ``only``.
+    """
+    should_dehydrate_full_resource = self.should_full_dehydrate(bundle, for_list=for_list)
+
+    if not should_dehydrate_full_resource:
+        return related_resource.get_resource_uri(bundle)
+
+    only_stack = getattr(bundle.request, ONLY_STACK_ATTRIBUTE, None)
+    bundle = related_resource.build_bundle(
+        obj=bundle.obj,
+        request=bundle.request,
+        objects_saved=bundle.objects_saved
+    )
+    if only_stack and only_stack[-1] is not None:
+        return related_resource.full_dehydrate(bundle, only=only_stack[-1])
+    return related_resource.full_dehydrate(bundle)
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+
 def monkeypatch_tastypie_field():
     ApiField.dehydrate = dehydrate
     ApiField.__init__ = __init__
+    RelatedField.dehydrate_related = dehydrate_related
 
 # ----------------------------------------------------------------------------------------------------------------------
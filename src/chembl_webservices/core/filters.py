@@ -0,0 +1,167 @@
+__author__ = 'mnowotka'
+
+from collections import OrderedDict
+from functools import lru_cache
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models.constants import LOOKUP_SEP
+from tastypie.exceptions import BadRequest
+from chembl_webservices.core.utils import represents_int
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+
+class FilterPlan(object):
+    """
+    A filter expression (``target__pref_name__icontains``) compiled against a resource:
+    the ORM path, the lookup type and the converter of the request values (``to_python``).
+    Only depends on the resource definition, so it is computed once per expression and reused by every request.
+    """
+
+    def __init__(self, field_name, filter_type, lookup_bits):
+        self.field_name = field_name
+        self.filter_type = filter_type
+        self.lookup_bits = [bit[:-4] if bit.endswith('_set') else bit for bit in lookup_bits]
+        self.orm_path = LOOKUP_SEP.join(self.lookup_bits)
+        self.qs_filter = self.orm_path + LOOKUP_SEP + filter_type
+        self.to_python = value_converter(filter_type)
+
+    def __repr__(self):
+        return '<FilterPlan {0}>'.format(self.qs_filter)
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+
+def scalar_value(value, filters, filter_expr):
+    if value in ['true', 'True', True]:
+        value = True
+    elif value in ['false', 'False', False]:
+        value = False
+    elif value in ('nil', 'none', 'None', None):
+        value = None
+    return value
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+
+def list_value(value, filters, filter_expr):
+    """
+    The values of an ``in`` or ``range`` filter, split on ',' (every value of a repeated parameter if ``filters`` is
+    a ``QueryDict``).
+    """
+    value = scalar_value(value, filters, filter_expr)
+    if not len(value):
+        return value
+    if hasattr(filters, 'getlist'):
+        value = []
+
+        for part in filters.getlist(filter_expr):
+            if isinstance(part, str):
+                value.extend(part.split(','))
+            else:
+                if len(part) == 1 and isinstance(part[0], str):
+                    value.extend(part[0].split(','))
+                else:
+                    value.extend(part)
+    else:
+        if isinstance(value, str):
+            value = value.split(',')
+        elif type(value) in (list, tuple) and len(value) == 1 and isinstance(value[0], str):
+            value = value[0].split(',')
+    return value
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+
+def range_value(value, filters, filter_expr):
+    value = list_value(value, filters, filter_expr)
+    if len(value) != 2 or not represents_int(value[0]) or not represents_int(value[1]):
+        raise BadRequest(
+            "Invalid range: should consist of two integers separated by comma, got {0} instead.".format(value))
+    return value
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+
+def value_converter(filter_type):
+    """
+    Returns the function converting the request value of a filter of type ``filter_type``, called with the value,
+    the filters and the filter expression.
+    """
+    return {'in': list_value, 'range': range_value}.get(filter_type, scalar_value)
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+
+@lru_cache(maxsize=4096)
+def to_many_prefix(model, path):
+    """
+    Returns the beginning of a filter ``path`` up to its first to-many relation (``molecule_synonyms`` for
+    ``molecule_synonyms__synonyms__icontains``), ``None`` if the path only follows to-one relations.
+    """
+    parts = path.split(LOOKUP_SEP)
+    current = model
+    for idx, part in enumerate(parts):
+        try:
+            field = current._meta.get_field(part)
+        except FieldDoesNotExist:
+            return None
+        if not field.is_relation:
+            return None
+        if field.one_to_many or field.many_to_many:
+            return LOOKUP_SEP.join(parts[:idx + 1])
+        current = field.related_model
+    return None
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+
+def to_many_filter(model, prefix, conditions):
+    """
+    Builds the filter (keyword arguments) matching the outer ``model`` rows for which one row reached through the
+    to-many relation ``prefix`` matches all the ``conditions`` (the semantics of a single ``filter()`` call), as an
+    ``__in`` subquery: the outer rows are not multiplied by the matching related rows and need no DISTINCT.
+    Reverse foreign keys are queried on the related table directly, anything else (many to many, relations reached
+    through other joins, ``isnull`` lookups also matching rows without related objects) goes through the outer table.
+    """
+    field = model._meta.get_field(prefix) if LOOKUP_SEP not in prefix else None
+    if field is not None and field.one_to_many and field.auto_created and \
+            not any(key.split(LOOKUP_SEP)[-1] == 'isnull' for key in conditions):
+        related_model = field.related_model
+        inner_conditions = {}
+        for key, value in conditions.items():
+            rest = key[len(prefix) + len(LOOKUP_SEP):]
+            try:
+                related_model._meta.get_field(rest.split(LOOKUP_SEP)[0])
+            except FieldDoesNotExist:
+                # a lookup on the relation itself (``molecule_synonyms__in``)
+                break
+            inner_conditions[rest] = value
+        else:
+            subquery = related_model._base_manager.filter(**inner_conditions).values(field.field.attname)
+            return {field.field.target_field.name + LOOKUP_SEP + 'in': subquery}
+    return {'pk' + LOOKUP_SEP + 'in': model._base_manager.filter(**conditions).values('pk')}
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+
+def filter_to_many(queryset, conditions):
+    """
+    ``queryset.filter(**conditions)`` with the conditions crossing to-many relations applied as ``__in`` subqueries
+    (one per relation, see ``to_many_filter``) instead of joins, so the rows are not multiplied and need no DISTINCT.
+    """
+    model = queryset.model
+    plain = {}
+    to_many = OrderedDict()
+    for key, value in conditions.items():
+        prefix = to_many_prefix(model, key)
+        if prefix is None:
+            plain[key] = value
+        else:
+            to_many.setdefault(prefix, {})[key] = value
+    if plain:
+        queryset = queryset.filter(**plain)
+    for prefix, prefix_conditions in to_many.items():
+        queryset = queryset.filter(**to_many_filter(model, prefix, prefix_conditions))
+    return queryset
+
+# ----------------------------------------------------------------------------------------------------------------------
@@ -0,0 +1,219 @@
+__author__ = 'mnowotka'
+
+from django.apps import apps
+from django.core.exceptions import FieldDoesNotExist
+from django.db import DatabaseError
+from django.db.backends.utils import truncate_name
+from django.db.models import CharField
+from django.db.models import TextField
+from django.db.models.constants import LOOKUP_SEP
+from django.utils.module_loading import import_string
+from tastypie.exceptions import BadRequest
+from tastypie.exceptions import InvalidFilterError
+from tastypie.exceptions import InvalidSortError
+from chembl_webservices.core.costguard import full_table_scans
+from chembl_webservices.core.trigram import TRIGRAM_FILTERS
+from chembl_webservices.core.trigram import trigram_index_sql
+
+# Lookups served by the leading columns of a B-tree index, and the ones served by the column that follows them.
+EQUALITY_LOOKUPS = ('exact', 'in', 'isnull')
+RANGE_LOOKUPS = ('gt', 'gte', 'lt', 'lte', 'range')
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+
+def lookup_column(model, path):
+    """
+    Resolves an ORM lookup (``molecule__chembl_id__exact``) to the model whose table holds the column, the field and
+    the lookup. Returns ``None`` when the path does not end on a concrete field.
+    """
+    bits = path.split(LOOKUP_SEP)
+    field = None
+    relation = None
+    position = 0
+    for position, bit in enumerate(bits):
+        if field is not None:
+            if not field.is_relation:
+                break
+            relation = field
+            model = field.related_model
+        try:
+            field = model._meta.get_field(bit)
+        except FieldDoesNotExist:
+            break
+    else:
+        position = len(bits)
+    if field is None or not field.concrete:
+        return None
+    if relation is not None and relation.concrete and field == getattr(relation, 'target_field', None):
+        # the key the foreign key points to is also in the table of the foreign key
+        field = relation
+    lookup = bits[-1] if position < len(bits) else 'exact'
+    return field.model, field, lookup
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+
+def shape_candidates(entry):
+    """
+    The indexes that would serve a filter shape, one per table: the equality columns, then the first range column,
+    then on the table of the resource the ordering when nothing else sorts. Substring filters on text columns get a
+    pg_trgm index each. Returns a list of ``(model, kind, fields)`` tuples, ``kind`` being ``'btree'`` or
+    ``'trigram'``.
+    """
+    base = apps.get_model(entry['model'])
+    tables = {}
+    trigrams = []
+    for path in entry['filters']:
+        resolved = lookup_column(base, path)
+        if resolved is None:
+            continue
+        model, field, lookup = resolved
+        columns = tables.setdefault(model, {'equality': [], 'range': []})
+        if lookup in EQUALITY_LOOKUPS and field not in columns['equality']:
+            columns['equality'].append(field)
+        elif lookup in RANGE_LOOKUPS and field not in columns['range']:
+            columns['range'].append(field)
+        elif lookup in TRIGRAM_FILTERS and isinstance(field, (CharField, TextField)) and \
+                (model, 'trigram', (field,)) not in trigrams:
+            trigrams.append((model, 'trigram', (field,)))
+    ordering = []
+    for order_by in entry['ordering']:
+        try:
+            ordering.append(base._meta.get_field(order_by.lstrip('-')))
+        except FieldDoesNotExist:
+            ordering = []
+            break
+    candidates = []
+    for model, columns in tables.items():
+        fields = columns['equality'] + columns['range'][:1]
+        if model is base and not columns['range']:
+            fields += [field for field in ordering if field not in fields]
+        if fields and not (len(fields) == 1 and fields[0].primary_key):
+            candidates.append((model, 'btree', tuple(fields)))
+    if base not in tables and ordering and not ordering[0].primary_key:
+        candidates.append((base, 'btree', tuple(ordering)))
+    return candidates + trigrams
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+
+def is_covered(constraints, kind, columns):
+    """
+    True if one of the existing indexes or keys of a table already serves the candidate ``columns``.
+    """
+    for constraint in constraints.values():
+        existing = constraint.get('columns') or []
+        if not (constraint.get('index') or constraint.get('primary_key') or constraint.get('unique')):
+            continue
+        if kind == 'trigram':
+            if constraint.get('type') == 'gin' and existing == list(columns):
+                return True
+            continue
+        if constraint.get('type') not in (None, 'idx', 'btree'):
+            continue
+        if existing[:len(columns)] == list(columns):
+            return True
+    return False
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+
+def btree_index_sql(connection, model, fields):
+    table = model._meta.db_table
+    columns = [field.column for field in fields]
+    name = truncate_name('{0}_{1}_idx'.format(table, '_'.join(columns)), connection.ops.max_name_length())
+    concurrently = ' CONCURRENTLY IF NOT EXISTS' if connection.vendor == 'postgresql' else ''
+    return 'CREATE INDEX{0} {1} ON {2} ({3})'.format(concurrently, connection.ops.quote_name(name),
+                                                     connection.ops.quote_name(table),
+                                                     ', '.join(connection.ops.quote_name(column) for column in columns))
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+
+def shape_resource(registry, entry):
+    """
+    The resource that recorded a filter shape: the registered one, or the read table serving its lists.
+    """
+    resource = registry.get(entry['resource'])
+    if resource is None:
+        return None
+    if resource._meta.object_class._meta.label == entry['model']:
+        return resource
+    path = getattr(resource._meta, 'read_table', None)
+    if path:
+        read_table = import_string(path)()
+        if read_table._meta.object_class._meta.label == entry['model']:
+            return read_table
+    return None
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+
+def shape_full_scans(resource, entry, using):
+    """
+    The tables the plan of the sample query of a filter shape reads in full, ``None`` if unknown.
+    """
+    sample = entry.get('sample')
+    if resource is None or not sample:
+        return None
+    try:
+        applicable_filters = resource.build_filters(filters=dict(sample))
+        objects = resource.apply_filters(None, applicable_filters).using(using)
+        objects = resource.apply_sorting(objects, options=sample)
+        return full_table_scans(objects)
+    except (DatabaseError, BadRequest, InvalidFilterError, InvalidSortError, TypeError, ValueError):
+        return None
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+
+def advise_indexes(entries, registry, connection):
+    """
+    Joins the filter telemetry with the plans of the sample queries and the existing indexes of ``connection``.
+    Returns the missing indexes, each with the total time spent by the filter shapes it would serve, costliest first.
+    A shape counts for an index when its plan reads the table in full, or when the backend can not EXPLAIN it.
+    """
+    suggestions = {}
+    constraints = {}
+    with connection.cursor() as cursor:
+        for entry in entries:
+            try:
+                candidates = shape_candidates(entry)
+            except LookupError:
+                # the model is gone
+                continue
+            scans = None
+            explained = False
+            for model, kind, fields in candidates:
+                if kind == 'trigram' and connection.vendor != 'postgresql':
+                    continue
+                table = model._meta.db_table
+                if table not in constraints:
+                    constraints[table] = connection.introspection.get_constraints(cursor, table)
+                if is_covered(constraints[table], kind, [field.column for field in fields]):
+                    continue
+                if not explained:
+                    scans = shape_full_scans(shape_resource(registry, entry), entry, connection.alias)
+                    explained = True
+                if scans is not None and table.lower() not in scans:
+                    continue
+                sql = trigram_index_sql(connection, model, fields[0]) if kind == 'trigram' \
+                    else btree_index_sql(connection, model, fields)
+                suggestion = suggestions.setdefault(sql, {
+                    'table': table,
+                    'kind': kind,
+                    'columns': [field.column for field in fields],
+                    'sql': sql,
+                    'total_ms': 0.0,
+                    'count': 0,
+                    'shapes': 0,
+                    'explained': True,
+                })
+                suggestion['total_ms'] += entry['total_ms']
+                suggestion['count'] += entry['count']
+                suggestion['shapes'] += 1
+                suggestion['explained'] = suggestion['explained'] and scans is not None
+    return sorted(suggestions.values(), key=lambda suggestion: suggestion['total_ms'], reverse=True)
+
+# ----------------------------------------------------------------------------------------------------------------------
@@ -0,0 +1,75 @@
+__author__ = 'mnowotka'
+
+from django.conf import settings
+from django.db import NotSupportedError
+from django.db import connections
+from django.db.models import Expression
+from django.db.models.constants import LOOKUP_SEP
+
+# Number of identifiers bound by a single lookup query and streamed back per batch by the bulk endpoints.
+BULK_LOOKUP_CHUNK_SIZE = getattr(settings, 'BULK_LOOKUP_CHUNK_SIZE', 1000)
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+
+class ArrayValues(Expression):
+    """
+    ``SELECT unnest(%s)``: the values of a ``field`` bound as a single array parameter, the right hand side of an
+    ``in`` filter (PostgreSQL only, planned like ``= ANY(%s)``). Unlike a list of values the statement text does not
+    depend on the number of values.
+    """
+
+    def __init__(self, values, field):
+        if not isinstance(values, (list, tuple)):
+            raise TypeError('Expected a list or a tuple of values, got {0}.'.format(type(values).__name__))
+        super(ArrayValues, self).__init__(output_field=field)
+        self.values = list(values)
+
+    def as_sql(self, compiler, connection):
+        if connection.vendor != 'postgresql':
+            raise NotSupportedError('Array parameters are only supported on PostgreSQL.')
+        field = self.output_field
+        values = [field.get_db_prep_value(value, connection) for value in self.values]
+        db_type = field.cast_db_type(connection)
+        # typed, the statement can be prepared (see postgresChEmbl.prepared)
+        return 'SELECT unnest(%s{0})'.format('::{0}[]'.format(db_type) if db_type else ''), [values]
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+
+def in_chunk_size(using):
+    """
+    Returns the maximum number of values matched by a single ``in_filter`` on the ``using`` database: an array
+    parameter on PostgreSQL, ``IN`` lists within the backend limits elsewhere (1000 elements on Oracle).
+    """
+    connection = connections[using]
+    if connection.vendor == 'postgresql':
+        return BULK_LOOKUP_CHUNK_SIZE
+    limits = [BULK_LOOKUP_CHUNK_SIZE, connection.ops.max_in_list_size()]
+    max_query_params = getattr(connection.features, 'max_query_params', None)
+    if max_query_params:
+        # leave room for the parameters of the queryset itself
+        limits.append(max_query_params // 2)
+    return min(limit for limit in limits if limit)
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+
+def in_filter(lookup, values, field, using):
+    """
+    Returns the filter keyword arguments matching the objects whose ``lookup`` (on the model ``field``) is one of
+    ``values`` on the ``using`` database, see ``in_chunk_size``.
+    """
+    if connections[using].vendor == 'postgresql':
+        return {lookup + LOOKUP_SEP + 'in': ArrayValues(values, field)}
+    return {lookup + LOOKUP_SEP + 'in': values}
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+
+def chunks(values, size):
+    values = list(values)
+    for idx in range(0, len(values), size):
+        yield values[idx:idx + size]
+
+# ----------------------------------------------------------------------------------------------------------------------
@@ -16,6 +16,31 @@ class ChemblResourceMeta(object):
     include_resource_uri = False
     allowed_methods = ['get']
     prefetch_related = []
+    select_related = True
+    # resolve detail requests by pk / detail_uri_name without compiling the generic filters
+    detail_fast_path = True
+    # maximum number of SQL queries per endpoint kind, enforced by tests/test_query_budgets.py
+    query_budget = {'list': 20, 'detail': 20, 'set': 20, 'search': 25}
+    # paths (below the list url, ``{fmt}`` and ``{limit}`` filled in) of the endpoints measured by the query budget test
+    # and benchmark_endpoints, keyed by kind, for resources whose urls can not be derived from their queryset
+    endpoint_paths = {}
+    # seconds the SQL statements of an endpoint kind may run before being cancelled (503), None for no limit
+    statement_timeout = {'list': 60, 'detail': 10, 'set': 60, 'search': 30}
+    # planner estimate (EXPLAIN) above which a filtered list is rejected or, with 'estimate_count', served with an
+    # estimated total_count, in the cost units of the database backend, None disables the pre-flight check
+    max_query_cost = None
+    query_cost_action = 'reject'
+    # dotted path of the ReadTableResource serving the lists from a flattened table (READ_TABLES setting)
+    read_table = None
+    # large text fields left out of the lists (and not loaded) unless named in the ``include`` parameter, the details
+    # always have them, see ``ChemblModelResource.requested_heavy_fields``
+    heavy_fields = ()
+    # hits fetched from ElasticSearch, loaded and cached together by a search (at least the requested limit)
+    search_page_size = 20
+    # searches served from the _source of the ElasticSearch documents when SEARCH_FROM_SOURCE is on, the _source path
+    # of the fields whose name differs in the documents, see ``chembl_webservices.core.search.source_data``
+    es_source_search = False
+    es_source_mapping = {}
     default_format = 'application/xml'
     authentication = Authentication()
     authorization = Authorization()
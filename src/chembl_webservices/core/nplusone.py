@@ -0,0 +1,54 @@
+__author__ = 'mnowotka'
+
+import logging
+from contextlib import contextmanager, ExitStack
+from django.conf import settings
+from django.db import connections
+
+log = logging.getLogger(__name__)
+
+DETECTION_MODES = ('log', 'raise')
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+
+class LazyLoadError(Exception):
+    """
+    Raised in ``raise`` mode when serialising a list issued SQL queries, i.e. a relation was not prefetched.
+    """
+    pass
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+
+@contextmanager
+def detect_lazy_loads(resource_name, mode=None):
+    """
+    Records every SQL query executed inside the block, on any database connection.
+    Dehydration of objects returned by ``obj_get_list`` should not hit the database,
+    so any query found is reported according to ``mode`` (defaults to ``settings.N_PLUS_ONE_DETECTION``).
+    """
+    mode = mode or getattr(settings, 'N_PLUS_ONE_DETECTION', None)
+    if mode not in DETECTION_MODES:
+        yield []
+        return
+
+    queries = []
+
+    def record(execute, sql, params, many, context):
+        queries.append(sql)
+        return execute(sql, params, many, context)
+
+    with ExitStack() as stack:
+        for alias in connections:
+            stack.enter_context(connections[alias].execute_wrapper(record))
+        yield queries
+
+    if queries:
+        message = '{0} lazy load(s) while serialising {1} list, first query: {2}'.format(
+            len(queries), resource_name, queries[0])
+        if mode == 'raise':
+            raise LazyLoadError(message)
+        log.warning(message, extra={'resource_name': resource_name, 'queries': queries})
+
+# ----------------------------------------------------------------------------------------------------------------------
@@ -0,0 +1,261 @@
+__author__ = 'mnowotka'
+
+import copy
+import json
+import time
+from tastypie import fields
+from tastypie.exceptions import BadRequest
+from tastypie.exceptions import InvalidFilterError
+from django.db import connections
+from django.db import router
+from django.db import DatabaseError
+from django.db import models
+from django.apps.registry import Apps
+from django.db.models.constants import LOOKUP_SEP
+from chembl_webservices.core.resource import ChemblModelResource
+from chembl_webservices.core.utils import parse_only
+
+# Seconds between two checks that the read table of a resource exists.
+AVAILABILITY_CHECK_INTERVAL = 60
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+
+class JSONColumnField(fields.ApiField):
+    """
+    A nested resource stored as JSON text in a read table column.
+    """
+    dehydrated_type = 'json'
+    help_text = 'Nested data'
+
+    def convert(self, value):
+        if value is None:
+            return None
+        return json.loads(value)
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+
+def _hidden(bundle):
+    return False
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+
+class ReadTableResource(ChemblModelResource):
+    """
+    Serves the lists of another resource from its read table: one row per object with a column per field, built by
+    the ``build_read_table`` command, so a page is a single scan without joins or prefetches.
+    Nested resources are ``JSONColumnField`` columns, the subfields listed in ``Meta.nested_columns`` also have a
+    ``<field>_<subfield>`` column to filter and sort on, hidden from the output.
+    Resources opt in with ``Meta.read_table``, see ``ChemblModelResource.get_read_table``.
+    """
+
+    def __init__(self):
+        super(ReadTableResource, self).__init__()
+        self._available = False
+        self._checked_at = 0
+        self.nested_columns = {}
+        for field_name, subfields in getattr(self._meta, 'nested_columns', {}).items():
+            for subfield in subfields:
+                column = '{0}_{1}'.format(field_name, subfield)
+                self.nested_columns[column] = (field_name, subfield)
+                self.fields[column].use_in = _hidden
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+    def is_available(self):
+        """
+        True if the read table has been built in the database the lists are read from.
+        """
+        now = time.time()
+        if now - self._checked_at < AVAILABILITY_CHECK_INTERVAL:
+            return self._available
+        model = self._meta.object_class
+        connection = connections[router.db_for_read(model)]
+        try:
+            with connection.cursor() as cursor:
+                self._available = model._meta.db_table in connection.introspection.table_names(cursor)
+        except DatabaseError:
+            self.log.warning('Could not check the read table of %s', self._meta.resource_name, exc_info=True)
+            self._available = False
+        self._checked_at = now
+        return self._available
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+    def column_expression(self, expression):
+        """
+        Maps a filter or ordering on a nested field (``ligand_efficiency__le__gte``) to its column
+        (``ligand_efficiency_le__gte``).
+        """
+        order = '-' if expression.startswith('-') else ''
+        bits = expression[len(order):].split(LOOKUP_SEP)
+        column = LOOKUP_SEP.join(bits[:2]).replace(LOOKUP_SEP, '_')
+        if len(bits) > 1 and column in self.nested_columns:
+            return order + LOOKUP_SEP.join([column] + bits[2:])
+        return expression
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+    def is_nested_column(self, expression):
+        return expression.lstrip('-').split(LOOKUP_SEP)[0] in self.nested_columns
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+    def is_json_column(self, expression):
+        return isinstance(self.fields.get(expression.split(LOOKUP_SEP)[0]), JSONColumnField)
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+    def can_serve(self, params):
+        """
+        True if a list request with these parameters gets the same answer from the read table as from the source
+        resource: every filter and ordering is on a column and ``only`` asks for whole fields.
+        """
+        only = parse_only(params.get('only'))
+        if only is not None and any(subtree is not None for subtree in only.values()):
+            return False
+        if any(self.is_json_column(self.column_expression(filter_expr)) for filter_expr in params):
+            return False
+        order_bits = params.get('order_by', params.get('sort_by', []))
+        if not isinstance(order_bits, (list, tuple)):
+            order_bits = [order_bits]
+        for order_by in order_bits:
+            if self.is_nested_column(order_by):
+                return False
+            bits = self.column_expression(order_by).lstrip('-').split(LOOKUP_SEP)
+            if len(bits) > 1 or bits[0] not in self._meta.ordering or self.is_json_column(bits[0]):
+                return False
+        try:
+            self.build_filters(filters=dict(params))
+        except (InvalidFilterError, BadRequest, ValueError):
+            # the source resource reports the error
+            return False
+        return True
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+    def preprocess_filters(self, filters, for_cache_key=False):
+        # the hidden columns are not fields of the source resource, filters on them are ignored as unknown fields
+        return {self.column_expression(filter_expr): value for filter_expr, value in filters.items()
+                if not self.is_nested_column(filter_expr)}
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+    def apply_sorting(self, obj_list, options=None):
+        for parameter_name in ('order_by', 'sort_by'):
+            if options and parameter_name in options:
+                order_bits = options[parameter_name]
+                if not isinstance(order_bits, (list, tuple)):
+                    order_bits = [order_bits]
+                options = dict(options)
+                options[parameter_name] = [self.column_expression(order_by) for order_by in order_bits]
+        return super(ReadTableResource, self).apply_sorting(obj_list, options=options)
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+    def generate_cache_key(self, *args, **kwargs):
+        # the cached pages hold read table rows, not objects of the source resource
+        return 'read_table:' + super(ReadTableResource, self).generate_cache_key(*args, **kwargs)
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+    def read_table_row(self, bundle, model=None):
+        """
+        The read table row of a bundle dehydrated by the source resource, an instance of ``model`` (by default the
+        model of the read table).
+        """
+        model = model or self._meta.object_class
+        row = {}
+        for field in self._meta.object_class._meta.concrete_fields:
+            if field.name in self.nested_columns:
+                field_name, subfield = self.nested_columns[field.name]
+                nested = bundle.data.get(field_name)
+                value = nested.data.get(subfield) if nested is not None else None
+            elif isinstance(self.fields.get(field.name), JSONColumnField):
+                value = bundle.data.get(field.name)
+                if value is not None:
+                    value = json.dumps(self._meta.serializer.to_simple(value, {}))
+            else:
+                value = bundle.data.get(field.name)
+            row[field.attname] = value
+        return model(**row)
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+
+def table_model(model, db_table):
+    """
+    A managed copy of the read table ``model`` on ``db_table``, registered in an app registry of its own, to create,
+    load and drop the tables of a build without touching the options of the model the lists are served from.
+    """
+    meta = type('Meta', (), {'apps': Apps(), 'app_label': model._meta.app_label, 'db_table': db_table,
+                             'managed': True})
+    attrs = {'Meta': meta, '__module__': model.__module__}
+    for field in model._meta.local_fields:
+        # clone() passes max_digits back to ChemblNoLimitDecimalField, which sets its own
+        attrs[field.name] = copy.deepcopy(field)
+    return type(model.__name__, (models.Model,), attrs)
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+
+def load_read_table(resource, read_table, model, using, batch_size):
+    """
+    Dehydrates every object of ``resource`` into the table of ``model``, a copy of the ``read_table`` model, in primary
+    key order batches. Yields the number of rows written after each batch.
+    """
+    objects = resource.prefetch_related(resource.get_object_list(None).using(using)).order_by('pk')
+    last_pk = None
+    written = 0
+    while True:
+        batch = objects if last_pk is None else objects.filter(pk__gt=last_pk)
+        batch = list(batch[:batch_size])
+        if not batch:
+            return
+        rows = [read_table.read_table_row(resource.full_dehydrate(resource.build_bundle(obj=obj), for_list=True),
+                                          model=model)
+                for obj in batch]
+        model.objects.using(using).bulk_create(rows)
+        last_pk = batch[-1].pk
+        written += len(rows)
+        yield written
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+
+def build_read_table(resource, read_table, using='default', batch_size=1000, progress=None):
+    """
+    Builds the read table of ``resource`` in a new table, indexes it once loaded and swaps it with the live one, so
+    the lists are served from the previous release until the new one is complete.
+    ``progress(rows)`` is called after each batch. Returns the number of rows.
+    """
+    connection = connections[using]
+    live_table = read_table._meta.object_class._meta.db_table
+    # index names are derived from the table name, they must not clash with the indexes of the live table
+    staging_table = '{0}_{1}'.format(live_table, int(time.time()))
+    staging = table_model(read_table._meta.object_class, staging_table)
+    written = 0
+    with connection.schema_editor() as editor:
+        editor.create_model(staging)
+        # loading is faster without the indexes
+        index_statements, editor.deferred_sql = editor.deferred_sql, []
+    try:
+        for written in load_read_table(resource, read_table, staging, using, batch_size):
+            if progress:
+                progress(written)
+        with connection.schema_editor() as editor:
+            for statement in index_statements:
+                editor.execute(statement)
+    except BaseException:
+        with connection.schema_editor() as editor:
+            editor.delete_model(staging)
+        raise
+    with connection.schema_editor() as editor:
+        if live_table in connection.introspection.table_names():
+            editor.delete_model(table_model(read_table._meta.object_class, live_table))
+        editor.alter_db_table(staging, staging_table, live_table)
+    return written
+
+# ----------------------------------------------------------------------------------------------------------------------
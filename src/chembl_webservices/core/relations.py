@@ -0,0 +1,308 @@
+__author__ = 'mnowotka'
+
+from django.core.exceptions import FieldDoesNotExist
+from django.core.exceptions import ObjectDoesNotExist
+from django.db.models import Prefetch
+from django.db.models.constants import LOOKUP_SEP
+
+# How deep nested ``full`` resources are followed when deriving a plan, protects against self referencing resources.
+MAX_PLAN_DEPTH = 6
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+
+class RelationPlan(object):
+    """
+    Describes how the relations needed to dehydrate a resource should be loaded:
+    to-one chains are joined with ``select_related`` (restricted to ``columns``),
+    anything crossing a to-many relation is left to ``prefetch_related``.
+    """
+
+    def __init__(self):
+        self.select_related = set()
+        self.prefetch_related = set()
+        self.columns = set()
+
+    def update(self, other):
+        self.select_related |= other.select_related
+        self.prefetch_related |= other.prefetch_related
+        self.columns |= other.columns
+
+    def select_paths(self):
+        # select_related('a__b') already joins 'a', keep only the longest paths
+        paths = sorted(self.select_related)
+        return [path for path in paths if not any(other.startswith(path + LOOKUP_SEP) for other in paths)]
+
+    def prefetch_paths(self):
+        paths = sorted(self.prefetch_related)
+        return [path for path in paths if not any(other.startswith(path + LOOKUP_SEP) for other in paths)]
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+
+class _Hop(object):
+
+    def __init__(self, field, model, query_name, accessor_name, to_many):
+        self.field = field
+        self.model = model
+        self.query_name = query_name
+        self.accessor_name = accessor_name
+        self.to_many = to_many
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+
+def _is_back_reference(previous, field):
+    """
+    Django fills the cache of the opposite side of a one-to-one join and of a prefetched reverse foreign key,
+    so following the relation back to where we came from does not need another join.
+    """
+    if previous.field.auto_created and not previous.field.concrete:
+        return field is previous.field.field
+    if getattr(previous.field, 'unique', False) and previous.field.remote_field is not None:
+        return field is previous.field.remote_field
+    return False
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+
+def walk_attribute(model, attribute, hops=None):
+    """
+    Follows a tastypie field ``attribute`` (e.g. ``assay__target__chembl_id``) through the model relations.
+    Returns a tuple ``(hops, column)``: the relation hops made and the name of the final model field
+    (``None`` if the attribute ends on a relation) or ``None`` if the attribute is not a plain model path.
+    """
+    hops = list(hops or [])
+    current = hops[-1].model if hops else model
+    column = None
+    parts = attribute.split(LOOKUP_SEP)
+    for idx, part in enumerate(parts):
+        name = part[:-4] if part.endswith('_set') else part
+        try:
+            field = current._meta.get_field(name)
+        except FieldDoesNotExist:
+            return None
+        attname = getattr(field, 'attname', None)
+        if not field.is_relation or (part == attname and attname != field.name):
+            if idx != len(parts) - 1:
+                return None
+            column = field.name
+            break
+        if hops and _is_back_reference(hops[-1], field):
+            hops.pop()
+            current = hops[-1].model if hops else model
+            continue
+        reverse = field.auto_created and not field.concrete
+        query_name = field.name
+        accessor_name = field.get_accessor_name() if reverse else field.name
+        current = field.related_model
+        hops.append(_Hop(field, current, query_name, accessor_name, field.one_to_many or field.many_to_many))
+    return hops, column
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+
+def _hops_to_plan(model, hops, column):
+    plan = RelationPlan()
+    if not hops:
+        if column:
+            plan.columns.add(column)
+        return plan
+    if any(hop.to_many for hop in hops):
+        plan.prefetch_related.add(LOOKUP_SEP.join(hop.accessor_name for hop in hops))
+        return plan
+    path = LOOKUP_SEP.join(hop.query_name for hop in hops)
+    plan.select_related.add(path)
+    for idx, hop in enumerate(hops):
+        prefix = LOOKUP_SEP.join(h.query_name for h in hops[:idx + 1])
+        plan.columns.add(prefix + LOOKUP_SEP + hop.model._meta.pk.name)
+    if column:
+        plan.columns.add(path + LOOKUP_SEP + column)
+    return plan
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+
+def build_relation_plan(resource, only=None, hops=None, depth=0):
+    """
+    Derives a ``RelationPlan`` from the ``attribute`` paths of the resource fields, following nested ``full``
+    related resources. ``only`` is a tree returned by ``parse_only`` restricting the plan to the requested fields.
+    """
+    plan = RelationPlan()
+    model = resource._meta.object_class
+    if model is None or depth > MAX_PLAN_DEPTH:
+        return plan
+    for field_name, field_object in resource.fields.items():
+        if only is not None and field_name not in only:
+            continue
+        attribute = getattr(field_object, 'attribute', None)
+        if not attribute or not isinstance(attribute, str):
+            continue
+        walked = walk_attribute(model, attribute, hops)
+        if walked is None:
+            continue
+        field_hops, column = walked
+        plan.update(_hops_to_plan(model, field_hops, column))
+        if column is not None or not field_hops:
+            continue
+        sub_only = only.get(field_name) if only is not None else None
+        if getattr(field_object, 'is_related', False) and getattr(field_object, 'full', False):
+            related_resource = field_object.get_related_resource(None)
+            plan.update(build_relation_plan(related_resource, only=sub_only, hops=field_hops, depth=depth + 1))
+        if sub_only is None and not any(hop.to_many for hop in field_hops):
+            # the related object is dehydrated as a whole, load every column of the related model
+            path = LOOKUP_SEP.join(hop.query_name for hop in field_hops)
+            plan.columns.update(path + LOOKUP_SEP + f.name for f in field_hops[-1].model._meta.concrete_fields)
+    return plan
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+
+def heavy_fields(resource, hops=None, depth=0):
+    """
+    Maps the ``Meta.heavy_fields`` of a resource and of its nested ``full`` resources to the ``defer()`` paths of their
+    columns. The fields reached through a to-many relation have no path, their columns are loaded by a prefetch.
+    """
+    heavy = {}
+    model = resource._meta.object_class
+    if model is None or depth > MAX_PLAN_DEPTH:
+        return heavy
+    names = getattr(resource._meta, 'heavy_fields', ())
+    for field_name, field_object in resource.fields.items():
+        nested = getattr(field_object, 'is_related', False) and getattr(field_object, 'full', False)
+        if field_name not in names and not nested:
+            continue
+        attribute = getattr(field_object, 'attribute', None)
+        if not attribute or not isinstance(attribute, str):
+            continue
+        walked = walk_attribute(model, attribute, hops)
+        if walked is None:
+            continue
+        field_hops, column = walked
+        to_many = any(hop.to_many for hop in field_hops)
+        if field_name in names:
+            paths = heavy.setdefault(field_name, set())
+            if column is not None and not to_many:
+                paths.add(LOOKUP_SEP.join([hop.query_name for hop in field_hops] + [column]))
+        elif column is None and field_hops:
+            related_resource = field_object.get_related_resource(None)
+            for name, paths in heavy_fields(related_resource, hops=field_hops, depth=depth + 1).items():
+                heavy.setdefault(name, set()).update(paths if not to_many else ())
+    return heavy
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+
+def prefetch_path(item):
+    return item if isinstance(item, str) else item.prefetch_through
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+
+def is_to_one_path(model, path):
+    """
+    True if every hop of a ``prefetch_related`` path is a to-one relation.
+    """
+    walked = walk_attribute(model, path)
+    if walked is None:
+        return False
+    hops, column = walked
+    return bool(hops) and column is None and not any(hop.to_many for hop in hops)
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+
+def to_select_path(model, path):
+    walked = walk_attribute(model, path)
+    return LOOKUP_SEP.join(hop.query_name for hop in walked[0])
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+
+def select_columns(model, path):
+    """
+    The ``only()`` paths loading the whole object at the end of a to-one ``path`` (and the primary keys of the
+    models joined on the way): a model joined with only some of its columns loads each missing one with a query per
+    row.
+    """
+    hops = walk_attribute(model, path)[0]
+    columns = set()
+    for idx, hop in enumerate(hops):
+        prefix = LOOKUP_SEP.join(h.query_name for h in hops[:idx + 1])
+        columns.add(prefix + LOOKUP_SEP + hop.model._meta.pk.name)
+    columns.update(path + LOOKUP_SEP + f.name for f in hops[-1].model._meta.concrete_fields)
+    return columns
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+
+def widen_prefetch(item, plan):
+    """
+    Adds the columns the plan needs to the ``only()`` projection of a declared ``Prefetch`` queryset,
+    a narrower projection would load every missing column with one query per row.
+    """
+    if isinstance(item, str) or item.queryset is None:
+        return item
+    field_names, defer = item.queryset.query.deferred_loading
+    if defer:
+        return item
+    prefix = item.prefetch_through + LOOKUP_SEP
+    needed = set(column[len(prefix):] for column in plan.columns
+                 if column.startswith(prefix) and LOOKUP_SEP not in column[len(prefix):])
+    if needed <= set(field_names):
+        return item
+    return Prefetch(item.prefetch_through, queryset=item.queryset.only(*(set(field_names) | needed)),
+                    to_attr=item.to_attr)
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+
+def defer_prefetch(item, paths):
+    """
+    Defers the columns among ``paths`` that a declared ``Prefetch`` queryset loads.
+    """
+    if isinstance(item, str) or item.queryset is None:
+        return item
+    prefix = item.prefetch_through + LOOKUP_SEP
+    columns = [path[len(prefix):] for path in paths
+               if path.startswith(prefix) and LOOKUP_SEP not in path[len(prefix):]]
+    if not columns:
+        return item
+    return Prefetch(item.prefetch_through, queryset=item.queryset.defer(*columns), to_attr=item.to_attr)
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+
+def identifier_field(model, path):
+    """
+    Returns the model field holding the value reached by ``path`` when it only follows to-one relations and ends on
+    a column (or on the ``attname`` of a foreign key), ``None`` otherwise.
+    """
+    walked = walk_attribute(model, path)
+    if walked is None:
+        return None
+    hops, column = walked
+    if column is None or any(hop.to_many for hop in hops):
+        return None
+    field = (hops[-1].model if hops else model)._meta.get_field(column)
+    if field.is_relation and path.split(LOOKUP_SEP)[-1] != field.attname:
+        return None
+    return field
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+
+def path_value(obj, path):
+    """
+    Follows ``path`` on a model instance, returns ``None`` when a relation on the way is not set.
+    """
+    for part in path.split(LOOKUP_SEP):
+        try:
+            obj = getattr(obj, part)
+        except ObjectDoesNotExist:
+            return None
+        if obj is None:
+            return None
+    return obj
+
+# ----------------------------------------------------------------------------------------------------------------------
@@ -8,6 +8,7 @@ import re
 import time
 import logging
 import itertools
+import json
 from urllib.parse import unquote
 from tastypie import http
 from tastypie.exceptions import BadRequest
@@ -16,6 +17,8 @@ from tastypie.exceptions import Unauthorized
 from tastypie.exceptions import ImmediateHttpResponse
 from tastypie.exceptions import InvalidFilterError
 from tastypie.resources import ModelResource
+from tastypie.resources import ALL
+from tastypie.resources import ALL_WITH_RELATIONS
 from tastypie.resources import convert_post_to_put
 from tastypie.utils import dict_strip_unicode_keys
 from tastypie.utils.mime import build_content_type
@@ -23,6 +26,7 @@ from tastypie.exceptions import NotFound
 from tastypie import fields
 from django.utils import six
 from django.http import HttpResponse
+from django.http import StreamingHttpResponse
 from django.http import HttpResponseNotFound
 from django.http import Http404
 from django.conf.urls import url
@@ -37,11 +41,53 @@ from django.core.exceptions import FieldError
 from django.core.exceptions import TooManyFieldsSent
 from django.db.models.constants import LOOKUP_SEP
 from django.db import DatabaseError
+from django.db import connections
 from django.views.decorators.csrf import csrf_exempt
+from django.utils.module_loading import import_string
 from chembl_webservices.core.utils import CHAR_FILTERS
-from chembl_webservices.core.utils import represents_int
-from chembl_webservices.core.utils import list_flatten
 from chembl_webservices.core.utils import unpack_request_params
+from chembl_webservices.core.utils import parse_only
+from chembl_webservices.core.utils import freeze_only
+from chembl_webservices.core.utils import only_names
+from chembl_webservices.core.fields import HEAVY_FIELDS_ATTRIBUTE
+from chembl_webservices.core.fields import ONLY_STACK_ATTRIBUTE
+from chembl_webservices.core.costguard import COST_ACTIONS
+from chembl_webservices.core.costguard import estimate_query
+from chembl_webservices.core.filters import FilterPlan
+from chembl_webservices.core.filters import filter_to_many
+from chembl_webservices.core.lookups import BULK_LOOKUP_CHUNK_SIZE
+from chembl_webservices.core.lookups import chunks
+from chembl_webservices.core.lookups import in_chunk_size
+from chembl_webservices.core.lookups import in_filter
+from chembl_webservices.core.nplusone import detect_lazy_loads
+from chembl_webservices.core.relations import build_relation_plan
+from chembl_webservices.core.relations import defer_prefetch
+from chembl_webservices.core.relations import heavy_fields
+from chembl_webservices.core.relations import identifier_field
+from chembl_webservices.core.relations import is_to_one_path
+from chembl_webservices.core.relations import path_value
+from chembl_webservices.core.relations import prefetch_path
+from chembl_webservices.core.relations import select_columns
+from chembl_webservices.core.relations import to_select_path
+from chembl_webservices.core.relations import widen_prefetch
+from chembl_webservices.core.routers import eject_failed_replica
+from chembl_webservices.core.routers import pin_replica
+from chembl_webservices.core.routers import pinned_replica
+from chembl_webservices.core.search import SEARCH_MAX_RESULTS
+from chembl_webservices.core.search import SearchRank
+from chembl_webservices.core.search import SearchRanking
+from chembl_webservices.core.search import SearchResults
+from chembl_webservices.core.search import hit_score
+from chembl_webservices.core.search import search_body
+from chembl_webservices.core.search import source_data
+from chembl_webservices.core.search import source_paths
+from chembl_webservices.core.search import source_servable
+from chembl_webservices.core.search import total_hits
+from chembl_webservices.core.telemetry import filter_telemetry
+from chembl_webservices.core.timeouts import HttpServiceUnavailable
+from chembl_webservices.core.timeouts import get_statement_timeout
+from chembl_webservices.core.timeouts import is_statement_timeout
+from chembl_webservices.core.timeouts import statement_timeout
 from elasticsearch import Elasticsearch, RequestsHttpConnection
 import elasticsearch.helpers
 
@@ -63,6 +109,10 @@ class ChemblModelResource(ModelResource):
 
     def __init__(self):
         self.log = logging.getLogger(__name__)
+        self._relation_plans = {}
+        self._filter_plans = {}
+        self._read_table = None
+        self._heavy_fields = None
         super(ModelResource, self).__init__()
 
 # ----------------------------------------------------------------------------------------------------------------------
@@ -80,6 +130,18 @@ class ChemblModelResource(ModelResource):
             url(r"^(?P<resource_name>%s)/(?P<%s>\w[\w/-]*)\.(?P<format>\w+)$" % (self._meta.resource_name, self._meta.detail_uri_name), self.wrap_view('dispatch_detail'), name="api_dispatch_detail"),
         ]
 
+# ----------------------------------------------------------------------------------------------------------------------
+
+    @property
+    def urls(self):
+        """
+        Adds the bulk lookup url to every resource exposing a set url, ahead of the detail urls that would match it.
+        """
+        urls = super(ChemblModelResource, self).urls
+        if any(getattr(pattern, 'name', None) == 'api_get_multiple' for pattern in urls):
+            urls = [url(r"^(?P<resource_name>%s)/bulk\.(?P<format>\w+)$" % self._meta.resource_name, self.wrap_view('get_bulk'), name="api_get_bulk")] + urls
+        return urls
+
 # ----------------------------------------------------------------------------------------------------------------------
 
     def determine_format(self, request):
@@ -246,7 +308,8 @@ class ChemblModelResource(ModelResource):
                 request.format = kwargs.get('format', None)
                 request.POST.dict()  # touch this dict here to populate data, strange problem with Django...
 
-                if request.method == 'GET':
+                if request.method == 'GET' or view == 'get_bulk':
+                    # the bulk view reads its parameters from the query string and its identifiers from the body
                     kwargs.update(dict(unpack_request_params(request.GET.lists())))
 
                 elif request.method == 'POST':
@@ -268,7 +331,9 @@ class ChemblModelResource(ModelResource):
                     kwargs['chembl_id_list'] = kwargs['chembl_id_list'].upper()
 
                 callback = getattr(self, view)
-                response = callback(request, *args, **kwargs)
+                request.statement_timeout = get_statement_timeout(self, view)
+                with statement_timeout(request.statement_timeout):
+                    response = callback(request, *args, **kwargs)
 
                 # Our response can vary based on a number of factors, use
                 # the cache class to determine what we should ``Vary`` on so
@@ -310,6 +375,10 @@ class ChemblModelResource(ModelResource):
                 if hasattr(e, 'response'):
                     return e.response
 
+                if isinstance(e, DatabaseError) and is_statement_timeout(e):
+                    eject_failed_replica(e)
+                    return self.statement_timeout_response(request)
+
                 # A real, non-expected exception.
                 # Handle the case where the full traceback is more helpful
                 # than the serialized error.
@@ -344,9 +413,25 @@ class ChemblModelResource(ModelResource):
                     args[idx] = self.unquote_args(arg)
         return args
 
+# ----------------------------------------------------------------------------------------------------------------------
+
+    def statement_timeout_response(self, request):
+        data = {"error_message": self.statement_timeout_message(request)}
+        return self.error_response(request, data, response_class=HttpServiceUnavailable)
+
+    def statement_timeout_message(self, request):
+        seconds = getattr(request, 'statement_timeout', None)
+        limit = ' of {0} seconds'.format(seconds) if seconds else ''
+        return "The database query exceeded the time limit{0} for this endpoint and was cancelled. " \
+               "Please use more selective filters or a smaller page.".format(limit)
+
 # ----------------------------------------------------------------------------------------------------------------------
 
     def _handle_database_error(self, error, request, kwargs):
+        # answered here, got_request_exception is not always sent
+        eject_failed_replica(error)
+        if is_statement_timeout(error):
+            raise ImmediateHttpResponse(response=self.statement_timeout_response(request))
         msg = str(error.message)
         if 'MDL-1622' in msg:
             raise BadRequest("Input string %s is not a valid SMILES string" % kwargs.get('smiles'))
@@ -374,12 +459,14 @@ class ChemblModelResource(ModelResource):
             raise ImmediateHttpResponse(response=self._handle_500(request, error))
 
 # ----------------------------------------------------------------------------------------------------------------------
-    def list_cache_handler(self, data_provider):
+    def list_cache_handler(self, data_provider, page_size=None, cache_key_prefix=''):
 
         def handle(bundle, cache_key_name, url_name, **kwargs):
             """
             A version of ``obj_get_list`` that uses the cache as a means to get
-            commonly-accessed data faster.
+            commonly-accessed data faster. The data is sliced and cached in pages of ``max_limit`` objects, or of
+            ``page_size`` (at least the requested limit) if given, ``cache_key_prefix`` tells apart the pages of
+            data providers serving other objects for the same requests.
             """
             kwargs = self.unquote_args(kwargs)
 
@@ -399,16 +486,20 @@ class ChemblModelResource(ModelResource):
 
             paginator_info = {'limit': limit, 'offset': offset}
             max_limit = self._meta.max_limit
+            # objects served, the paginator caps the limit (0 meaning no limit) to max_limit
+            served = min(limit, max_limit) or max_limit
+            slice_size = min(max_limit, max(served, page_size)) if page_size else max_limit
 
             try:
-                start_slice = (paginator_info['offset'] // max_limit) * max_limit
-                end_slice = ((paginator_info['offset'] + paginator_info['limit']) // max_limit) * max_limit
+                start_slice = (paginator_info['offset'] // slice_size) * slice_size
+                # the page of the last object served
+                end_slice = ((paginator_info['offset'] + served - 1) // slice_size) * slice_size
             except ValueError:
                 raise BadRequest("Invalid limit or offset provided. Please provide integers.")
             if start_slice == end_slice:
-                pages = [{'offset': start_slice, 'limit': max_limit}]
+                pages = [{'offset': start_slice, 'limit': slice_size}]
             else:
-                pages = [{'offset': start_slice, 'limit': max_limit}, {'offset': end_slice, 'limit': max_limit}]
+                pages = [{'offset': start_slice, 'limit': slice_size}, {'offset': end_slice, 'limit': slice_size}]
 
             for page in pages:
                 if get_failed:
@@ -416,13 +507,14 @@ class ChemblModelResource(ModelResource):
                     continue
                 page_kwargs = kwargs.copy()
                 page_kwargs.update(page)
-                cache_key = self.generate_cache_key(cache_key_name, **page_kwargs)
+                cache_key = cache_key_prefix + self.generate_cache_key(cache_key_name, **page_kwargs)
                 page['cache_key'] = cache_key
                 try:
                     chunk = self._meta.cache.get(cache_key)
                     if chunk:
                         page['slice'] = chunk.get('slice')
                         page['count'] = chunk.get('count')
+                        page['count_estimated'] = chunk.get('count_estimated', False)
                         page['in_cache'] = True
                     else:
                         page['in_cache'] = False
@@ -434,12 +526,24 @@ class ChemblModelResource(ModelResource):
             in_cache = all(page.get('in_cache') for page in pages) and \
                                                         (len(pages) == 1 or pages[0]['count'] == pages[1]['count'])
             if not in_cache:
+                started = time.time()
                 sorted_objects = data_provider(bundle, **kwargs)
+                slices = {}
+                if isinstance(sorted_objects, SearchResults):
+                    # the total number of hits comes with the window of a page, not from a request of its own
+                    for page in pages:
+                        if not page.get('in_cache'):
+                            slices[page['offset']] = sorted_objects[page['offset']:page['offset'] + page['limit']]
+                # the planner estimate set by check_query_cost, the rows are not counted
+                estimated_count = getattr(request, 'estimated_count', None)
+                count = estimated_count
                 try:
-                    count = sorted_objects.count() if not isinstance(sorted_objects, list) else len(sorted_objects)
+                    if count is None:
+                        count = sorted_objects.count() if not isinstance(sorted_objects, list) \
+                            else len(sorted_objects)
                 except (DatabaseError, NotImplementedError) as e:
                     self._handle_database_error(e, request, kwargs)
-                if count < max_limit:
+                if estimated_count is None and count < max_limit:
                     len(sorted_objects)
                 objs = []
                 paginator = self._meta.paginator_class(paginator_info,
@@ -453,6 +557,8 @@ class ChemblModelResource(ModelResource):
                                                        method=request.method)
                 meta = paginator.get_meta(False)
                 meta['total_count'] = count
+                if estimated_count is not None:
+                    meta['total_count_estimated'] = True
                 if request.method.upper() == 'GET':
                     meta['previous'] = paginator.get_previous(paginator.get_limit(), paginator.get_offset())
                     meta['next'] = paginator.get_next(paginator.get_limit(), paginator.get_offset(),
@@ -470,7 +576,10 @@ class ChemblModelResource(ModelResource):
                                                                format=request.format,
                                                                params=kwargs,
                                                                method=request.method)
-                        slice = paginator.get_slice(paginator.get_limit(), paginator.get_offset())
+                        if page['offset'] in slices:
+                            slice = slices[page['offset']]
+                        else:
+                            slice = paginator.get_slice(paginator.get_limit(), paginator.get_offset())
                         len(slice)
                         objs.extend(slice)
                         if not get_failed:
@@ -482,6 +591,7 @@ class ChemblModelResource(ModelResource):
                                     cache_data.update({
                                         'slice': slice,
                                         'count': meta.get('total_count'),
+                                        'count_estimated': estimated_count is not None,
                                         'offset': offset,
                                         'url': request.path,
                                         'slice_length': len(slice)
@@ -492,6 +602,7 @@ class ChemblModelResource(ModelResource):
                             except Exception:
                                 self.log.error('Caching set exception', exc_info=True, extra={'bundle': request.path, })
                                 get_failed = False
+                self.record_filter_shape(request, sorted_objects, time.time() - started)
 
             else:
                 objs = list(itertools.chain.from_iterable([page.get('slice') for page in pages]))
@@ -506,6 +617,8 @@ class ChemblModelResource(ModelResource):
                                                        method=request.method)
                 meta = paginator.get_meta(False)
                 meta['total_count'] = pages[0]['count']
+                if pages[0]['count_estimated']:
+                    meta['total_count_estimated'] = True
                 if request.method.upper() == 'GET':
                     meta['previous'] = paginator.get_previous(paginator.get_limit(), paginator.get_offset())
                     meta['next'] = paginator.get_next(paginator.get_limit(), paginator.get_offset(),
@@ -523,91 +636,118 @@ class ChemblModelResource(ModelResource):
 
 # ----------------------------------------------------------------------------------------------------------------------
 
-    def get_search_results(self, user_query):
-        max_results = 10000
+    def search_index(self):
+        """
+        The ElasticSearch index (or comma separated indexes) searched by the resource.
+        """
+        if not self._meta:
+            self.answerBadRequest('The _meta has not been configured for this endpoint.')
+        if not self._meta.resource_name:
+            self.answerBadRequest('The resource_name has not been configured for this endpoint.')
+        if getattr(self._meta, 'es_multi_index_search_resources', None) is not None:
+            return ','.join(
+                [
+                    (settings.ELASTICSEARCH_INDEXES_PREFIX + '{0}').format(res_i)
+                    for res_i in self._meta.es_multi_index_search_resources
+                ]
+            )
+        return (settings.ELASTICSEARCH_INDEXES_PREFIX + '{0}').format(self._meta.resource_name)
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+    def map_search_ids(self, result_dict):
+        """
+        Replaces the document ids of the hits by the primary keys of their objects when the resource has an
+        ``es_join_column``, the hits with no object in the database are dropped.
+        """
+        id_matching_column = getattr(self._meta, 'es_join_column', None)
+        if not id_matching_column or not result_dict:
+            return result_dict
+        id_es_2_id_sql = {}
+        doc_id_2_django_id = self._meta.queryset\
+            .filter(**{id_matching_column + '__in': list(result_dict.keys())})\
+            .values_list(id_matching_column, self._meta.queryset.model._meta.pk.name)
+        for id_pair_i in doc_id_2_django_id:
+            id_es_2_id_sql[id_pair_i[0]] = id_pair_i[1]
+
+        mapped_result_dict = OrderedDict()
+        for es_id, score in result_dict.items():
+            if es_id not in id_es_2_id_sql:
+                self.log.warning('Found {0} {1} with no id in the database.'.format(self._meta.resource_name, es_id))
+                continue
+            mapped_result_dict[id_es_2_id_sql[es_id]] = score
+        return mapped_result_dict
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+    def search_window(self, user_query, offset, size):
+        """
+        The scores of the hits ``offset`` to ``offset + size`` of a search by primary key, in rank order, and the total
+        number of hits. The first window is a single ElasticSearch request, the next ones are sliced from the ranking of
+        all the hits, fetched once per query (see ``search_ranking``).
+        """
+        ranking = self.search_ranking(user_query, fetch=offset > 0)
+        if ranking is not None:
+            return ranking.window(offset, size), ranking.hits
         try:
             es_conn = get_es_connection()
-            if not self._meta:
-                self.answerBadRequest('The _meta has not been configured for this endpoint.')
-            if not self._meta.resource_name:
-                self.answerBadRequest('The resource_name has not been configured for this endpoint.')
-            res_name = self._meta.resource_name
-            id_matching_column = getattr(self._meta, 'es_join_column', None)
-
-            if getattr(self._meta, 'es_multi_index_search_resources', None) is not None:
-                idx_name = ','.join(
-                    [
-                        (settings.ELASTICSEARCH_INDEXES_PREFIX + '{0}').format(res_i)
-                        for res_i in self._meta.es_multi_index_search_resources
-                    ]
-                )
-            else:
-                idx_name = (settings.ELASTICSEARCH_INDEXES_PREFIX + '{0}').format(res_name)
-
-            base_query = \
-            {
-                'track_total_hits': True,
-                '_source': False,
-                'query': {
-                    'multi_match': {
-                        'query': user_query,
-                        'fields': [
-                            '*.std_analyzed^1.6',
-                            '*.eng_analyzed^0.8',
-                            '*.ws_analyzed^1.4',
-                            '*.keyword^2',
-                            '*.lower_case_keyword^1.5',
-                            '*.alphanumeric_lowercase_keyword^1.3',
-                            '*.entity_id^2',
-                            '*.chembl_id^2',
-                        ]
-                     }
-                }
-            }
+            response = es_conn.search(index=self.search_index(), body=search_body(user_query, size=size,
+                                                                                    **{'from': offset}))
+            result_dict = OrderedDict((hit['_id'], hit_score(hit)) for hit in response['hits']['hits'])
+            return self.map_search_ids(result_dict), total_hits(response)
+        except:
+            self.log.error('Searching exception', exc_info=True, extra={'user_query': user_query, })
+            raise RuntimeError('Could not execute query on elasticsearch engine at {0}'
+                               .format(settings.ELASTICSEARCH_CONNECTION_URL))
 
+# ----------------------------------------------------------------------------------------------------------------------
+
+    def get_search_results(self, user_query):
+        """
+        The scores of all the hits of a search (up to ``SEARCH_MAX_RESULTS``) by primary key, in rank order, and the
+        number of documents ranked.
+        """
+        try:
+            es_conn = get_es_connection()
             search_results = elasticsearch.helpers.scan(
-                es_conn, query=base_query, index=idx_name, preserve_order=True, size=1000
+                es_conn, query=search_body(user_query), index=self.search_index(), preserve_order=True, size=1000
             )
             result_dict = OrderedDict()
-            i = 0
             for result_i in search_results:
-                if i >= max_results:
+                if len(result_dict) >= SEARCH_MAX_RESULTS:
                     break
-                doc_id = result_i['_id']
-                doc_score = result_i['_score']
-                if doc_score is None:
-                    doc_score = '-:-'.join([str(sort_i) for sort_i in result_i['sort']])
-                    # noinspection PyBroadException
-                    try:
-                        doc_score = float(doc_score)
-                    except:
-                        pass
-                result_dict[doc_id] = doc_score
-                i += 1
-
-            if id_matching_column:
-                id_es_2_id_sql = {}
-                doc_id_2_django_id = self._meta.queryset\
-                    .filter(**{id_matching_column + '__in': result_dict.keys()})\
-                    .values_list(id_matching_column, self._meta.queryset.model._meta.pk.name)
-                for id_pair_i in doc_id_2_django_id:
-                    id_es_2_id_sql[id_pair_i[0]] = id_pair_i[1]
-
-                mapped_result_dict = OrderedDict()
-                for es_id, score in result_dict.items():
-                    if es_id not in id_es_2_id_sql:
-                        self.log.warning('Found {0} {1} with no id in the database.'.format(res_name, es_id))
-                        continue
-                    mapped_result_dict[id_es_2_id_sql[es_id]] = score
-
-                result_dict = mapped_result_dict
-
-            return result_dict
+                result_dict[result_i['_id']] = hit_score(result_i)
+            return self.map_search_ids(result_dict), len(result_dict)
         except:
             self.log.error('Searching exception', exc_info=True, extra={'user_query': user_query, })
             raise RuntimeError('Could not execute query on elasticsearch engine at {0}'
                                .format(settings.ELASTICSEARCH_CONNECTION_URL))
 
+# ----------------------------------------------------------------------------------------------------------------------
+
+    def search_ranking(self, user_query, fetch=True):
+        """
+        The ``SearchRanking`` of all the hits of a search, cached once per query and resource and shared by its pages.
+        ``None`` if it is not cached and ``fetch`` is false.
+        """
+        cache_key = self.generate_cache_key('search', 'ranking', q=user_query)
+        get_failed = False
+        try:
+            ranking = self._meta.cache.get(cache_key)
+        except Exception:
+            ranking = None
+            get_failed = True
+            self.log.error('Caching get exception', exc_info=True, extra={'user_query': user_query, })
+        if ranking is not None or not fetch:
+            return ranking
+        ranking = SearchRanking.from_scores(*self.get_search_results(user_query))
+        if not get_failed:
+            try:
+                self._meta.cache.set(cache_key, ranking)
+            except Exception:
+                self.log.error('Caching set exception', exc_info=True, extra={'user_query': user_query, })
+        return ranking
+
 # ----------------------------------------------------------------------------------------------------------------------
 
     def check_user_search_query(self, user_query):
@@ -617,6 +757,11 @@ class ChemblModelResource(ModelResource):
 # ----------------------------------------------------------------------------------------------------------------------
 
     def search_source(self, bundle, **kwargs):
+        """
+        The objects matching the search query ``q``, ranked by ElasticSearch, see ``SearchResults``: only the windows
+        of hits sliced by the paginator are loaded. Filtered or ordered searches rank the hits in SQL, see
+        ``ranked_search_objects``.
+        """
 
         user_query = kwargs.get('q')
 
@@ -628,9 +773,8 @@ class ChemblModelResource(ModelResource):
             user_query = user_query.decode('utf-8')
 
         self.check_user_search_query(user_query)
+        user_query = user_query.lower()
 
-        queryset = self._meta.queryset
-        res = self.get_search_results(user_query.lower())
         filters = {}
 
         if hasattr(bundle.request, 'GET'):
@@ -639,22 +783,56 @@ class ChemblModelResource(ModelResource):
 
         # Update with the provided kwargs.
         filters.update(kwargs)
-        applicable_filters, distinct = self.build_filters(filters=filters)
+        applicable_filters = self.build_filters(filters=filters)
+        only = {key: value for key, value in applicable_filters.items() if key == 'only'}
+
+        def load(scores):
+            return self.search_objects(bundle, scores, dict(only), **kwargs)
+
+        order_bits = self.search_order_bits(kwargs)
+        if len(only) == len(applicable_filters) and order_bits in ([], ['-score']):
+            return SearchResults(lambda offset, size: self.search_window(user_query, offset, size), load)
+        ranking = self.search_ranking(user_query)
+        if not len(ranking):
+            return SearchResults(lambda offset, size: (OrderedDict(), 0), load, total=0)
+        ranked_pks, total = self.ranked_search_objects(bundle, ranking, applicable_filters, order_bits)
+        ranked = ranking.by_pk()
+
+        def fetch(offset, size):
+            pks = ranked_pks[offset:offset + size] if size else []
+            return OrderedDict(ranked[str(pk)] for pk in pks), total
+
+        return SearchResults(fetch, load, total=total)
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+    def search_order_bits(self, options):
+        """
+        The ``order_by`` (or ``sort_by``) values of a search.
+        """
+        parameter_name = 'order_by' if 'order_by' in options else 'sort_by'
+        if hasattr(options, 'getlist'):
+            order_bits = options.getlist(parameter_name, [])
+        else:
+            order_bits = options.get(parameter_name) or []
+        if isinstance(order_bits, str):
+            order_bits = [order_bits]
+        return list(order_bits)
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+    def ranked_search_objects(self, bundle, ranking, applicable_filters, order_bits):
+        """
+        The primary keys of the hits of a search passing the filters, ordered by the ``order_by`` fields and then by
+        rank (``score`` orders by rank too, ``-score`` meaning best first), and their number. On PostgreSQL the rank is
+        ordered in SQL and the window of a page is sliced from the queryset, elsewhere the hits are ordered in Python
+        (see ``SearchRanking.order``) and the list is sliced.
+        """
+        filters = {key: value for key, value in applicable_filters.items() if key != 'only'}
         try:
-            objects = self.chain_filters(queryset.filter(pk__in=list(res.keys())), applicable_filters)
-            if distinct:
-                to_defer = [f.name for f in objects.model._meta.fields if 'TextField' in f.__class__.__name__]
-                objects = objects.defer(*to_defer).distinct()
+            objects = self.chain_filters(self._meta.queryset.filter(pk__in=list(ranking.pks)), filters)
             objects = self.authorized_read_list(objects, bundle)
-            objects = self.prefetch_related(objects, **kwargs)
-            if list(res.keys()) and isinstance(list(res.keys())[0], int):
-                for obj in objects:
-                    obj.score = float(int(res[obj.pk]))
-            else:
-                for obj in objects:
-                    obj.score = float(res[str(obj.pk)])
-            return sorted(objects, key=lambda obj: obj.score, reverse=True)
-
+            total = objects.count()
         except TypeError as e:
             if 'invalid lookup' in e.message:
                 raise BadRequest(e.message)
@@ -668,6 +846,127 @@ class ChemblModelResource(ModelResource):
         except ValueError:
             raise BadRequest("Invalid resource lookup data provided (mismatched type).")
 
+        order_by_args = []
+        reverse = None
+        for order_by in order_bits:
+            if order_by in ('score', '-score'):
+                if reverse is None:
+                    reverse = order_by == 'score'
+                continue
+            sort_args = self.apply_sorting(objects, {'order_by': [order_by]}).query.order_by
+            # the rank tells apart all the hits, the fields after it do not change the order
+            if reverse is None:
+                order_by_args.extend(sort_args)
+        reverse = bool(reverse)
+        if connections[objects.db].vendor == 'postgresql':
+            rank = '-search_rank' if reverse else 'search_rank'
+            objects = objects.annotate(search_rank=SearchRank(ranking.pks)).order_by(*(order_by_args + [rank]))
+            return objects.values_list('pk', flat=True), total
+        rows = objects.order_by(*order_by_args).values_list('pk', *[arg.lstrip('-') for arg in order_by_args])
+        return ranking.order(rows, reverse), total
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+    def search_objects(self, bundle, scores, applicable_filters, **kwargs):
+        """
+        The objects of the primary keys of ``scores``, with their ``score``, in the same order.
+        """
+        pks = list(scores.keys())
+        objects = self.chain_filters(self._meta.queryset.filter(pk__in=pks), applicable_filters)
+        objects = self.authorized_read_list(objects, bundle)
+        objects = self.defer_heavy_fields(self.prefetch_related(objects, **kwargs), kwargs.get('include'))
+        # the document ids of the resources without es_join_column are strings
+        keys = {str(pk): pk for pk in pks}
+        positions = {str(pk): position for position, pk in enumerate(pks)}
+        # only the rows of a page, ordered as ranked
+        objects = sorted(objects, key=lambda obj: positions[str(obj.pk)])
+        for obj in objects:
+            pk = keys[str(obj.pk)]
+            obj.score = float(int(scores[pk])) if isinstance(pk, int) else float(scores[pk])
+        return objects
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+    def can_serve_search_from_source(self, request, params):
+        """
+        True if a search is served from the ``_source`` of the ElasticSearch documents, without SQL: the resource opts
+        in with ``Meta.es_source_search``, ``SEARCH_FROM_SOURCE`` is on and the search has no filters and is in rank
+        order (chemical formats need the objects), and its data does not need the objects (see ``source_servable``).
+        """
+        if not getattr(settings, 'SEARCH_FROM_SOURCE', False) or not getattr(self._meta, 'es_source_search', False):
+            return False
+        if not source_servable(self, ('all', 'search')):
+            return False
+        if request.format in ('mol', 'sdf', 'svg') or self.search_order_bits(params) not in ([], ['-score']):
+            return False
+        try:
+            applicable_filters = self.build_filters(filters=dict(params))
+        except (InvalidFilterError, BadRequest, ValueError):
+            # the ORM search reports the error
+            return False
+        return all(key == 'only' for key in applicable_filters)
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+    def source_search_window(self, user_query, offset, size, only=None, excluded=frozenset()):
+        """
+        The data of the bundles of the hits ``offset`` to ``offset + size`` of a search by document id, built from
+        their ``_source`` (see ``source_data``), and the total number of hits, in a single ElasticSearch request.
+        """
+        use_in = ('all', 'search')
+        try:
+            es_conn = get_es_connection()
+            body = search_body(user_query, size=size, _source=source_paths(self, use_in, only, excluded),
+                               **{'from': offset})
+            response = es_conn.search(index=self.search_index(), body=body)
+        except:
+            self.log.error('Searching exception', exc_info=True, extra={'user_query': user_query, })
+            raise RuntimeError('Could not execute query on elasticsearch engine at {0}'
+                               .format(settings.ELASTICSEARCH_CONNECTION_URL))
+        docs = OrderedDict()
+        for hit in response['hits']['hits']:
+            data = source_data(self, hit.get('_source') or {}, use_in, only, excluded)
+            if 'score' in data:
+                data['score'] = self.source_score(hit_score(hit))
+            docs[hit['_id']] = data
+        return docs, total_hits(response)
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+    def source_score(self, score):
+        """
+        The ``score`` of a hit served from its document, as ``search_objects`` sets it on the objects.
+        """
+        integer_pk = isinstance(self._meta.object_class._meta.pk.to_python('1'), int)
+        if getattr(self._meta, 'es_join_column', None) and integer_pk:
+            return float(int(score))
+        return float(score)
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+    def source_search_source(self, bundle, **kwargs):
+        """
+        The data provider of the searches served from the ElasticSearch documents, its objects are the data of the
+        bundles.
+        """
+        user_query = kwargs.get('q')
+        if not user_query:
+            raise BadRequest('No search query provided')
+        if not isinstance(user_query, str):
+            user_query = user_query.decode('utf-8')
+        self.check_user_search_query(user_query)
+        user_query = user_query.lower()
+        only = parse_only(kwargs.get('only'))
+        included = getattr(bundle.request, HEAVY_FIELDS_ATTRIBUTE, None)
+        excluded = frozenset(self.get_heavy_fields()) - included if included is not None else frozenset()
+        return SearchResults(lambda offset, size: self.source_search_window(user_query, offset, size, only, excluded),
+                             lambda docs: list(docs.values()))
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+    def cached_obj_get_source_search(self, bundle, **kwargs):
+        return self.list_cache_handler(self.source_search_source, page_size=self._meta.search_page_size,
+                                       cache_key_prefix='es_source:')(bundle, 'search', 'api_get_search', **kwargs)
 
 # ----------------------------------------------------------------------------------------------------------------------
 
@@ -675,7 +974,7 @@ class ChemblModelResource(ModelResource):
         objects = self.obj_get_list(bundle=bundle, **kwargs)
         sorted_objects = self.apply_sorting(objects, options=kwargs)
         sorted_objects = self.prefetch_related(sorted_objects, **kwargs)
-        return sorted_objects
+        return self.defer_heavy_fields(sorted_objects, kwargs.get('include'))
 
 # ----------------------------------------------------------------------------------------------------------------------
 
@@ -685,7 +984,8 @@ class ChemblModelResource(ModelResource):
 # ----------------------------------------------------------------------------------------------------------------------
 
     def cached_obj_get_search(self, bundle, **kwargs):
-        return self.list_cache_handler(self.search_source)(bundle, 'search', 'api_get_search', **kwargs)
+        return self.list_cache_handler(self.search_source, page_size=self._meta.search_page_size)(
+            bundle, 'search', 'api_get_search', **kwargs)
 
 # ----------------------------------------------------------------------------------------------------------------------
 
@@ -729,6 +1029,114 @@ class ChemblModelResource(ModelResource):
 
         return self.detail_cache_handler(self.obj_get)(bundle, 'detail', **kwargs)
 
+# ----------------------------------------------------------------------------------------------------------------------
+
+    def get_identifier_lookup(self, identifier_name):
+        """
+        Translates a detail identifier (``pk``, ``detail_uri_name`` or a resource field path) into a model lookup path,
+        the same way ``build_filters`` does. Returns ``None`` if it can not be resolved.
+        """
+        bits = identifier_name.split(LOOKUP_SEP)
+        field = self.fields.get(bits[0])
+        if field is None:
+            if identifier_name == 'pk':
+                return self._meta.object_class._meta.pk.attname
+            return identifier_name if identifier_name == self._meta.detail_uri_name else None
+        attribute = getattr(field, 'attribute', None)
+        if not attribute or not isinstance(attribute, str):
+            return None
+        if len(bits) == 1:
+            return attribute
+        if not getattr(field, 'is_related', False):
+            return None
+        rest = field.get_related_resource(None).get_identifier_lookup(LOOKUP_SEP.join(bits[1:]))
+        return None if rest is None else attribute + LOOKUP_SEP + rest
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+    def obj_get_many(self, bundle, lookup, values):
+        """
+        Fetches the objects whose ``lookup`` is one of ``values`` sharing the prefetches, with one query per chunk
+        of values the database backend can bind (see ``in_filter``).
+        """
+        objects = []
+        object_list = self.get_object_list(bundle.request)
+        field = identifier_field(self._meta.object_class, lookup)
+        for chunk in chunks(values, in_chunk_size(object_list.db)):
+            chunk_list = self.prefetch_related(object_list.filter(**in_filter(lookup, chunk, field, object_list.db)))
+            objects.extend(self.authorized_read_list(chunk_list, bundle))
+        return objects
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+    def cached_obj_get_many(self, bundle, identifier_name, identifiers, store=True):
+        """
+        A batched version of ``cached_obj_get``: one cache ``get_many`` for all the identifiers, then one ``__in``
+        query for the cache misses, which are cached unless ``store`` is False.
+        Identifiers that can not be matched in batch fall back to ``cached_obj_get``.
+        Returns a dictionary identifier -> object, identifiers not found are missing from it.
+        """
+        identifiers = list(OrderedDict.fromkeys(identifiers))
+        cache_keys = OrderedDict((identifier, self.generate_cache_key('detail', **{identifier_name: identifier}))
+                                 for identifier in identifiers)
+        try:
+            cached = self._cache_get_many(list(cache_keys.values()))
+            get_failed = False
+        except Exception:
+            cached = {}
+            get_failed = True
+            self.log.error('Caching get exception', exc_info=True, extra={'bundle': bundle.request.path, })
+
+        found = OrderedDict((identifier, cached[key]) for identifier, key in cache_keys.items()
+                            if cached.get(key) is not None)
+        missing = [identifier for identifier in identifiers if identifier not in found]
+        fallback = missing
+
+        model = self._meta.object_class
+        lookup = self.get_identifier_lookup(identifier_name) if missing else None
+        field = identifier_field(model, lookup) if lookup else None
+        if field is not None:
+            to_python = field.target_field.to_python if field.is_relation else field.to_python
+            values = OrderedDict()
+            fallback = []
+            for identifier in missing:
+                try:
+                    values[identifier] = to_python(identifier)
+                except ValidationError:
+                    fallback.append(identifier)
+            matches = {}
+            if values:
+                for obj in self.obj_get_many(bundle, lookup, list(set(values.values()))):
+                    matches.setdefault(path_value(obj, lookup), []).append(obj)
+            for identifier, value in values.items():
+                objs = matches.get(value, [])
+                if len(objs) > 1:
+                    # let obj_get report it the usual way
+                    fallback.append(identifier)
+                elif objs:
+                    found[identifier] = objs[0]
+                    if store and not get_failed:
+                        try:
+                            self._meta.cache.set(cache_keys[identifier], objs[0])
+                        except Exception:
+                            self.log.error('Caching set exception', exc_info=True,
+                                           extra={'bundle': bundle.request.path, })
+
+        for identifier in fallback:
+            try:
+                found[identifier], _ = self.cached_obj_get(bundle=bundle, **{identifier_name: identifier})
+            except (ObjectDoesNotExist, Unauthorized):
+                pass
+        return found
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+    def _cache_get_many(self, keys):
+        backend = getattr(self._meta.cache, 'cache', None)
+        if backend is not None and hasattr(backend, 'get_many'):
+            return backend.get_many(keys)
+        return dict((key, self._meta.cache.get(key)) for key in keys)
+
 # ----------------------------------------------------------------------------------------------------------------------
 
     def response(self, f):
@@ -768,14 +1176,22 @@ class ChemblModelResource(ModelResource):
             use_in = ['all', 'list' if for_list else 'detail']
         else:
             use_in = ['all', 'search']
-        only = kwargs.get('only')
-        if only and isinstance(only, str):
-            only = [x.strip() for x in only.split(',')]
+        only = parse_only(kwargs.get('only'))
+        only_stack = None
+        if only is not None and bundle.request is not None:
+            only_stack = getattr(bundle.request, ONLY_STACK_ATTRIBUTE, None)
+            if only_stack is None:
+                only_stack = []
+                setattr(bundle.request, ONLY_STACK_ATTRIBUTE, only_stack)
+        included = getattr(bundle.request, HEAVY_FIELDS_ATTRIBUTE, None)
+        heavy = getattr(self._meta, 'heavy_fields', ()) if included is not None else ()
 
         # Dehydrate each field.
         for field_name, field_object in list(self.fields.items()):
             # If it's not for use in this mode, skip
-            if only and all([field_name not in x for x in only]):
+            if only is not None and field_name not in only:
+                continue
+            if field_name in heavy and field_name not in included:
                 continue
             field_use_in = getattr(field_object, 'use_in', 'all')
             if callable(field_use_in):
@@ -790,7 +1206,15 @@ class ChemblModelResource(ModelResource):
                 field_object.api_name = self._meta.api_name
                 field_object.resource_name = self._meta.resource_name
 
-            bundle.data[field_name] = field_object.dehydrate(bundle, for_list=for_list)
+            if only_stack is not None and getattr(field_object, 'is_related', False):
+                # the nested resources pick their part of the ``only`` tree in ``dehydrate_related``
+                only_stack.append(only[field_name])
+                try:
+                    bundle.data[field_name] = field_object.dehydrate(bundle, for_list=for_list)
+                finally:
+                    only_stack.pop()
+            else:
+                bundle.data[field_name] = field_object.dehydrate(bundle, for_list=for_list)
 
             # Check for an optional method to do further dehydration.
             method = getattr(self, "dehydrate_%s" % field_name, None)
@@ -803,18 +1227,31 @@ class ChemblModelResource(ModelResource):
 
 # ----------------------------------------------------------------------------------------------------------------------
 
-    def serialise_list(self,f, for_list, for_search):
+    def serialise_list(self,f, for_list, for_search, from_source=False):
 
         def handler(request, base_bundle, **kwargs):
+            included = self.requested_heavy_fields(request, kwargs)
+            if included is not None:
+                setattr(request, HEAVY_FIELDS_ATTRIBUTE, included)
+                # the cached pages differ by the columns loaded
+                kwargs.pop('include', None)
+                if included:
+                    kwargs['include'] = ','.join(sorted(included))
             to_be_serialized, in_cache = f(bundle=base_bundle,
                                            **self.remove_api_resource_names(kwargs))
 
             # Dehydrate the bundles in preparation for serialization.
             bundles = []
 
-            for obj in to_be_serialized[self._meta.collection_name]:
-                bundle = self.build_bundle(obj=obj, request=request)
-                bundles.append(self.full_dehydrate(bundle, for_list=for_list, for_search=for_search, **kwargs))
+            if from_source:
+                # already dehydrated, see ``source_search_source``
+                bundles = [self.build_bundle(data=data, request=request)
+                           for data in to_be_serialized[self._meta.collection_name]]
+            else:
+                with detect_lazy_loads(self._meta.resource_name):
+                    for obj in to_be_serialized[self._meta.collection_name]:
+                        bundle = self.build_bundle(obj=obj, request=request)
+                        bundles.append(self.full_dehydrate(bundle, for_list=for_list, for_search=for_search, **kwargs))
 
             to_be_serialized[self._meta.collection_name] = bundles
             to_be_serialized = self.alter_list_data_to_serialize(request, to_be_serialized)
@@ -829,9 +1266,26 @@ class ChemblModelResource(ModelResource):
         return self.serialise_list(self.cached_obj_get_list, for_list=True, for_search=False)(
                                                     request, base_bundle, **self.remove_api_resource_names(kwargs))
 
+# ----------------------------------------------------------------------------------------------------------------------
+
+    def get_read_table(self):
+        """
+        The ``ReadTableResource`` named by ``Meta.read_table``, when ``READ_TABLES`` is on and its table is built.
+        """
+        path = getattr(self._meta, 'read_table', None)
+        if not path or not getattr(settings, 'READ_TABLES', False):
+            return None
+        if self._read_table is None:
+            self._read_table = import_string(path)()
+            self._read_table._meta.api_name = self._meta.api_name
+        return self._read_table if self._read_table.is_available() else None
+
 # ----------------------------------------------------------------------------------------------------------------------
 
     def get_list(self, request, **kwargs):
+        read_table = self.get_read_table()
+        if read_table is not None and read_table.can_serve(kwargs):
+            return read_table.get_list(request, **kwargs)
         return self.response(self.get_list_impl)(request, **kwargs)
 
 # ----------------------------------------------------------------------------------------------------------------------
@@ -840,9 +1294,17 @@ class ChemblModelResource(ModelResource):
         return self.serialise_list(self.cached_obj_get_search, for_list=False, for_search=True)(
                                                     request, base_bundle, **self.remove_api_resource_names(kwargs))
 
+# ----------------------------------------------------------------------------------------------------------------------
+
+    def get_source_search_impl(self, request, base_bundle, **kwargs):
+        return self.serialise_list(self.cached_obj_get_source_search, for_list=False, for_search=True,
+                                   from_source=True)(request, base_bundle, **self.remove_api_resource_names(kwargs))
+
 # ----------------------------------------------------------------------------------------------------------------------
 
     def get_search(self, request, **kwargs):
+        if self.can_serve_search_from_source(request, kwargs):
+            return self.response(self.get_source_search_impl)(request, **kwargs)
         return self.response(self.get_search_impl)(request, **kwargs)
 
 # ----------------------------------------------------------------------------------------------------------------------
@@ -936,16 +1398,13 @@ class ChemblModelResource(ModelResource):
         #         ...
         #     }
         # Accepts the filters as a dict. None by default, meaning no filters.
-        distinct = False
         if filters is None:
             filters = {}
         filters = self.preprocess_filters(filters, for_cache_key)
         qs_filters = {}
 
         for filter_expr, value in filters.items():
-            filter_bits = filter_expr.split(LOOKUP_SEP)
-            field_name = filter_bits.pop(0)
-            filter_type = 'exact'
+            field_name = filter_expr.split(LOOKUP_SEP)[0]
 
             if not field_name in self.fields:
                 # This is required for the dispatch_detail functionality
@@ -959,93 +1418,179 @@ class ChemblModelResource(ModelResource):
                     else:
                         qs_filters[filter_expr] = [value]
                 continue
-            # do not validate django fields if for cache_key
-            if not for_cache_key:
-                current_resource = self
-
-                resource_field_filter_bits = filter_expr.split(LOOKUP_SEP)
-
-                invalid_path_error_msg = "The path '{}' is not valid in the filter expression '{}'."
-
-                for field_path_i in resource_field_filter_bits:
-                    # Checks that the current path is a valid path
-                    if field_path_i not in current_resource.fields:
-                        raise InvalidFilterError(invalid_path_error_msg.format(field_path_i, filter_expr))
-                    if len(resource_field_filter_bits) > 1 and field_path_i == resource_field_filter_bits[-2]:
-                        # check the last part of the filtering expression is an Django SQL filter,
-                        # and the current one is a field
-                        django_field_name = current_resource.fields[field_path_i].attribute
-                        try:
-                            # Django model get_field does not require the _set ending
-                            if django_field_name.endswith('_set'):
-                                django_field_name = django_field_name[:-4]
-                            field_name_parts = django_field_name.split(LOOKUP_SEP)
-                            # This fixes the validation for fields that belong in related models
-                            current_model = current_resource._meta.object_class
-                            for field_part_i in field_name_parts[:-1]:
-                                current_model = current_model._meta.get_field(field_part_i).related_model
-                            django_field = current_model._meta.get_field(field_name_parts[-1])
-                            if hasattr(django_field, 'field'):
-                                django_field = django_field.field
-
-                            # Obtains the possible query terms for this field
-                            query_terms = django_field.get_lookups().keys()
-                            # TODO: Hack fix to filter chembl_ids using char filters
-                            if field_path_i.endswith('chembl_id'):
-                                query_terms = list(query_terms) + CHAR_FILTERS
-
-                            # checks if the last bit is a filter available for the current field
-                            # and removes it from the filter bits
-                            if resource_field_filter_bits[-1] in query_terms:
-                                filter_type = filter_bits.pop()
-                                break
-                        except:
-                            raise InvalidFilterError("The '{}' field is not a valid field name".format(field_path_i))
-                    if field_path_i != resource_field_filter_bits[-1]:
-                        current_resource = current_resource.fields[field_path_i].get_related_resource(None)
-
             # do not validate filters if it is requested for cache key generation
-            if not for_cache_key:
-                try:
-                    lookup_bits = self.check_filtering(field_name, filter_type, filter_bits)
-                except InvalidFilterError:
-                    if ignore_bad_filters:
-                        continue
-                    else:
-                        raise
-                if any([x.endswith('_set') for x in lookup_bits]):
-                    distinct = True
-                    lookup_bits = [x[0:-4] if x.endswith('_set') else x for x in lookup_bits]
-                value = self.filter_value_to_python(value, field_name, filters, filter_expr, filter_type)
-
-                db_field_name = LOOKUP_SEP.join(lookup_bits)
-                qs_filter = "%s%s%s" % (db_field_name, LOOKUP_SEP, filter_type)
-                qs_filters[qs_filter] = value
-            else:
+            if for_cache_key:
                 qs_filters[filter_expr] = value
+                continue
+            plan = self.get_filter_plan(filter_expr, ignore_bad_filters=ignore_bad_filters)
+            if plan is None:
+                continue
+            qs_filters[plan.qs_filter] = plan.to_python(value, filters, filter_expr)
+
+        return dict_strip_unicode_keys(qs_filters)
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+    def get_filter_plan(self, filter_expr, ignore_bad_filters=False):
+        """
+        Returns the memoized ``FilterPlan`` of a filter expression, compiling it on first use.
+        Invalid expressions raise ``InvalidFilterError`` (or return ``None`` for filters that are not allowed if
+        ``ignore_bad_filters``) and are not memoized.
+        """
+        plan = self._filter_plans.get(filter_expr)
+        if plan is None:
+            field_name, filter_type, filter_bits = self.validate_filter_path(filter_expr)
+            try:
+                lookup_bits = self.check_filtering(field_name, filter_type, filter_bits)
+            except InvalidFilterError:
+                if ignore_bad_filters:
+                    return None
+                raise
+            plan = FilterPlan(field_name, filter_type, lookup_bits)
+            self._filter_plans[filter_expr] = plan
+        return plan
 
-        return dict_strip_unicode_keys(qs_filters), distinct
+# ----------------------------------------------------------------------------------------------------------------------
+
+    def validate_filter_path(self, filter_expr):
+        """
+        Checks every bit of a filter expression is a resource field (following related resources) and splits it into
+        the field name, the lookup type and the remaining related field names.
+        """
+        filter_bits = filter_expr.split(LOOKUP_SEP)
+        field_name = filter_bits.pop(0)
+        filter_type = 'exact'
+        current_resource = self
+
+        resource_field_filter_bits = filter_expr.split(LOOKUP_SEP)
+
+        invalid_path_error_msg = "The path '{}' is not valid in the filter expression '{}'."
+
+        for field_path_i in resource_field_filter_bits:
+            # Checks that the current path is a valid path
+            if field_path_i not in current_resource.fields:
+                raise InvalidFilterError(invalid_path_error_msg.format(field_path_i, filter_expr))
+            if len(resource_field_filter_bits) > 1 and field_path_i == resource_field_filter_bits[-2]:
+                # check the last part of the filtering expression is an Django SQL filter,
+                # and the current one is a field
+                django_field_name = current_resource.fields[field_path_i].attribute
+                try:
+                    # Django model get_field does not require the _set ending
+                    if django_field_name.endswith('_set'):
+                        django_field_name = django_field_name[:-4]
+                    field_name_parts = django_field_name.split(LOOKUP_SEP)
+                    # This fixes the validation for fields that belong in related models
+                    current_model = current_resource._meta.object_class
+                    for field_part_i in field_name_parts[:-1]:
+                        current_model = current_model._meta.get_field(field_part_i).related_model
+                    django_field = current_model._meta.get_field(field_name_parts[-1])
+                    if hasattr(django_field, 'field'):
+                        django_field = django_field.field
+
+                    # Obtains the possible query terms for this field
+                    query_terms = django_field.get_lookups().keys()
+                    # TODO: Hack fix to filter chembl_ids using char filters
+                    if field_path_i.endswith('chembl_id'):
+                        query_terms = list(query_terms) + CHAR_FILTERS
+
+                    # checks if the last bit is a filter available for the current field
+                    # and removes it from the filter bits
+                    if resource_field_filter_bits[-1] in query_terms:
+                        filter_type = filter_bits.pop()
+                        break
+                except:
+                    raise InvalidFilterError("The '{}' field is not a valid field name".format(field_path_i))
+            if field_path_i != resource_field_filter_bits[-1]:
+                current_resource = current_resource.fields[field_path_i].get_related_resource(None)
+        return field_name, filter_type, filter_bits
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+    def prebuild_filter_plans(self):
+        """
+        Compiles the plans of the filters declared in ``Meta.filtering`` up front: every allowed lookup type of the
+        fields with an explicit whitelist, the exact match of the others.
+        """
+        for field_name, filter_types in self._meta.filtering.items():
+            expressions = [field_name]
+            if filter_types not in (ALL, ALL_WITH_RELATIONS):
+                expressions += [field_name + LOOKUP_SEP + filter_type for filter_type in filter_types]
+            for filter_expr in expressions:
+                try:
+                    self.get_filter_plan(filter_expr)
+                except Exception as e:
+                    # reported to the client when the filter is used
+                    self.log.debug('Filter %s of %s can not be compiled: %r', filter_expr, self._meta.resource_name, e)
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+    def get_relation_plan(self, only=None):
+        """
+        Returns the ``RelationPlan`` derived from the field attributes, optionally restricted to the ``only`` tree.
+        Plans are built lazily (related resources may not be importable at construction time) and memoized.
+        """
+        key = freeze_only(only)
+        plan = self._relation_plans.get(key)
+        if plan is None:
+            plan = build_relation_plan(self, only=only)
+            self._relation_plans[key] = plan
+        return plan
 
 # ----------------------------------------------------------------------------------------------------------------------
 
     def prefetch_related(self, objects, **kwargs):
-        only = kwargs.get('only')
-        if only and not isinstance(only, list):
-            only = [x.strip().split(LOOKUP_SEP)[0] for x in only.split(',')]
-        related_fields = getattr(self._meta, 'prefetch_related', None)
-        if only and all([not self.fields[field].is_m2m for field in only if field in self.fields]):
-            only = list_flatten(only)
-            only_related = set([self.fields[field].attribute for field in only if ((field in self.fields) and
-                                                                                   (getattr(self.fields[field], 'is_related', False)))])
-            related_attrs = set([field if isinstance(field, str) else
-                                 field.prefetch_through for field in related_fields])
-            intersection = only_related & related_attrs
-            if intersection:
-                return objects.prefetch_related(*list(intersection))
-            return objects
-        if not related_fields:
-            return objects
-        return objects.prefetch_related(*self._meta.prefetch_related)
+        only = parse_only(kwargs.get('only'))
+        related_fields = getattr(self._meta, 'prefetch_related', None) or []
+        plan = self.get_relation_plan(only)
+        if only is not None:
+            # keep the declared prefetches on the path of a requested relation, add the derived ones not declared
+            needed = plan.prefetch_related | plan.select_related
+            related_fields = [field for field in related_fields
+                              if any(path == prefetch_path(field) or
+                                     path.startswith(prefetch_path(field) + LOOKUP_SEP) or
+                                     prefetch_path(field).startswith(path + LOOKUP_SEP) for path in needed)]
+        # the relations derived from the field attributes complete the declared ones, omissions would be N+1 queries
+        declared = [prefetch_path(field) for field in related_fields]
+        related_fields = list(related_fields) + [path for path in plan.prefetch_paths()
+                                                 if not any(d == path or d.startswith(path + LOOKUP_SEP)
+                                                            for d in declared)]
+
+        select_related = getattr(self._meta, 'select_related', True)
+        # joining on top of a DISTINCT query would drag the related (possibly LOB) columns into the DISTINCT
+        if not select_related or not hasattr(objects, 'query') or objects.query.distinct:
+            declared = [prefetch_path(field) for field in related_fields]
+            related_fields += [path for path in plan.select_paths()
+                               if not any(d == path or d.startswith(path + LOOKUP_SEP) for d in declared)]
+            related_fields = [widen_prefetch(field, plan) for field in related_fields]
+            if not related_fields:
+                return objects
+            return objects.prefetch_related(*related_fields)
+
+        model = objects.model
+        select_paths = set(plan.select_paths() if select_related is True else select_related)
+        columns = set(plan.columns)
+        to_prefetch = []
+        for field in related_fields:
+            path = prefetch_path(field)
+            if is_to_one_path(model, path):
+                path = to_select_path(model, path)
+                if path not in plan.select_related:
+                    select_paths.add(path)
+                    # not enumerated by the plan, the declared relation is loaded as a whole
+                    columns.update(select_columns(model, path))
+            else:
+                to_prefetch.append(field)
+
+        if select_paths:
+            objects = objects.select_related(*select_paths)
+            deferred_fields, defer = objects.query.deferred_loading
+            if select_related is True and defer and not deferred_fields:
+                # project the joined tables on the columns the resource actually needs
+                columns.update(f.name for f in model._meta.concrete_fields)
+                objects = objects.only(*columns)
+        if to_prefetch:
+            objects = objects.prefetch_related(*to_prefetch)
+        return objects
 
 # ----------------------------------------------------------------------------------------------------------------------
 
@@ -1057,11 +1602,11 @@ class ChemblModelResource(ModelResource):
         the instance.
         """
         try:
-            applicable_filters, distinct = self.build_filters(filters=kwargs)
+            identifier = self.detail_identifier(kwargs)
+            if identifier is not None:
+                return self.obj_get_by_identifier(bundle, *identifier, **kwargs)
+            applicable_filters = self.build_filters(filters=kwargs)
             object_list = self.chain_filters(self.get_object_list(bundle.request), applicable_filters)
-            if distinct:
-                to_defer = [f.name for f in object_list.model._meta.fields if 'TextField' in f.__class__.__name__]
-                object_list = object_list.defer(*to_defer).distinct()
             object_list = self.prefetch_related(object_list, **kwargs)
             stringified_kwargs = ', '.join(["%s=%s" % (k, v) for k, v in list(kwargs.items())])
 
@@ -1078,22 +1623,118 @@ class ChemblModelResource(ModelResource):
         except ValueError:
             raise ImmediateHttpResponse(response=http.HttpNotFound())
 
+# ----------------------------------------------------------------------------------------------------------------------
+
+    def detail_identifier(self, kwargs):
+        """
+        Returns ``(lookup, value)`` when ``kwargs`` only select an object by ``pk`` or ``detail_uri_name`` (a column
+        reached through to-one relations), ``None`` when they need the generic ``build_filters`` path.
+        """
+        if not getattr(self._meta, 'detail_fast_path', False):
+            return None
+        names = [name for name in set(('pk', self._meta.detail_uri_name)) if name in kwargs]
+        if len(names) != 1:
+            return None
+        name = names[0]
+        # any other resource field in the parameters is a filter
+        others = dict((key, value) for key, value in kwargs.items() if key not in (name, 'only'))
+        if others and any(key.split(LOOKUP_SEP)[0] in self.fields
+                          for key in self.preprocess_filters(others, for_cache_key=True)):
+            return None
+        lookup = self.get_identifier_lookup(name)
+        field = identifier_field(self._meta.object_class, lookup) if lookup else None
+        if field is None:
+            return None
+        try:
+            value = (field.target_field if field.is_relation else field).to_python(kwargs[name])
+        except ValidationError:
+            return None
+        return lookup, value
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+    def obj_get_by_identifier(self, bundle, lookup, value, **kwargs):
+        """
+        ``obj_get`` for an identifier: a single query, with the resource joins and prefetches, reading at most two rows
+        (enough to tell a unique match from several).
+        """
+        object_list = self.get_object_list(bundle.request).filter(**{lookup: value})
+        object_list = self.prefetch_related(self.project_only(object_list, kwargs.get('only')), **kwargs)
+        objects = list(object_list[:2])
+        if not objects:
+            raise ObjectDoesNotExist("Couldn't find an instance of '%s' which matched '%s=%s'." %
+                                     (self._meta.object_class.__name__, lookup, value))
+        elif len(objects) > 1:
+            raise MultipleObjectsReturned("More than '%s' matched '%s=%s'." %
+                                          (self._meta.object_class.__name__, lookup, value))
+        bundle.obj = objects[0]
+        self.authorized_read_detail(objects, bundle)
+        return bundle.obj
+
 # ----------------------------------------------------------------------------------------------------------------------
 
     def chain_filters(self, query, applicable_filters):
-        only = applicable_filters.get('only')
-        if only:
-            del applicable_filters['only']
-            if isinstance(only, str):
-                only = only.split(',')
-            only = list(set(list_flatten(only)))
+        only = parse_only(applicable_filters.pop('only', None))
         ret = query
         list_filters = self.normalise_filters(applicable_filters)
         for filtr in list_filters:
-            ret = ret.filter(**filtr)
-        if only and all([not self.fields[field].is_m2m for field in only if field in self.fields]):
-            ret = ret.only(*[self.fields[field].attribute for field in only if field in self.fields])
-        return ret
+            ret = filter_to_many(ret, filtr)
+        return self.project_only(ret, only)
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+    def project_only(self, objects, only):
+        """
+        Restricts the loaded columns to the ones needed by the fields in the ``only`` tree.
+        """
+        only = parse_only(only)
+        if only is None:
+            return objects
+        plan = self.get_relation_plan(only)
+        return objects.only(*(plan.columns | {objects.model._meta.pk.name}))
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+    def get_heavy_fields(self):
+        """
+        The heavy fields of the resource and of its nested resources with the paths of their columns, derived lazily
+        like the relation plans.
+        """
+        if self._heavy_fields is None:
+            self._heavy_fields = heavy_fields(self)
+        return self._heavy_fields
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+    def requested_heavy_fields(self, request, params):
+        """
+        The heavy fields a list request asks for by name, in ``include`` (``include=molfile``) or in ``only``. The
+        other ones are left out of the list and their columns are not loaded. ``None`` when ``DEFER_HEAVY_FIELDS`` is
+        off, the lists then have every field.
+        """
+        if not getattr(settings, 'DEFER_HEAVY_FIELDS', True):
+            return None
+        names = only_names(parse_only(params.get('include'))) | only_names(parse_only(params.get('only')))
+        return frozenset(name for name in names if name in self.get_heavy_fields())
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+    def defer_heavy_fields(self, objects, include):
+        """
+        Defers the columns of the heavy fields not named in ``include`` on a list queryset, and on the declared
+        prefetches loading them.
+        """
+        if not getattr(settings, 'DEFER_HEAVY_FIELDS', True) or not hasattr(objects, 'query'):
+            return objects
+        included = only_names(parse_only(include))
+        paths = set()
+        for name, columns in self.get_heavy_fields().items():
+            if name not in included:
+                paths |= columns
+        if not paths:
+            return objects
+        lookups = [defer_prefetch(lookup, paths) for lookup in objects._prefetch_related_lookups]
+        return objects.prefetch_related(None).prefetch_related(*lookups).defer(*sorted(paths))
 
 # ----------------------------------------------------------------------------------------------------------------------
 
@@ -1149,13 +1790,13 @@ class ChemblModelResource(ModelResource):
 
         # Update with the provided kwargs.
         filters.update(kwargs)
-        applicable_filters, distinct = self.build_filters(filters=filters)
+        applicable_filters = self.build_filters(filters=filters)
+        if getattr(settings, 'FILTER_TELEMETRY', False):
+            bundle.request.filter_shape = self.filter_shape(filters, applicable_filters)
 
         try:
             objects = self.apply_filters(bundle.request, applicable_filters)
-            if distinct:
-                to_defer = [f.name for f in objects.model._meta.fields if 'TextField' in f.__class__.__name__]
-                objects = objects.defer(*to_defer).distinct()
+            self.check_query_cost(bundle.request, filters, objects)
             return self.authorized_read_list(objects, bundle)
         except TypeError as e:
             if e.message.startswith('Related Field has invalid lookup:') \
@@ -1168,37 +1809,122 @@ class ChemblModelResource(ModelResource):
 
 # ----------------------------------------------------------------------------------------------------------------------
 
-    def filter_value_to_python(self, value, field_name, filters, filter_expr, filter_type):
-        if value in ['true', 'True', True]:
-            value = True
-        elif value in ['false', 'False', False]:
-            value = False
-        elif value in ('nil', 'none', 'None', None):
-            value = None
+    def filter_shape(self, filters, applicable_filters):
+        """
+        The ORM lookups a list filters on, without their values, and a sample of the filters it was asked for.
+        """
+        lookups = [key for key in applicable_filters if key not in ('only', 'pk')]
+        sample = {key: value for key, value in filters.items()
+                  if key.split(LOOKUP_SEP)[0] in self.fields or key in ('order_by', 'sort_by')}
+        return lookups, sample
 
-        # Split on ',' if not empty string and either an in or range filter.
-        if filter_type in ('in', 'range') and len(value):
-            if hasattr(filters, 'getlist'):
-                value = []
+# ----------------------------------------------------------------------------------------------------------------------
 
-                for part in filters.getlist(filter_expr):
-                    if isinstance(part, str):
-                        value.extend(part.split(','))
-                    else:
-                        if len(part) == 1 and isinstance(part[0], str):
-                            value.extend(part[0].split(','))
-                        else:
-                            value.extend(part)
-            else:
-                if isinstance(value, str):
-                    value = value.split(',')
-                elif type(value) in (list, tuple) and len(value) == 1 and isinstance(value[0], str):
-                    value = value[0].split(',')
-        if filter_type == 'range':
-            if len(value) != 2 or not represents_int(value[0]) or not represents_int(value[1]):
-                raise BadRequest(
-                    "Invalid range: should consist of two integers separated by comma, got {0} instead.".format(value))
-        return value
+    def record_filter_shape(self, request, objects, seconds):
+        """
+        Adds the time spent querying a list to the telemetry of its filter shape, read by ``advise_indexes``.
+        """
+        shape = getattr(request, 'filter_shape', None)
+        if shape is None or isinstance(objects, list):
+            return
+        lookups, sample = shape
+        ordering = [str(order_by) for order_by in objects.query.order_by]
+        filter_telemetry.record(self._meta.resource_name, self._meta.object_class._meta.label, lookups, ordering,
+                                sample, seconds)
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+    def check_query_cost(self, request, filters, objects):
+        """
+        Pre-flight check of a filtered list against ``Meta.max_query_cost``, using the planner estimate (EXPLAIN) of
+        the query. Over the limit the request is rejected, pointing to the costliest filter, or, with
+        ``Meta.query_cost_action = 'estimate_count'``, the list is served with the estimated number of rows as its
+        ``total_count`` instead of counting them, flagged by ``total_count_estimated`` in the meta.
+        """
+        max_cost = getattr(self._meta, 'max_query_cost', None)
+        if not max_cost or not getattr(settings, 'QUERY_COST_GUARD', False):
+            return
+        field_filters = {key: value for key, value in filters.items() if key.split(LOOKUP_SEP)[0] in self.fields}
+        if not field_filters:
+            return
+        estimate = self.cached_query_estimate(field_filters, objects)
+        if estimate is None or estimate[0] <= max_cost:
+            return
+        cost, rows = estimate
+        action = getattr(self._meta, 'query_cost_action', 'reject')
+        if action not in COST_ACTIONS:
+            raise ValueError("Unknown query_cost_action '{0}', expected one of {1}.".format(action, COST_ACTIONS))
+        if action == 'estimate_count':
+            request.estimated_count = rows
+            return
+        raise BadRequest("This query is estimated to be too expensive to run ({0:.0f} over a limit of {1:.0f}), mostly "
+                         "because of the filter '{2}'. Please use more selective filters."
+                         .format(cost, max_cost, self.costliest_filter(request, field_filters)))
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+    def cached_query_estimate(self, filters, objects):
+        """
+        ``estimate_query`` of the list filtered by ``filters``, cached by canonical filter set.
+        """
+        estimate = self.get_cached_estimate(filters)
+        if estimate is not None:
+            return estimate or None
+        return self.store_query_estimate(filters, objects)
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+    def get_cached_estimate(self, filters):
+        """
+        The estimate of the list filtered by ``filters`` cached by ``cached_query_estimate``: ``(cost, rows)``, an empty
+        tuple when the backend gives no estimate or ``None`` when nothing is cached.
+        """
+        cache_key = self.generate_cache_key('cost', **filters)
+        try:
+            return self._meta.cache.get(cache_key)
+        except Exception:
+            self.log.error('Caching get exception', exc_info=True, extra={'cache_key': cache_key, })
+            return None
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+    def store_query_estimate(self, filters, objects):
+        """
+        Runs ``estimate_query`` on ``objects`` (the list filtered by ``filters``) and caches the estimate.
+        """
+        cache_key = self.generate_cache_key('cost', **filters)
+        try:
+            estimate = estimate_query(objects)
+        except DatabaseError:
+            self.log.warning('Could not estimate the cost of %s', cache_key, exc_info=True)
+            return None
+        try:
+            # an empty tuple remembers the backend gives no estimate
+            self._meta.cache.set(cache_key, estimate or ())
+        except Exception:
+            self.log.error('Caching set exception', exc_info=True, extra={'cache_key': cache_key, })
+        return estimate
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+    def costliest_filter(self, request, filters):
+        """
+        The filter expression whose query, alone, has the highest estimated cost. The cached estimates are used as they
+        are, at most ``QUERY_COST_FILTER_EXPLAINS`` other filters are estimated, the rest count as free.
+        """
+        if len(filters) == 1:
+            return next(iter(filters))
+        explains = getattr(settings, 'QUERY_COST_FILTER_EXPLAINS', 3)
+        costs = {}
+        for filter_expr in sorted(filters):
+            filter_set = {filter_expr: filters[filter_expr]}
+            estimate = self.get_cached_estimate(filter_set)
+            if estimate is None and explains > 0:
+                explains -= 1
+                objects = self.apply_filters(request, self.build_filters(filters=filter_set))
+                estimate = self.store_query_estimate(filter_set, objects)
+            costs[filter_expr] = estimate[0] if estimate else 0
+        return max(sorted(costs), key=lambda filter_expr: costs[filter_expr])
 
 # ----------------------------------------------------------------------------------------------------------------------
 
@@ -1207,7 +1933,7 @@ class ChemblModelResource(ModelResource):
         Returns a serialized list of resources based on the identifiers
         from the URL.
 
-        Calls ``obj_get`` to fetch only the objects requested. This method
+        Calls ``cached_obj_get_many`` to fetch only the objects requested. This method
         only responds to HTTP GET.
 
         Should return a HttpResponse (200 OK).
@@ -1216,21 +1942,12 @@ class ChemblModelResource(ModelResource):
         self.is_authenticated(request)
         self.throttle_check(request)
 
-        # Rip apart the list then iterate.
+        # Rip apart the list then resolve all the identifiers at once.
         kwarg_name = '%s_list' % self._meta.detail_uri_name
         obj_identifiers = kwargs.get(kwarg_name, '').split(';')
-        objects = []
-        not_found = []
         base_bundle = self.build_bundle(request=request)
-
-        for identifier in obj_identifiers:
-            try:
-                obj, _ = self.cached_obj_get(bundle=base_bundle, **{self._meta.detail_uri_name: identifier})
-                bundle = self.build_bundle(obj=obj, request=request)
-                bundle = self.full_dehydrate(bundle, for_list=True, **kwargs)
-                objects.append(bundle)
-            except (ObjectDoesNotExist, Unauthorized):
-                not_found.append(identifier)
+        found = self.cached_obj_get_many(base_bundle, self._meta.detail_uri_name, obj_identifiers)
+        objects, not_found = self.dehydrate_multiple(request, found, obj_identifiers, **kwargs)
 
         object_list = {
             self._meta.collection_name: objects,
@@ -1242,6 +1959,143 @@ class ChemblModelResource(ModelResource):
         self.log_throttled_access(request)
         return self.create_response(request, object_list)
 
+# ----------------------------------------------------------------------------------------------------------------------
+
+    def dehydrate_multiple(self, request, found, identifiers, **kwargs):
+        """
+        Dehydrates the objects ``found`` (as returned by ``cached_obj_get_many``) in the order of ``identifiers``.
+        Returns the list of bundles and the list of identifiers not found.
+        """
+        objects = []
+        not_found = []
+        with detect_lazy_loads(self._meta.resource_name):
+            for identifier in identifiers:
+                if identifier not in found:
+                    not_found.append(identifier)
+                    continue
+                bundle = self.build_bundle(obj=found[identifier], request=request)
+                bundle = self.full_dehydrate(bundle, for_list=True, **kwargs)
+                objects.append(bundle)
+        return objects, not_found
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+    def parse_bulk_identifiers(self, request):
+        """
+        Reads the identifiers of a bulk request body: a JSON list or one identifier per line (plain or JSON strings).
+        """
+        try:
+            body = request.body.decode('utf-8')
+        except UnicodeDecodeError:
+            raise BadRequest('Request body is not valid UTF-8.')
+        if request.META.get('CONTENT_TYPE', '').startswith('application/json') or body.lstrip().startswith('['):
+            try:
+                identifiers = json.loads(body)
+            except ValueError:
+                raise BadRequest('Request is not valid JSON.')
+            if not isinstance(identifiers, list):
+                raise BadRequest('Expected a JSON list of identifiers.')
+        else:
+            identifiers = []
+            for line in body.splitlines():
+                line = line.strip()
+                if line.startswith('"'):
+                    try:
+                        line = json.loads(line)
+                    except ValueError:
+                        raise BadRequest('Invalid JSON string: {0}'.format(line))
+                identifiers.append(line)
+        identifiers = [str(identifier).strip() for identifier in identifiers if str(identifier).strip()]
+        if not identifiers:
+            raise BadRequest('No identifiers provided.')
+        max_identifiers = getattr(settings, 'BULK_LOOKUP_MAX_IDENTIFIERS', 50000)
+        if len(identifiers) > max_identifiers:
+            raise BadRequest('Too many identifiers, the maximum is {0}.'.format(max_identifiers))
+        return identifiers
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+    def get_bulk(self, request, **kwargs):
+        """
+        Returns the resources matching the identifiers sent in the POST body, in input order, followed by the
+        identifiers not found. The identifier is ``detail_uri_name`` unless an ``identifier`` parameter is given.
+
+        Identifiers are resolved ``BULK_LOOKUP_CHUNK_SIZE`` at a time and JSON responses are streamed chunk by chunk.
+        """
+        self.method_check(request, allowed=['post'])
+        self.is_authenticated(request)
+        self.throttle_check(request)
+
+        identifiers = self.parse_bulk_identifiers(request)
+        identifier_name = kwargs.pop('identifier', None) or self._meta.detail_uri_name
+        if identifier_name != self._meta.detail_uri_name:
+            # only identifiers the resource can be filtered on
+            self.build_filters(filters={identifier_name: identifiers[0]})
+        if identifier_name == 'chembl_id':
+            identifiers = [identifier.upper() for identifier in identifiers]
+        base_bundle = self.build_bundle(request=request)
+        self.log_throttled_access(request)
+
+        def resolve():
+            for chunk in chunks(identifiers, BULK_LOOKUP_CHUNK_SIZE):
+                found = self.cached_obj_get_many(base_bundle, identifier_name, chunk, store=False)
+                yield self.dehydrate_multiple(request, found, chunk, **kwargs)
+
+        if request.format not in (None, 'json'):
+            objects = []
+            not_found = []
+            for chunk_objects, chunk_not_found in resolve():
+                objects.extend(chunk_objects)
+                not_found.extend(chunk_not_found)
+            return self.create_response(request, {self._meta.collection_name: objects, 'not_found': not_found})
+
+        serializer = self._meta.serializer
+        chunks_resolved = resolve()
+        # resolved before the response status is sent, its errors are answered like those of the other views
+        first_objects, not_found = next(chunks_resolved)
+        alias = pinned_replica()
+
+        def stream():
+            separator = ''
+            # runs after wrap_view returned, outside of its statement timeout and replica pinning
+            previous_alias = pinned_replica()
+            pin_replica(alias)
+            try:
+                yield '{{"{0}": ['.format(self._meta.collection_name)
+                if first_objects:
+                    yield ', '.join(serializer.to_json(bundle) for bundle in first_objects)
+                    separator = ', '
+                try:
+                    with statement_timeout(request.statement_timeout):
+                        for chunk_objects, chunk_not_found in chunks_resolved:
+                            not_found.extend(chunk_not_found)
+                            if chunk_objects:
+                                yield separator + ', '.join(serializer.to_json(bundle) for bundle in chunk_objects)
+                                separator = ', '
+                except Exception as e:
+                    # the status is sent, the error ends the document instead
+                    self.log.error('Bulk lookup exception', exc_info=True, extra={'request': request, })
+                    eject_failed_replica(e)
+                    yield '], "not_found": {0}, "error_message": {1}}}'.format(
+                        json.dumps(not_found), json.dumps(self.stream_error_message(request, e)))
+                    return
+                yield '], "not_found": {0}}}'.format(json.dumps(not_found))
+            finally:
+                pin_replica(previous_alias)
+
+        return StreamingHttpResponse(stream(), content_type=build_content_type('application/json'))
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+    def stream_error_message(self, request, error):
+        """
+        The error message ending a streamed response that failed after its status was sent.
+        """
+        if isinstance(error, DatabaseError) and is_statement_timeout(error):
+            return self.statement_timeout_message(request)
+        return getattr(settings, 'TASTYPIE_CANNED_ERROR',
+                       "Sorry, this request could not be processed. Please try again later.")
+
 # ----------------------------------------------------------------------------------------------------------------------
 
     def _handle_500(self, request, exception):
@@ -1300,7 +2154,7 @@ class ChemblModelResource(ModelResource):
         cache_ordered_dict = OrderedDict()
         smooshed = []
 
-        filters, _ = self.build_filters(kwargs)
+        filters = self.build_filters(kwargs)
 
         parameter_name = 'order_by' if 'order_by' in kwargs else 'sort_by'
         if hasattr(kwargs, 'getlist'):
@@ -1315,6 +2169,7 @@ class ChemblModelResource(ModelResource):
         offset = kwargs.get('offset', '') if ('list' in args or 'search' in args) else ''
         query = kwargs.get('q', '') if 'search' in args else ''
         only = kwargs.get('only', '')
+        include = kwargs.get('include', '')
 
         for key, value in list(filters.items()):
             smooshed.append("%s=%s" % (key, value))
@@ -1325,6 +2180,7 @@ class ChemblModelResource(ModelResource):
         cache_ordered_dict['limit'] = str(limit)
         cache_ordered_dict['offset'] = str(offset)
         cache_ordered_dict['only'] = str(only)
+        cache_ordered_dict['include'] = str(include)
         cache_ordered_dict['query'] = query
         cache_ordered_dict['order'] = '|'.join(order_bits)
         cache_ordered_dict['filters'] = '|'.join(sorted(smooshed))
@@ -0,0 +1,216 @@
+__author__ = 'mnowotka'
+
+import os
+import sys
+import time
+import random
+import logging
+import threading
+from django.conf import settings
+from django.core.signals import got_request_exception
+from django.db import connections
+from django.db import DatabaseError
+from django.db import InterfaceError
+from django.db import OperationalError
+from chembl_webservices.core.timeouts import is_statement_timeout
+
+log = logging.getLogger(__name__)
+
+# Seconds the replica is behind its primary, 0 when it is not replaying (idle primary or not a standby).
+POSTGRES_LAG_SQL = "SELECT CASE WHEN pg_last_wal_receive_lsn() IS NULL " \
+                   "OR pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 " \
+                   "ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()) END"
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+
+class ReplicaPool(object):
+    """
+    Keeps track of the read replicas declared in ``settings.DATABASE_REPLICAS`` (alias -> weight): their health,
+    replication lag and the number of requests each one is serving in this process. Replicas are picked at random
+    according to their weight or, with ``DATABASE_REPLICA_SELECTION = 'least_connections'``, by the fewest requests
+    in flight relative to their weight.
+    Replicas are checked every ``DATABASE_REPLICA_CHECK_INTERVAL`` seconds by a thread of the process, out of the
+    requests. Unhealthy or lagging replicas, or replicas a request lost its connection to, are ejected for
+    ``DATABASE_REPLICA_EJECT_SECONDS``, when every replica is out reads go to ``default``.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.in_flight = {}
+        self.ejected_until = {}
+        self.checker = None
+        self.checker_pid = None
+
+    @property
+    def weights(self):
+        return getattr(settings, 'DATABASE_REPLICAS', {})
+
+    def healthy(self):
+        """
+        The replicas not ejected, from the results of the last health checks: no query is run.
+        """
+        self.start_checker()
+        now = time.time()
+        return [alias for alias, weight in self.weights.items()
+                if weight > 0 and self.ejected_until.get(alias, 0) <= now]
+
+    def choose(self):
+        """
+        Picks the replica serving the next request, ``default`` if none is available.
+        """
+        candidates = self.healthy()
+        if not candidates:
+            return 'default'
+        if getattr(settings, 'DATABASE_REPLICA_SELECTION', 'weighted') == 'least_connections':
+            # normalised by the weight, ties broken at random so the processes do not all pick the same replica
+            return min(candidates, key=lambda alias: ((self.in_flight.get(alias, 0) + 1) / self.weights[alias],
+                                                      random.random()))
+        return random.choices(candidates, weights=[self.weights[alias] for alias in candidates])[0]
+
+    def acquire(self, alias):
+        with self.lock:
+            self.in_flight[alias] = self.in_flight.get(alias, 0) + 1
+
+    def release(self, alias):
+        with self.lock:
+            self.in_flight[alias] = max(self.in_flight.get(alias, 0) - 1, 0)
+
+    def eject(self, alias, reason):
+        if alias not in self.weights:
+            return
+        seconds = getattr(settings, 'DATABASE_REPLICA_EJECT_SECONDS', 30)
+        with self.lock:
+            # the checker thread and the requests may eject the same replica at once
+            now = time.time()
+            if self.ejected_until.get(alias, 0) > now:
+                return
+            self.ejected_until[alias] = now + seconds
+        log.warning('Read replica %s ejected for %ss: %s', alias, seconds, reason)
+
+    def start_checker(self):
+        """
+        Starts the thread checking the replicas in this process (again after a fork) if there are replicas.
+        """
+        pid = os.getpid()
+        if not self.weights or (self.checker_pid == pid and self.checker.is_alive()):
+            return
+        with self.lock:
+            if self.checker_pid == pid and self.checker.is_alive():
+                return
+            self.checker = threading.Thread(target=self.run_checker, name='replica-health-check', daemon=True)
+            self.checker_pid = pid
+            self.checker.start()
+
+    def run_checker(self):
+        while True:
+            self.check_all()
+            time.sleep(getattr(settings, 'DATABASE_REPLICA_CHECK_INTERVAL', 10))
+
+    def check_all(self):
+        for alias in list(self.weights):
+            try:
+                self.check(alias)
+            except Exception:
+                log.exception('Health check of the read replica %s failed', alias)
+
+    def check(self, alias):
+        """
+        Health check of a replica: the connection must be usable and the replication lag under
+        ``DATABASE_REPLICA_MAX_LAG`` seconds, the replica is ejected otherwise.
+        """
+        try:
+            lag = self.replication_lag(alias)
+        except DatabaseError as e:
+            self.eject(alias, repr(e))
+            return False
+        finally:
+            # the connection of the checker thread goes back to the pool between checks
+            connections[alias].close()
+        max_lag = getattr(settings, 'DATABASE_REPLICA_MAX_LAG', 30)
+        if lag is not None and lag > max_lag:
+            self.eject(alias, 'replication lag {0:.1f}s over {1}s'.format(lag, max_lag))
+            return False
+        return True
+
+    @staticmethod
+    def replication_lag(alias):
+        connection = connections[alias]
+        with connection.cursor() as cursor:
+            if connection.vendor != 'postgresql':
+                cursor.execute('SELECT 1' + (' FROM DUAL' if connection.vendor == 'oracle' else ''))
+                return None
+            cursor.execute(POSTGRES_LAG_SQL)
+            return float(cursor.fetchone()[0] or 0)
+
+
+replica_pool = ReplicaPool()
+
+# Alias the current request sticks to.
+_pinned = threading.local()
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+
+def pin_replica(alias):
+    _pinned.alias = alias
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+
+def pinned_replica():
+    return getattr(_pinned, 'alias', None)
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+
+def eject_failed_replica(error):
+    """
+    Ejects the replica the request is pinned to if ``error`` lost the connection to it. A statement cancelled by
+    its timeout (see ``chembl_webservices.core.timeouts``) only ejects it if the connection is left unusable.
+    """
+    alias = pinned_replica()
+    if not alias or alias not in replica_pool.weights or not isinstance(error, (OperationalError, InterfaceError)):
+        return
+    connection = connections[alias]
+    if is_statement_timeout(error) and connection.connection is not None and connection.is_usable():
+        return
+    replica_pool.eject(alias, repr(error))
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+
+def eject_replica_on_exception(sender, **kwargs):
+    """
+    ``got_request_exception`` receiver, see ``eject_failed_replica``.
+    """
+    eject_failed_replica(sys.exc_info()[1])
+
+
+got_request_exception.connect(eject_replica_on_exception, dispatch_uid='chembl_webservices.eject_failed_replica')
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+
+class ReadReplicaRouter(object):
+    """
+    Sends the reads to the replica the current request is pinned to (see ``ReplicaPinningMiddleware``), so the count
+    and the page of a list do not come from replicas at different replication points, or to a freshly chosen replica
+    outside of requests.
+    Writes and migrations stay on ``default``.
+    """
+
+    def db_for_read(self, model, **hints):
+        return pinned_replica() or replica_pool.choose()
+
+    def db_for_write(self, model, **hints):
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # replicas hold the same data
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == 'default'
+
+# ----------------------------------------------------------------------------------------------------------------------
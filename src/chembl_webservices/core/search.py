@@ -0,0 +1,374 @@
+__author__ = 'mnowotka'
+
+import itertools
+from array import array
+from collections import OrderedDict
+from django.conf import settings
+from django.db import NotSupportedError
+from django.db.models import F
+from django.db.models import Func
+from django.db.models import IntegerField
+from django.http import HttpRequest
+from tastypie.bundle import Bundle
+from tastypie.resources import Resource
+
+# Hits of a search that can be paged through, ``index.max_result_window`` of the ElasticSearch indexes.
+SEARCH_MAX_RESULTS = getattr(settings, 'SEARCH_MAX_RESULTS', 10000)
+
+# Fields of the ElasticSearch documents matched by the user query, with their boosts.
+SEARCH_FIELDS = [
+    '*.std_analyzed^1.6',
+    '*.eng_analyzed^0.8',
+    '*.ws_analyzed^1.4',
+    '*.keyword^2',
+    '*.lower_case_keyword^1.5',
+    '*.alphanumeric_lowercase_keyword^1.3',
+    '*.entity_id^2',
+    '*.chembl_id^2',
+]
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+
+def search_body(user_query, **kwargs):
+    """
+    The body of the ElasticSearch request matching ``user_query``, ``kwargs`` are added to it (``from``, ``size``...).
+    """
+    body = {
+        'track_total_hits': True,
+        '_source': False,
+        'query': {
+            'multi_match': {
+                'query': user_query,
+                'fields': SEARCH_FIELDS,
+            }
+        }
+    }
+    body.update(kwargs)
+    return body
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+
+def hit_score(hit):
+    """
+    The score of a hit, or its sort values when the hits are sorted.
+    """
+    doc_score = hit['_score']
+    if doc_score is None:
+        doc_score = '-:-'.join([str(sort_i) for sort_i in hit['sort']])
+        try:
+            doc_score = float(doc_score)
+        except ValueError:
+            pass
+    return doc_score
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+
+def total_hits(response):
+    """
+    ``hits.total`` of a search response, a number before ElasticSearch 7.
+    """
+    total = response['hits']['total']
+    return total['value'] if isinstance(total, dict) else total
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+
+class SearchResults(object):
+    """
+    The ranked results of a search, sliced like a queryset: a slice only asks ElasticSearch for that window of hits
+    (``from``/``size``) and only loads their objects, the total number of hits comes from the ``hits.total`` of the
+    window. ``count`` only asks for it (an empty window) before any slice, slice the page first.
+
+    ``fetch(offset, size)`` returns the scores of a window of hits by primary key (in the order they are served) and
+    the total, ``load(scores)`` the objects of these primary keys in the same order.
+    """
+
+    def __init__(self, fetch, load, max_results=SEARCH_MAX_RESULTS, total=None):
+        self.fetch = fetch
+        self.load = load
+        self.max_results = max_results
+        self.total = total
+
+    def count(self):
+        if self.total is None:
+            self.total = self.fetch(0, 0)[1]
+        return min(self.total, self.max_results)
+
+    def __len__(self):
+        return self.count()
+
+    def __iter__(self):
+        return iter(self[:])
+
+    def __getitem__(self, item):
+        if not isinstance(item, slice):
+            objects = self[item:item + 1]
+            if not objects:
+                raise IndexError('Search result index out of range')
+            return objects[0]
+        if item.step not in (None, 1) or (item.start or 0) < 0 or (item.stop or 0) < 0:
+            raise ValueError('Search results only support forward slices with positive bounds.')
+        start = item.start or 0
+        stop = min(self.max_results, self.max_results if item.stop is None else item.stop)
+        if self.total is not None:
+            stop = min(stop, self.total)
+        if stop <= start:
+            return []
+        scores, self.total = self.fetch(start, stop - start)
+        return self.load(scores) if scores else []
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+
+class SearchRanking(object):
+    """
+    All the ranked hits of a search in the compact form they are cached in, shared by the pages of the search: the
+    primary keys (an ``array`` of 64 bit integers, or a tuple of strings) and their scores (an ``array`` of 32 bit
+    floats). ``hits`` is the number of documents ranked, with the ones having no object in the database, as counted
+    in the ``hits.total`` of a window.
+    """
+
+    def __init__(self, pks, scores, hits=None):
+        self.pks = pks
+        self.scores = scores
+        self.hits = len(pks) if hits is None else hits
+
+    @classmethod
+    def from_scores(cls, scores, hits=None):
+        """
+        The ranking of an ordered dictionary of scores by primary key, of ``hits`` documents.
+        """
+        pks = list(scores.keys())
+        values = list(scores.values())
+        if all(isinstance(pk, int) for pk in pks):
+            pks = array('q', pks)
+        else:
+            pks = tuple(str(pk) for pk in pks)
+        try:
+            values = array('f', values)
+        except TypeError:
+            # sort values of sorted hits
+            pass
+        return cls(pks, values, hits)
+
+    def __len__(self):
+        return len(self.pks)
+
+    def window(self, offset, size):
+        """
+        The scores of the hits ``offset`` to ``offset + size`` by primary key, in rank order.
+        """
+        return OrderedDict(zip(self.pks[offset:offset + size], self.scores[offset:offset + size]))
+
+    def by_pk(self):
+        """
+        The primary keys, as ranked, and the scores of the hits by primary key as a string.
+        """
+        return {str(pk): (pk, score) for pk, score in zip(self.pks, self.scores)}
+
+    def order(self, rows, reverse=False):
+        """
+        The primary keys of ``rows`` (a primary key followed by the values the rows are ordered by) ordered by rank
+        among the consecutive rows of equal values, as ``ORDER BY <values>, <rank>`` would order them.
+        """
+        positions = {str(pk): position for position, pk in enumerate(self.pks)}
+        pks = []
+        for _, group in itertools.groupby(rows, key=lambda row: tuple(row[1:])):
+            pks.extend(sorted((row[0] for row in group), key=lambda pk: positions[str(pk)], reverse=reverse))
+        return pks
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+
+class SearchRank(Func):
+    """
+    Position (from 1) of the primary key of a row in ``pks``, to order a queryset by the rank of its rows in a search
+    with ``array_position``. PostgreSQL only, the other databases would need a bind per primary key: their hits are
+    ordered in Python (see ``SearchRanking.order``). ``pks`` must not be empty.
+    """
+
+    def __init__(self, pks, expression='pk'):
+        super(SearchRank, self).__init__(F(expression), output_field=IntegerField())
+        self.pks = list(pks)
+
+    def as_sql(self, compiler, connection, **extra_context):
+        raise NotSupportedError('Search hits are only ranked in SQL on PostgreSQL.')
+
+    def as_postgresql(self, compiler, connection, **extra_context):
+        lhs, params = compiler.compile(self.get_source_expressions()[0])
+        # compared as text, the primary keys are integers or strings
+        return 'array_position(%s::text[], ({0})::text)'.format(lhs), [[str(pk) for pk in self.pks]] + list(params)
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+
+def source_value(source, path):
+    """
+    The value at a dotted ``path`` of an ElasticSearch document, ``None`` if it is missing.
+    """
+    value = source
+    for key in path.split('.'):
+        if not isinstance(value, dict):
+            return None
+        value = value.get(key)
+    return value
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+
+def source_data(resource, source, use_in, only=None, excluded=frozenset()):
+    """
+    The data of the bundle ``resource`` would dehydrate from the object of an ElasticSearch document, built from its
+    ``_source``: the value of a field is read at its ``Meta.es_source_mapping`` path (its name by default), nested
+    ``full`` resources are mapped by their own resource into bundles. ``only`` is a tree as parsed by ``parse_only``,
+    the heavy fields named in ``excluded`` are left out.
+    """
+    data = {}
+    mapping = getattr(resource._meta, 'es_source_mapping', {})
+    heavy = getattr(resource._meta, 'heavy_fields', ())
+    for field_name, field_object in resource.fields.items():
+        if only is not None and field_name not in only:
+            continue
+        if field_name in heavy and field_name in excluded:
+            continue
+        if getattr(field_object, 'use_in', 'all') not in use_in:
+            continue
+        value = source_value(source, mapping.get(field_name, field_name))
+        if value is not None and getattr(field_object, 'is_related', False) and getattr(field_object, 'full', False):
+            related_resource = field_object.get_related_resource(None)
+            subtree = only.get(field_name) if only is not None else None
+            # nested resources are dehydrated as in a detail
+            if isinstance(value, list):
+                value = [Bundle(data=source_data(related_resource, item, ('all', 'detail'), subtree, excluded))
+                         for item in value]
+            else:
+                value = Bundle(data=source_data(related_resource, value, ('all', 'detail'), subtree, excluded))
+        data[field_name] = value
+    return data
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+
+def source_paths(resource, use_in, only=None, excluded=frozenset()):
+    """
+    The ``_source`` paths read by ``source_data``, to fetch only these from ElasticSearch: the paths of the fields of
+    the nested ``full`` resources are dotted, the heavy fields named in ``excluded`` are not fetched.
+    """
+    paths = []
+    mapping = getattr(resource._meta, 'es_source_mapping', {})
+    heavy = getattr(resource._meta, 'heavy_fields', ())
+    for field_name, field_object in resource.fields.items():
+        if only is not None and field_name not in only:
+            continue
+        if field_name in heavy and field_name in excluded:
+            continue
+        if getattr(field_object, 'use_in', 'all') not in use_in:
+            continue
+        path = mapping.get(field_name, field_name)
+        nested_paths = None
+        if getattr(field_object, 'is_related', False) and getattr(field_object, 'full', False):
+            subtree = only.get(field_name) if only is not None else None
+            nested_paths = source_paths(field_object.get_related_resource(None), ('all', 'detail'), subtree, excluded)
+        if nested_paths:
+            paths.extend(path + '.' + nested_path for nested_path in nested_paths)
+        else:
+            paths.append(path)
+    return sorted(paths)
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+
+def source_servable(resource, use_in):
+    """
+    True if ``source_data`` builds the data ``full_dehydrate`` would for ``resource`` and its nested ``full``
+    resources: none of them overrides ``dehydrate``, has a ``dehydrate_<field>`` method or a field with a callable
+    ``use_in``, these need the objects.
+    """
+    if type(resource).dehydrate is not Resource.dehydrate:
+        return False
+    for field_name, field_object in resource.fields.items():
+        field_use_in = getattr(field_object, 'use_in', 'all')
+        if callable(field_use_in) or callable(getattr(resource, 'dehydrate_' + field_name, None)):
+            return False
+        if field_use_in not in use_in:
+            continue
+        if getattr(field_object, 'is_related', False) and getattr(field_object, 'full', False):
+            if not source_servable(field_object.get_related_resource(None), ('all', 'detail')):
+                return False
+    return True
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+
+def same_value(expected, actual):
+    if expected == actual:
+        return True
+    # decimals are serialised as strings by the ORM bundles
+    try:
+        return float(expected) == float(actual)
+    except (TypeError, ValueError):
+        return False
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+
+def differences(expected, actual, path=''):
+    """
+    The paths (``molecule_properties.full_mwt``, ``[]`` for the items of a list) of the values differing between two
+    simplified bundles.
+    """
+    if isinstance(expected, dict) and isinstance(actual, dict):
+        for key in sorted(set(expected) | set(actual)):
+            for difference in differences(expected.get(key), actual.get(key), path + '.' + key if path else key):
+                yield difference
+    elif isinstance(expected, list) and isinstance(actual, list) and len(expected) == len(actual):
+        for expected_item, actual_item in zip(expected, actual):
+            for difference in differences(expected_item, actual_item, path + '[]'):
+                yield difference
+    elif not same_value(expected, actual):
+        yield path
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+
+def check_search_source(resource, user_query, size=50):
+    """
+    Compares the bundles of the first ``size`` hits of a search built from the ElasticSearch documents with the ones
+    dehydrated from the database. Returns the number of hits compared, the document ids with no object in the database,
+    the number of documents differing and, by field path, the number of documents where it differs and an example.
+    """
+    def simple(bundle):
+        # as served, after the hooks of the resource
+        data = resource.alter_detail_data_to_serialize(request, bundle)
+        return resource._meta.serializer.to_simple(data, {})
+
+    docs, _ = resource.source_search_window(user_query, 0, size)
+    pk_to_doc = resource.map_search_ids(OrderedDict((doc_id, doc_id) for doc_id in docs))
+    request = HttpRequest()
+    request.format = 'json'
+    bundle = resource.build_bundle(request=request)
+    scores = OrderedDict((pk, docs[doc_id].get('score') or 0.0) for pk, doc_id in pk_to_doc.items())
+    include = ','.join(sorted(resource.get_heavy_fields()))
+    objects = resource.search_objects(bundle, scores, {}, include=include) if scores else []
+    result = {
+        'hits': len(docs),
+        'missing': sorted(set(docs) - set(pk_to_doc.values())),
+        'differing': 0,
+        'fields': {},
+    }
+    for obj in objects:
+        doc_id = pk_to_doc[obj.pk]
+        expected = simple(resource.full_dehydrate(resource.build_bundle(obj=obj, request=request), for_search=True))
+        actual = simple(resource.build_bundle(data=docs[doc_id], request=request))
+        paths = sorted(set(differences(expected, actual)))
+        if paths:
+            result['differing'] += 1
+        for path in paths:
+            field = result['fields'].setdefault(path, {'documents': 0, 'example': doc_id})
+            field['documents'] += 1
+    return result
+
+# ----------------------------------------------------------------------------------------------------------------------
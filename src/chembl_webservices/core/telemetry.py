@@ -0,0 +1,143 @@
+__author__ = 'mnowotka'
+
+import hashlib
+import json
+import logging
+import threading
+import time
+from django.conf import settings
+from django.core.cache import caches
+
+# Cache keys of the aggregated filter shapes and of the list of them.
+TELEMETRY_KEY_PREFIX = 'filter_telemetry:'
+TELEMETRY_INDEX_KEY = TELEMETRY_KEY_PREFIX + 'index'
+
+# Seconds the aggregates are kept in the cache after their last update.
+TELEMETRY_TIMEOUT = 30 * 24 * 3600
+
+log = logging.getLogger(__name__)
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+
+def shape_digest(resource_name, model_label, filters, ordering):
+    """
+    Fingerprint of a filter shape: the resource, the model it reads, the ORM lookups it filters on (without their
+    values) and its ordering.
+    """
+    shape = json.dumps([resource_name, model_label, sorted(filters), list(ordering)])
+    return hashlib.md5(shape.encode('utf-8')).hexdigest()
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+
+def get_telemetry_cache():
+    return caches[getattr(settings, 'FILTER_TELEMETRY_CACHE', 'default')]
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+
+def merge_shape(stored, entry):
+    if not stored:
+        return dict(entry)
+    merged = dict(stored)
+    merged['count'] = stored.get('count', 0) + entry['count']
+    merged['total_ms'] = stored.get('total_ms', 0.0) + entry['total_ms']
+    merged['max_ms'] = max(stored.get('max_ms', 0.0), entry['max_ms'])
+    merged['sample'] = entry['sample']
+    merged['last_seen'] = entry['last_seen']
+    return merged
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+
+class FilterTelemetry(object):
+    """
+    Aggregates in process the time spent by the list queries of each filter shape and merges it every
+    ``FILTER_TELEMETRY_FLUSH_INTERVAL`` seconds into the cache, where the aggregates of all the processes add up.
+    One sample of the filter values is kept per shape, for the ``advise_indexes`` command to EXPLAIN.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        # the merges into the cache read and write the same keys, one at a time
+        self.flush_lock = threading.Lock()
+        self.pending = {}
+        self.flushed_at = time.time()
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+    def record(self, resource_name, model_label, filters, ordering, sample, seconds):
+        digest = shape_digest(resource_name, model_label, filters, ordering)
+        elapsed_ms = seconds * 1000.0
+        now = time.time()
+        with self.lock:
+            entry = self.pending.get(digest)
+            if entry is None:
+                entry = self.pending[digest] = {
+                    'resource': resource_name,
+                    'model': model_label,
+                    'filters': sorted(filters),
+                    'ordering': list(ordering),
+                    'count': 0,
+                    'total_ms': 0.0,
+                    'max_ms': 0.0,
+                }
+            entry['count'] += 1
+            entry['total_ms'] += elapsed_ms
+            entry['max_ms'] = max(entry['max_ms'], elapsed_ms)
+            entry['sample'] = sample
+            entry['last_seen'] = now
+            due = now - self.flushed_at >= getattr(settings, 'FILTER_TELEMETRY_FLUSH_INTERVAL', 60)
+            if due:
+                # the other threads do not flush in the meantime
+                self.flushed_at = now
+        if due:
+            self.flush()
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+    def flush(self):
+        with self.flush_lock:
+            with self.lock:
+                pending, self.pending = self.pending, {}
+                self.flushed_at = time.time()
+            if not pending:
+                return
+            cache = get_telemetry_cache()
+            try:
+                keys = {digest: TELEMETRY_KEY_PREFIX + digest for digest in pending}
+                stored = cache.get_many(list(keys.values()))
+                for digest, entry in pending.items():
+                    cache.set(keys[digest], merge_shape(stored.get(keys[digest]), entry), TELEMETRY_TIMEOUT)
+                index = set(cache.get(TELEMETRY_INDEX_KEY) or []) | set(pending)
+                cache.set(TELEMETRY_INDEX_KEY, sorted(index), TELEMETRY_TIMEOUT)
+            except Exception:
+                log.error('Could not store the filter telemetry', exc_info=True)
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+
+filter_telemetry = FilterTelemetry()
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+
+def load_filter_telemetry():
+    """
+    The aggregated filter shapes of all the processes, costliest first.
+    """
+    cache = get_telemetry_cache()
+    digests = cache.get(TELEMETRY_INDEX_KEY) or []
+    stored = cache.get_many([TELEMETRY_KEY_PREFIX + digest for digest in digests])
+    return sorted(stored.values(), key=lambda entry: entry['total_ms'], reverse=True)
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+
+def reset_filter_telemetry():
+    cache = get_telemetry_cache()
+    digests = cache.get(TELEMETRY_INDEX_KEY) or []
+    cache.delete_many([TELEMETRY_KEY_PREFIX + digest for digest in digests] + [TELEMETRY_INDEX_KEY])
+
+# ----------------------------------------------------------------------------------------------------------------------
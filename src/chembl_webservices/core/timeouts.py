@@ -0,0 +1,172 @@
+__author__ = 'mnowotka'
+
+import time
+from contextlib import contextmanager, ExitStack
+from django.conf import settings
+from django.db import connections
+from django.http import HttpResponse
+
+# Endpoint kind (the keys of ``Meta.statement_timeout``) of the views wrapped by ``wrap_view``.
+VIEW_KINDS = {
+    'dispatch_list': 'list',
+    'get_list': 'list',
+    'dispatch_detail': 'detail',
+    'get_detail': 'detail',
+    'get_multiple': 'set',
+    'get_bulk': 'set',
+    'get_search': 'search',
+}
+
+# SQLSTATE of a statement cancelled by PostgreSQL (statement_timeout or pg_cancel_backend).
+POSTGRES_QUERY_CANCELED = '57014'
+
+# Oracle user requested cancel and cx_Oracle call timeout exceeded.
+ORACLE_CANCEL_CODES = ('ORA-01013', 'DPI-1067')
+
+# Message of a SQLite statement stopped by its progress handler.
+SQLITE_INTERRUPTED = 'interrupted'
+
+# SQLite virtual machine instructions between two checks of the deadline of a statement.
+SQLITE_PROGRESS_STEPS = 10000
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+
+class HttpServiceUnavailable(HttpResponse):
+    status_code = 503
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+
+def get_statement_timeout(resource, view):
+    """
+    Seconds the queries of a ``view`` of a resource may run, from ``Meta.statement_timeout``: a number applying to
+    every endpoint kind or a dictionary keyed by kind. ``None`` when the view has no limit.
+    """
+    if not getattr(settings, 'STATEMENT_TIMEOUTS', True):
+        return None
+    timeout = getattr(resource._meta, 'statement_timeout', None)
+    if isinstance(timeout, dict):
+        kind = VIEW_KINDS.get(view)
+        return timeout.get(kind) if kind else None
+    return timeout
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+
+def is_statement_timeout(error):
+    """
+    True if a database error was raised because the statement was cancelled.
+    """
+    cause = error.__cause__ or error
+    if getattr(cause, 'pgcode', None) == POSTGRES_QUERY_CANCELED:
+        return True
+    message = str(cause)
+    return message == SQLITE_INTERRUPTED or any(code in message for code in ORACLE_CANCEL_CODES)
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+
+def _postgres_timeout(milliseconds):
+
+    def limit(execute, sql, params, many, context):
+        if many:
+            return execute(sql, params, many, context)
+        raw_cursor = context['cursor'].cursor
+        if getattr(raw_cursor, 'name', None) is None:
+            # run in the implicit transaction of a multi-statement query, so the setting ends with the statement
+            return execute('SET LOCAL statement_timeout = {0}; {1}'.format(milliseconds, sql), params, many, context)
+        # a server side cursor only takes a single statement, set the timeout around it
+        raw_connection = context['connection'].connection
+        with raw_connection.cursor() as cursor:
+            cursor.execute('SET statement_timeout = {0}'.format(milliseconds))
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            try:
+                with raw_connection.cursor() as cursor:
+                    cursor.execute('SET statement_timeout = DEFAULT')
+            except context['connection'].Database.Error:
+                # the transaction was aborted or the connection lost, it is not reused as is
+                pass
+
+    return limit
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+
+def _oracle_timeout(milliseconds):
+
+    def limit(execute, sql, params, many, context):
+        raw_connection = context['connection'].connection
+        try:
+            previous = raw_connection.callTimeout
+            raw_connection.callTimeout = milliseconds
+        except (AttributeError, context['connection'].Database.Error):
+            # call timeouts need cx_Oracle 7 and Oracle client libraries 18
+            return execute(sql, params, many, context)
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            try:
+                raw_connection.callTimeout = previous
+            except context['connection'].Database.Error:
+                pass
+
+    return limit
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+
+def _sqlite_timeout(milliseconds):
+    # rows are stepped through by the fetches following the execute call, the deadline of the last statement holds
+    # until the next one starts or the block ends
+    deadline = [None]
+
+    def interrupt():
+        return deadline[0] is not None and time.monotonic() > deadline[0]
+
+    def limit(execute, sql, params, many, context):
+        deadline[0] = time.monotonic() + milliseconds / 1000.0
+        context['connection'].connection.set_progress_handler(interrupt, SQLITE_PROGRESS_STEPS)
+        return execute(sql, params, many, context)
+
+    def clear(connection):
+        deadline[0] = None
+        if connection.connection is not None:
+            connection.connection.set_progress_handler(None, 0)
+
+    limit.clear = clear
+    return limit
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+
+@contextmanager
+def statement_timeout(seconds):
+    """
+    Cancels any SQL statement executed inside the block, on any database connection, running longer than
+    ``seconds``: with ``statement_timeout`` on PostgreSQL, the call timeout of the connection on Oracle and a progress
+    handler on SQLite. Other backends are not limited.
+    """
+    if not seconds:
+        yield
+        return
+    milliseconds = int(seconds * 1000)
+    wrappers = {
+        'postgresql': _postgres_timeout,
+        'oracle': _oracle_timeout,
+        'sqlite': _sqlite_timeout,
+    }
+    with ExitStack() as stack:
+        for alias in connections:
+            make_wrapper = wrappers.get(connections[alias].vendor)
+            if make_wrapper is not None:
+                wrapper = make_wrapper(milliseconds)
+                stack.enter_context(connections[alias].execute_wrapper(wrapper))
+                if hasattr(wrapper, 'clear'):
+                    # the connection goes back to the pool with no handler
+                    stack.callback(wrapper.clear, connections[alias])
+        yield
+
+# ----------------------------------------------------------------------------------------------------------------------
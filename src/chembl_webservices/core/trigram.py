@@ -0,0 +1,67 @@
+__author__ = 'mnowotka'
+
+from tastypie.resources import ALL
+from tastypie.resources import ALL_WITH_RELATIONS
+from django.db.backends.utils import truncate_name
+from django.db.models import CharField
+from django.db.models import TextField
+from chembl_webservices.core.relations import walk_attribute
+
+# Filter types served by a pg_trgm index, the case insensitive ones only on the ChemblTrigramCharField columns (their
+# ILIKE lookups are in chembl_core_db).
+TRIGRAM_FILTERS = ('contains', 'icontains', 'startswith', 'istartswith', 'endswith', 'iendswith', 'iexact', 'regex',
+                   'iregex')
+
+# Shorter columns hold codes and controlled vocabulary, matched exactly rather than by substring.
+MIN_TRIGRAM_LENGTH = 100
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+
+def trigram_columns(resource, depth=1, min_length=MIN_TRIGRAM_LENGTH):
+    """
+    The text columns of at least ``min_length`` characters behind the filters of a resource allowing substring or
+    regular expression matching, following the related resources filtered with ``ALL_WITH_RELATIONS`` ``depth``
+    levels down. Returns a list of ``(model, field)`` tuples.
+    """
+    columns = []
+    model = resource._meta.object_class
+    for field_name, allowed in sorted(resource._meta.filtering.items()):
+        field = resource.fields.get(field_name)
+        if field is None or not isinstance(getattr(field, 'attribute', None), str):
+            continue
+        if getattr(field, 'is_related', False):
+            if allowed == ALL_WITH_RELATIONS and depth > 0:
+                for column in trigram_columns(field.get_related_resource(None), depth - 1, min_length):
+                    if column not in columns:
+                        columns.append(column)
+            continue
+        if allowed not in (ALL, ALL_WITH_RELATIONS) and not set(allowed) & set(TRIGRAM_FILTERS):
+            continue
+        walk = walk_attribute(model, field.attribute)
+        if walk is None or walk[1] is None:
+            continue
+        hops, column_name = walk
+        column_model = hops[-1].model if hops else model
+        column = column_model._meta.get_field(column_name)
+        if not isinstance(column, (CharField, TextField)) or column.primary_key or column.is_relation:
+            continue
+        if isinstance(column, CharField) and (column.max_length or 0) < min_length:
+            continue
+        if (column_model, column) not in columns:
+            columns.append((column_model, column))
+    return columns
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+
+def trigram_index_sql(connection, model, field):
+    """
+    ``CREATE INDEX`` statement of the pg_trgm GIN index of a column, built without locking the table for writes.
+    """
+    table = model._meta.db_table
+    name = truncate_name('{0}_{1}_trgm'.format(table, field.column), connection.ops.max_name_length())
+    return 'CREATE INDEX CONCURRENTLY IF NOT EXISTS {0} ON {1} USING gin ({2} gin_trgm_ops)'.format(
+        connection.ops.quote_name(name), connection.ops.quote_name(table), connection.ops.quote_name(field.column))
+
+# ----------------------------------------------------------------------------------------------------------------------
@@ -1,5 +1,7 @@
 __author__ = 'mnowotka'
 
+import re
+
 # ----------------------------------------------------------------------------------------------------------------------
 
 NUMBER_FILTERS = ['exact', 'range', 'gt', 'gte', 'lt', 'lte', 'in', 'isnull']
@@ -46,4 +48,56 @@ def unpack_request_params(params):
             ret.append(x)
     return ret
 
-# ----------------------------------------------------------------------------------------------------------------------
\ No newline at end of file
+# ----------------------------------------------------------------------------------------------------------------------
+
+def parse_only(only):
+    """
+    Parses the ``only`` parameter into a tree of field names, nested fields are separated by dots
+    (``molecule_properties.full_mwt``) or double underscores. ``None`` in the tree means the whole field.
+    Returns ``None`` if nothing was requested.
+    """
+    if not only:
+        return None
+    if isinstance(only, dict):
+        return only
+    if not isinstance(only, (list, tuple)):
+        only = [only]
+    tree = {}
+    for item in list_flatten(list(only)):
+        for path in str(item).split(','):
+            bits = [bit.strip() for bit in re.split(r'\.|__', path) if bit.strip()]
+            node = tree
+            for idx, bit in enumerate(bits):
+                if bit in node and node[bit] is None:
+                    break
+                if idx == len(bits) - 1:
+                    node[bit] = None
+                else:
+                    node = node.setdefault(bit, {})
+    return tree or None
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+
+def freeze_only(tree):
+    """
+    Hashable representation of a tree returned by ``parse_only``.
+    """
+    if tree is None:
+        return None
+    return tuple(sorted((key, freeze_only(value)) for key, value in tree.items()))
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+
+def only_names(tree):
+    """
+    Every field name, at any depth, of a tree returned by ``parse_only``.
+    """
+    names = set()
+    for key, value in (tree or {}).items():
+        names.add(key)
+        names |= only_names(value)
+    return names
+
+# ----------------------------------------------------------------------------------------------------------------------
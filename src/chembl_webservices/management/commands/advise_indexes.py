@@ -0,0 +1,40 @@
+__author__ = 'mnowotka'
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+from chembl_webservices.api_config import api
+from chembl_webservices.core.indexadvisor import advise_indexes
+from chembl_webservices.core.telemetry import load_filter_telemetry
+from chembl_webservices.core.telemetry import reset_filter_telemetry
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+
+class Command(BaseCommand):
+    help = 'Proposes the composite indexes missing for the filter shapes recorded with FILTER_TELEMETRY, ranked by ' \
+           'the time spent by the list queries they would serve.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default='default', help='Database alias the plans and indexes are read from.')
+        parser.add_argument('--limit', type=int, default=20, help='Number of indexes proposed.')
+        parser.add_argument('--min-count', type=int, default=1, help='Skip the filter shapes seen fewer times.')
+        parser.add_argument('--sql', action='store_true', help='Print only the CREATE INDEX statements.')
+        parser.add_argument('--reset', action='store_true', help='Clear the recorded telemetry afterwards.')
+
+    def handle(self, *args, **options):
+        entries = [entry for entry in load_filter_telemetry() if entry['count'] >= options['min_count']]
+        if not entries and not options['sql']:
+            self.stdout.write('No filter telemetry recorded, set FILTER_TELEMETRY=true on the web servers.')
+        suggestions = advise_indexes(entries, api._registry, connections[options['database']])[:options['limit']]
+        for rank, suggestion in enumerate(suggestions, 1):
+            if options['sql']:
+                self.stdout.write(suggestion['sql'] + ';')
+                continue
+            self.stdout.write('{0:>3}. {1:>12.1f} ms {2:>8} queries {3:>4} shapes  {4} ({5}){6}'.format(
+                rank, suggestion['total_ms'], suggestion['count'], suggestion['shapes'], suggestion['table'],
+                ', '.join(suggestion['columns']), '' if suggestion['explained'] else '  [not explained]'))
+            self.stdout.write('     ' + suggestion['sql'] + ';')
+        if options['reset']:
+            reset_filter_telemetry()
+
+# ----------------------------------------------------------------------------------------------------------------------
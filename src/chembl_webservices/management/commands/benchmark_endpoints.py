@@ -0,0 +1,157 @@
+__author__ = 'mnowotka'
+
+import json
+from django.db import connections
+from django.core.management.base import BaseCommand, CommandError
+from chembl_webservices.api_config import api
+from chembl_webservices.core.benchmark import connection_overrides
+from chembl_webservices.core.benchmark import endpoint_urls
+from chembl_webservices.core.benchmark import filter_urls
+from chembl_webservices.core.benchmark import measure
+from chembl_webservices.core.benchmark import resource_overrides
+
+DEFAULT_RESOURCES = ['activity', 'assay', 'mechanism']
+
+# Meta options compared against each other, the first entry is the baseline.
+MODES = {
+    'prefetch': {'select_related': False},
+    'select_related': {'select_related': True},
+    'generic_detail': {'select_related': True, 'detail_fast_path': False},
+}
+
+# Common substring and case insensitive filters, benchmarked with --substring (e.g. before and after
+# create_trigram_indexes).
+SUBSTRING_FILTERS = {
+    'molecule': {
+        'pref_name__icontains': 'cillin',
+        'pref_name__istartswith': 'amox',
+        'molecule_synonyms__molecule_synonym__icontains': 'aspirin',
+    },
+    'assay': {
+        'description__icontains': 'inhibition of',
+        'description__iregex': 'kinase.*(assay|activity)',
+    },
+    'target': {
+        'pref_name__icontains': 'kinase',
+        'pref_name__istartswith': 'tyrosine',
+        'organism__icontains': 'sapiens',
+    },
+}
+
+# Detail endpoints benchmarked with --prepared, without and with server side prepared statements (PostgreSQL).
+PREPARED_RESOURCES = ['molecule', 'target', 'assay', 'activity']
+
+PREPARED_MODES = {
+    'plain': None,
+    'prepared': {'SIZE': 100, 'THRESHOLD': 1},
+}
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+
+class Command(BaseCommand):
+    help = 'Measures the number of SQL queries, the database time and the latency of list, detail and set requests, ' \
+           'comparing relation loading strategies and the detail lookup paths. The resource cache is bypassed.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--resource', action='append', dest='resources',
+                            help='Resource name to benchmark, can be repeated (default: {0}).'
+                            .format(', '.join(DEFAULT_RESOURCES)))
+        parser.add_argument('--mode', action='append', dest='modes', choices=sorted(MODES.keys()),
+                            help='Relation loading strategy, can be repeated (default: all).')
+        parser.add_argument('--repeat', type=int, default=3, help='Requests per url.')
+        parser.add_argument('--limit', type=int, default=20, help='Page size of list requests.')
+        parser.add_argument('--set-size', type=int, default=5, help='Number of identifiers in set requests.')
+        parser.add_argument('--search', action='store_true',
+                            help='Also benchmark the search endpoints (ElasticSearch).')
+        parser.add_argument('--substring', action='store_true',
+                            help='Also benchmark the common substring filters of molecule, assay and target.')
+        parser.add_argument('--prepared', action='store_true',
+                            help='Only benchmark the detail endpoints (default: {0}) without and with server side '
+                                 'prepared statements.'.format(', '.join(PREPARED_RESOURCES)))
+        parser.add_argument('--json', action='store_true', dest='as_json', help='Print the results as JSON.')
+        parser.add_argument('--compare', metavar='PATH',
+                            help='JSON results of an earlier run (e.g. against PostgreSQL, made with --json) to '
+                                 'compare the mean latencies with, for instance when serving from SQLite.')
+
+    def handle(self, *args, **options):
+        if options['prepared']:
+            results = self.benchmark_prepared(options)
+        else:
+            results = self.benchmark_modes(options)
+        engine = connections['default'].vendor
+        for result in results:
+            result['engine'] = engine
+        if options['compare']:
+            self.compare(results, options['compare'])
+
+        if options['as_json']:
+            self.stdout.write(json.dumps(results, indent=2))
+            return
+        kind_width = max([8] + [len(result['kind']) for result in results])
+        row = '{resource:<20} {kind:<' + str(kind_width) + '} {mode:<16} {status:>6} {queries:>8} {db_ms:>10} ' \
+              '{best_ms:>10} {mean_ms:>10}'
+        header = dict(resource='resource', kind='kind', mode='mode', status='status', queries='queries',
+                      db_ms='db ms', best_ms='best ms', mean_ms='mean ms')
+        if options['compare']:
+            row += ' {baseline_ms:>12} {ratio:>6}'
+            header.update(baseline_ms='baseline ms', ratio='ratio')
+        self.stdout.write(row.format(**header))
+        for result in results:
+            self.stdout.write(row.format(**dict({'baseline_ms': '-', 'ratio': '-'}, **result)))
+
+    def compare(self, results, path):
+        """
+        Adds the mean latency of the same request in the baseline run and the ratio of the current one to it.
+        """
+        try:
+            with open(path) as f:
+                baseline = json.load(f)
+        except (IOError, ValueError) as e:
+            raise CommandError("Can not read the baseline results '{0}': {1}".format(path, e))
+        means = {(result['resource'], result['kind'], result['mode']): result['mean_ms'] for result in baseline}
+        for result in results:
+            mean = means.get((result['resource'], result['kind'], result['mode']))
+            if mean is None:
+                continue
+            result['baseline_ms'] = mean
+            result['ratio'] = round(float(result['mean_ms']) / mean, 2) if mean else '-'
+
+    def benchmark_prepared(self, options):
+        results = []
+        for resource_name in options['resources'] or PREPARED_RESOURCES:
+            if resource_name not in api._registry:
+                raise CommandError("Unknown resource '{0}'.".format(resource_name))
+            resource = api._registry[resource_name]
+            url = endpoint_urls(resource, set_size=1, search=False).get('detail')
+            if url is None:
+                continue
+            for mode, prepared_statements in sorted(PREPARED_MODES.items()):
+                with resource_overrides(resource), connection_overrides(prepared_statements=prepared_statements):
+                    # the first request prepares the statements
+                    result = measure(url, repeat=options['repeat'] + 1)
+                result.update({'resource': resource_name, 'mode': mode, 'kind': 'detail'})
+                results.append(result)
+        return results
+
+    def benchmark_modes(self, options):
+        resources = options['resources'] or DEFAULT_RESOURCES
+        modes = options['modes'] or list(MODES.keys())
+        results = []
+        for resource_name in resources:
+            if resource_name not in api._registry:
+                raise CommandError("Unknown resource '{0}'.".format(resource_name))
+            resource = api._registry[resource_name]
+            urls = endpoint_urls(resource, limit=options['limit'], set_size=options['set_size'],
+                                 search=options['search'])
+            if options['substring']:
+                urls.update(filter_urls(resource, SUBSTRING_FILTERS.get(resource_name, {}), limit=options['limit']))
+            for mode in modes:
+                with resource_overrides(resource, **MODES[mode]):
+                    for kind, url in sorted(urls.items()):
+                        result = measure(url, repeat=options['repeat'])
+                        result.update({'resource': resource_name, 'mode': mode, 'kind': kind})
+                        results.append(result)
+        return results
+
+# ----------------------------------------------------------------------------------------------------------------------
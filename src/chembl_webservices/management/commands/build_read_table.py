@@ -0,0 +1,39 @@
+__author__ = 'mnowotka'
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.module_loading import import_string
+from chembl_webservices.api_config import api
+from chembl_webservices.core.readtable import build_read_table
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+
+class Command(BaseCommand):
+    help = 'Builds the flattened read table of a resource declaring a Meta.read_table (e.g. activity), to be run ' \
+           'after loading a release. The new table replaces the live one once loaded and indexed.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('resources', nargs='+', help='Resource names.')
+        parser.add_argument('--database', default='default', help='Database alias the table is built in.')
+        parser.add_argument('--batch-size', type=int, default=1000, help='Objects dehydrated and inserted at once.')
+
+    def handle(self, *args, **options):
+        for resource_name in options['resources']:
+            resource = api._registry.get(resource_name)
+            if resource is None:
+                raise CommandError("Unknown resource '{0}'.".format(resource_name))
+            path = getattr(resource._meta, 'read_table', None)
+            if not path:
+                raise CommandError("Resource '{0}' has no read table.".format(resource_name))
+            read_table = import_string(path)()
+
+            def progress(rows):
+                if options['verbosity'] > 1:
+                    self.stdout.write('{0}: {1} rows'.format(resource_name, rows))
+
+            rows = build_read_table(resource, read_table, using=options['database'],
+                                    batch_size=options['batch_size'], progress=progress)
+            self.stdout.write('{0}: {1} rows in {2}'.format(resource_name, rows,
+                                                           read_table._meta.object_class._meta.db_table))
+
+# ----------------------------------------------------------------------------------------------------------------------
@@ -0,0 +1,54 @@
+__author__ = 'mnowotka'
+
+import json
+from django.core.management.base import BaseCommand, CommandError
+from chembl_webservices.api_config import api
+from chembl_webservices.core.search import check_search_source
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+
+class Command(BaseCommand):
+    help = 'Compares the search results built from the ElasticSearch documents (SEARCH_FROM_SOURCE) with the ones ' \
+           'dehydrated from the database, field by field, for the resources with Meta.es_source_search.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('resources', nargs='*', help='Resource names (default: all the resources served from '
+                                                         'the documents).')
+        parser.add_argument('--query', action='append', dest='queries',
+                            help='Search query, can be repeated (default: the first identifier of each resource).')
+        parser.add_argument('--size', type=int, default=50, help='Hits compared per query.')
+        parser.add_argument('--strict', action='store_true', help='Fail if any document differs.')
+        parser.add_argument('--json', action='store_true', dest='as_json', help='Print the results as JSON.')
+
+    def handle(self, *args, **options):
+        resource_names = options['resources'] or sorted(
+            name for name, resource in api._registry.items() if getattr(resource._meta, 'es_source_search', False))
+        results = []
+        for resource_name in resource_names:
+            resource = api._registry.get(resource_name)
+            if resource is None:
+                raise CommandError("Unknown resource '{0}'.".format(resource_name))
+            if not getattr(resource._meta, 'es_source_search', False):
+                raise CommandError("Resource '{0}' is not served from the documents.".format(resource_name))
+            queries = options['queries'] or [
+                str(identifier) for identifier in
+                resource._meta.queryset.values_list(resource._meta.detail_uri_name, flat=True)[:1]]
+            for query in queries:
+                result = check_search_source(resource, query.lower(), size=options['size'])
+                result.update({'resource': resource_name, 'query': query})
+                results.append(result)
+
+        if options['as_json']:
+            self.stdout.write(json.dumps(results, indent=2))
+        else:
+            for result in results:
+                self.stdout.write('{resource} "{query}": {hits} hits, {differing} differing, {missing} not in the '
+                                  'database'.format(**dict(result, missing=len(result['missing']))))
+                for path, field in sorted(result['fields'].items()):
+                    self.stdout.write('    {0:<50} {1:>6} documents (e.g. {2})'.format(
+                        path, field['documents'], field['example']))
+        if options['strict'] and any(result['differing'] or result['missing'] for result in results):
+            raise CommandError('Some documents differ from the database.')
+
+# ----------------------------------------------------------------------------------------------------------------------
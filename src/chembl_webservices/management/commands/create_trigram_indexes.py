@@ -0,0 +1,53 @@
+__author__ = 'mnowotka'
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from chembl_webservices.api_config import api
+from chembl_webservices.core.trigram import MIN_TRIGRAM_LENGTH
+from chembl_webservices.core.trigram import trigram_columns
+from chembl_webservices.core.trigram import trigram_index_sql
+
+DEFAULT_RESOURCES = ['molecule', 'assay', 'target']
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+
+class Command(BaseCommand):
+    help = 'Creates pg_trgm GIN indexes on the text columns behind the substring, case insensitive and regular ' \
+           'expression filters of the given resources (PostgreSQL only).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('resources', nargs='*',
+                            help='Resource names (default: {0}).'.format(', '.join(DEFAULT_RESOURCES)))
+        parser.add_argument('--database', default='default', help='Database alias the indexes are created in.')
+        parser.add_argument('--min-length', type=int, default=MIN_TRIGRAM_LENGTH,
+                            help='Skip the character columns shorter than this.')
+        parser.add_argument('--sql', action='store_true', help='Print the statements instead of running them.')
+
+    def handle(self, *args, **options):
+        connection = connections[options['database']]
+        if connection.vendor != 'postgresql' and not options['sql']:
+            raise CommandError('Trigram indexes need PostgreSQL, {0} is {1}.'.format(options['database'],
+                                                                                   connection.vendor))
+        statements = ['CREATE EXTENSION IF NOT EXISTS pg_trgm']
+        for resource_name in options['resources'] or DEFAULT_RESOURCES:
+            if resource_name not in api._registry:
+                raise CommandError("Unknown resource '{0}'.".format(resource_name))
+            for model, field in trigram_columns(api._registry[resource_name], min_length=options['min_length']):
+                statement = trigram_index_sql(connection, model, field)
+                if statement not in statements:
+                    statements.append(statement)
+
+        if options['sql']:
+            for statement in statements:
+                self.stdout.write(statement + ';')
+            return
+        # CREATE INDEX CONCURRENTLY can not run inside a transaction
+        with connection.cursor() as cursor:
+            for statement in statements:
+                if options['verbosity'] > 1:
+                    self.stdout.write(statement)
+                cursor.execute(statement)
+        self.stdout.write('{0} trigram indexes in place.'.format(len(statements) - 1))
+
+# ----------------------------------------------------------------------------------------------------------------------
@@ -3,6 +3,8 @@ import re
 from django.db import connection
 
 from django.conf import settings
+from chembl_webservices.core.routers import pin_replica
+from chembl_webservices.core.routers import replica_pool
 
 words_re = re.compile( r'\s+' )
 
@@ -65,4 +67,43 @@ class SqlPrintingMiddleware(object):
             replace_tuple = (" "*indentation, str(total_time))
             print("%s\033[1;32m[TOTAL TIME: %s seconds]\033[0m" % replace_tuple)
 
-        return response
\ No newline at end of file
+        return response
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+
+class ReplicaPinningMiddleware(object):
+    """
+    Pins every request to one read replica (see ``chembl_webservices.core.routers``), so all its queries, e.g. the
+    count and the rows of a page, read the same copy of the data. The pin is released when the response is closed,
+    after the content of a streaming response has been generated.
+    """
+
+    def __init__(self, get_response=None):
+        self.get_response = get_response
+        super(ReplicaPinningMiddleware, self).__init__()
+
+    def __call__(self, request):
+        alias = replica_pool.choose()
+        replica_pool.acquire(alias)
+        pin_replica(alias)
+        try:
+            response = self.get_response(request)
+        except BaseException:
+            self.unpin(alias)
+            raise
+        close = response.close
+
+        def close_and_unpin():
+            try:
+                close()
+            finally:
+                self.unpin(alias)
+
+        response.close = close_and_unpin
+        return response
+
+    @staticmethod
+    def unpin(alias):
+        pin_replica(None)
+        replica_pool.release(alias)
@@ -1 +1,69 @@
 __author__ = 'mnowotka'
+
+from django.db import models
+from chembl_core_db.db.customFields import ChemblNoLimitDecimalField
+from chembl_core_db.db.customFields import ChemblNullableBooleanField
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+
+class ActivityReadTable(models.Model):
+    """
+    Flattened copy of the ``activity`` resource, one row per activity with a column per field, built at release load
+    by the ``build_read_table`` management command. Not managed by migrations, the command creates it.
+    Nested resources are stored as JSON, the ligand efficiency fields also get a column each to filter and sort on.
+    """
+
+    activity_id = models.BigIntegerField(primary_key=True)
+    activity_comment = models.CharField(max_length=4000, blank=True, null=True)
+    assay_chembl_id = models.CharField(max_length=20, db_index=True)
+    assay_description = models.CharField(max_length=4000, blank=True, null=True)
+    assay_type = models.CharField(max_length=1, blank=True, null=True)
+    bao_endpoint = models.CharField(max_length=11, blank=True, null=True)
+    bao_format = models.CharField(max_length=11, blank=True, null=True)
+    bao_label = models.CharField(max_length=100, blank=True, null=True)
+    canonical_smiles = models.CharField(max_length=4000, blank=True, null=True)
+    data_validity_comment = models.CharField(max_length=30, blank=True, null=True)
+    data_validity_description = models.CharField(max_length=200, blank=True, null=True)
+    document_chembl_id = models.CharField(max_length=20, blank=True, null=True, db_index=True)
+    document_journal = models.CharField(max_length=50, blank=True, null=True)
+    document_year = models.IntegerField(blank=True, null=True)
+    molecule_chembl_id = models.CharField(max_length=20, blank=True, null=True, db_index=True)
+    molecule_pref_name = models.CharField(max_length=255, blank=True, null=True)
+    parent_molecule_chembl_id = models.CharField(max_length=20, blank=True, null=True, db_index=True)
+    pchembl_value = models.DecimalField(max_digits=4, decimal_places=2, blank=True, null=True, db_index=True)
+    potential_duplicate = ChemblNullableBooleanField()
+    qudt_units = models.CharField(max_length=70, blank=True, null=True)
+    record_id = models.BigIntegerField(blank=True, null=True)
+    relation = models.CharField(max_length=150, blank=True, null=True)
+    src_id = models.IntegerField(blank=True, null=True)
+    standard_flag = ChemblNullableBooleanField()
+    standard_relation = models.CharField(max_length=50, blank=True, null=True)
+    standard_text_value = models.CharField(max_length=3000, blank=True, null=True)
+    standard_type = models.CharField(max_length=250, blank=True, null=True, db_index=True)
+    standard_units = models.CharField(max_length=100, blank=True, null=True)
+    standard_upper_value = ChemblNoLimitDecimalField(blank=True, null=True)
+    standard_value = ChemblNoLimitDecimalField(blank=True, null=True)
+    target_chembl_id = models.CharField(max_length=20, blank=True, null=True, db_index=True)
+    target_organism = models.CharField(max_length=150, blank=True, null=True, db_index=True)
+    target_pref_name = models.CharField(max_length=200, blank=True, null=True)
+    target_tax_id = models.IntegerField(blank=True, null=True)
+    text_value = models.CharField(max_length=3000, blank=True, null=True)
+    toid = models.IntegerField(blank=True, null=True)
+    type = models.CharField(max_length=750, blank=True, null=True)
+    units = models.CharField(max_length=300, blank=True, null=True)
+    uo_units = models.CharField(max_length=10, blank=True, null=True)
+    upper_value = ChemblNoLimitDecimalField(blank=True, null=True)
+    value = ChemblNoLimitDecimalField(blank=True, null=True)
+    ligand_efficiency = models.TextField(blank=True, null=True)
+    ligand_efficiency_bei = models.DecimalField(max_digits=9, decimal_places=2, blank=True, null=True)
+    ligand_efficiency_le = models.DecimalField(max_digits=9, decimal_places=2, blank=True, null=True)
+    ligand_efficiency_lle = models.DecimalField(max_digits=9, decimal_places=2, blank=True, null=True)
+    ligand_efficiency_sei = models.DecimalField(max_digits=9, decimal_places=2, blank=True, null=True)
+    activity_properties = models.TextField(blank=True, null=True)
+
+    class Meta:
+        managed = False
+        db_table = 'ws_activity_read'
+
+# ----------------------------------------------------------------------------------------------------------------------
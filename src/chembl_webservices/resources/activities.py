@@ -3,6 +3,8 @@ __author__ = 'mnowotka'
 from tastypie import fields
 from tastypie.resources import ALL, ALL_WITH_RELATIONS
 from chembl_webservices.core.resource import ChemblModelResource
+from chembl_webservices.core.readtable import JSONColumnField
+from chembl_webservices.core.readtable import ReadTableResource
 from chembl_webservices.core.meta import ChemblResourceMeta
 from chembl_webservices.core.serialization import ChEMBLApiSerializer
 from chembl_webservices.core.utils import NUMBER_FILTERS, CHAR_FILTERS, FLAG_FILTERS
@@ -27,6 +29,7 @@ from chembl_core_model.models import MoleculeDictionary
 from chembl_core_model.models import TargetDictionary
 from chembl_core_model.models import Source
 from chembl_core_model.models import LigandEff
+from chembl_webservices.models import ActivityReadTable
 
 
 from chembl_webservices.core.fields import monkeypatch_tastypie_field
@@ -125,6 +128,12 @@ class ActivityResource(ChemblModelResource):
         resource_name = 'activity'
         collection_name = 'activities'
         serializer = ChEMBLApiSerializer(resource_name, {collection_name: resource_name, 'activity_properties': 'activity_properties'})
+        query_budget = {'list': 10, 'detail': 5, 'set': 5, 'search': 10}
+        # unanchored text filters match too many rows to be counted, the planner estimate is returned instead
+        max_query_cost = 10000000
+        query_cost_action = 'estimate_count'
+        read_table = 'chembl_webservices.resources.activities.ActivityReadTableResource'
+        heavy_fields = ('assay_description',)
         prefetch_related = [
                             Prefetch('assay', queryset=Assays.objects.only('description', 'chembl', 'assay_id',
                                                                            'target', 'assay_type',
@@ -246,6 +255,35 @@ class ActivityResource(ChemblModelResource):
 # ----------------------------------------------------------------------------------------------------------------------
 
 
+class ActivityReadTableResource(ReadTableResource):
+
+    target_tax_id = fields.CharField('target_tax_id', null=True, blank=True)
+    ligand_efficiency = JSONColumnField('ligand_efficiency', null=True, blank=True)
+    activity_properties = JSONColumnField('activity_properties', null=True, blank=True)
+
+    class Meta(ChemblResourceMeta):
+        queryset = ActivityReadTable.objects.all()
+        resource_name = ActivityResource.Meta.resource_name
+        collection_name = ActivityResource.Meta.collection_name
+        serializer = ActivityResource.Meta.serializer
+        max_query_cost = ActivityResource.Meta.max_query_cost
+        query_cost_action = ActivityResource.Meta.query_cost_action
+        heavy_fields = ActivityResource.Meta.heavy_fields
+        prefetch_related = []
+        nested_columns = {'ligand_efficiency': ('bei', 'le', 'lle', 'sei')}
+        filtering = dict(((field, filters) for field, filters in ActivityResource.Meta.filtering.items()
+                          if field not in ('activity_properties', 'ligand_efficiency')),
+                         ligand_efficiency_bei=NUMBER_FILTERS,
+                         ligand_efficiency_le=NUMBER_FILTERS,
+                         ligand_efficiency_lle=NUMBER_FILTERS,
+                         ligand_efficiency_sei=NUMBER_FILTERS)
+        ordering = [field for field in ActivityResource.Meta.ordering
+                    if field not in ('activity_properties', 'ligand_efficiency')] + \
+                   ['ligand_efficiency_bei', 'ligand_efficiency_le', 'ligand_efficiency_lle', 'ligand_efficiency_sei']
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+
 class ActivitySuppResource(ChemblModelResource):
     class Meta(ChemblResourceMeta):
         queryset = ActivitySupp.objects.all()
@@ -303,7 +341,9 @@ class ActivitySuppByActivityResource(ChemblModelResource):
         queryset = Activities.objects.filter(activitysuppmap__isnull=False).distinct()
         resource_name = 'activity_supplementary_data_by_activity'
         collection_name = 'activity_supplementary_data_by_activity'
+        heavy_fields = ('assay_description',)
         serializer = ChEMBLApiSerializer(resource_name, {collection_name: resource_name, 'activity_properties': 'activity_properties', 'supplementary_data': 'activity_smid'})
+        query_budget = {'list': 30, 'detail': 20, 'set': 20, 'search': 30}
         prefetch_related = [
                             Prefetch(
                                 'activity_supps'
@@ -122,10 +122,14 @@ class AssayResource(ChemblModelResource):
     class Meta(ChemblResourceMeta):
         queryset = Assays.objects.all()
         es_join_column = 'chembl_id'
+        es_source_search = True
         excludes = ['assay_id']
         resource_name = 'assay'
         collection_name = 'assays'
         detail_uri_name = 'chembl_id'
+        heavy_fields = ('description',)
+        # regular expressions on the description scan the whole table
+        max_query_cost = 2000000
         serializer = ChEMBLApiSerializer(resource_name, {collection_name: resource_name, 'assay_classifications': 'assay_class', 'assay_parameters': 'assay_parameters'})
         prefetch_related = [Prefetch('assay_type', queryset=AssayType.objects.only('assay_type', 'assay_desc')),
                             Prefetch('cell', queryset=CellDictionary.objects.only('chembl_id')),
@@ -68,12 +68,10 @@ class AtcResource(ChemblModelResource):
             level = self.get_level(pk)
             kwargs[level] = pk
         filters.update(kwargs)
-        applicable_filters, distinct = self.build_filters(filters=filters)
+        applicable_filters = self.build_filters(filters=filters)
 
         try:
             objects = self.apply_filters(bundle.request, applicable_filters)
-            if distinct:
-                objects = objects.distinct()
             if objects.count() <= 0:
                 raise ObjectDoesNotExist("Couldn't find an instance of '%s' which matched '%s'." %
                                          (self._meta.object_class.__name__, stringified_kwargs))
@@ -7,8 +7,6 @@ from chembl_webservices.core.resource import ChemblModelResource
 from chembl_webservices.core.meta import ChemblResourceMeta
 from chembl_webservices.core.serialization import ChEMBLApiSerializer
 from django.conf.urls import url
-from django.core.exceptions import ObjectDoesNotExist
-from tastypie.exceptions import Unauthorized
 from django.db.models import Prefetch
 
 from chembl_core_model.models import CellDictionary
@@ -92,7 +90,7 @@ class CellLineResource(ChemblModelResource):
         Returns a serialized list of resources based on the identifiers
         from the URL.
 
-        Calls ``obj_get`` to fetch only the objects requested. This method
+        Calls ``cached_obj_get_many`` to fetch only the objects requested. This method
         only responds to HTTP GET.
 
         Should return a HttpResponse (200 OK).
@@ -110,18 +108,9 @@ class CellLineResource(ChemblModelResource):
                 obj_identifiers = value.split(';')
                 break
 
-        objects = []
-        not_found = []
         base_bundle = self.build_bundle(request=request)
-
-        for identifier in obj_identifiers:
-            try:
-                obj, _ = self.cached_obj_get(bundle=base_bundle, **{detail_uri_name: identifier})
-                bundle = self.build_bundle(obj=obj, request=request)
-                bundle = self.full_dehydrate(bundle, for_list=True, **kwargs)
-                objects.append(bundle)
-            except (ObjectDoesNotExist, Unauthorized):
-                not_found.append(identifier)
+        found = self.cached_obj_get_many(base_bundle, detail_uri_name, obj_identifiers)
+        objects, not_found = self.dehydrate_multiple(request, found, obj_identifiers, **kwargs)
 
         object_list = {
             self._meta.collection_name: objects,
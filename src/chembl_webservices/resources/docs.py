@@ -29,10 +29,12 @@ class DocsResource(ChemblModelResource):
     class Meta(ChemblResourceMeta):
         queryset = Docs.objects.all()
         es_join_column = 'chembl_id'
+        es_source_search = True
         excludes = ['doc_id']
         resource_name = 'document'
         collection_name = 'documents'
         detail_uri_name = 'chembl_id'
+        heavy_fields = ('abstract',)
         serializer = ChEMBLApiSerializer(resource_name, {collection_name: resource_name})
         prefetch_related = [Prefetch('journal_id', queryset=Journals.objects.only('pk', 'title'))]
 
@@ -56,6 +56,8 @@ class ImageResource(ChemblModelResource):
         serializer = fakeSerializer
         default_format = 'image/svg+xml'
         fields = ('image',)
+        # images of a structure, not measured by the query budget test
+        query_budget = None
         description = {'api_dispatch_detail' : '''
 Get image of the compound, specified by
 
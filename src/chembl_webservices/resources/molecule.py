@@ -13,7 +13,6 @@ from chembl_webservices.core.resource import ChemblModelResource, get_es_connect
 from chembl_webservices.core.serialization import ChEMBLApiSerializer
 from chembl_webservices.core.meta import ChemblResourceMeta
 from django.core.exceptions import ObjectDoesNotExist
-from tastypie.exceptions import Unauthorized
 from django.db.models.constants import LOOKUP_SEP
 from tastypie.utils import dict_strip_unicode_keys
 from django.db.models import Prefetch
@@ -148,6 +147,7 @@ class MoleculeStructuresResource(ChemblModelResource):
         queryset = CompoundStructures.objects.all()
         # excludes = ['molfile']
         resource_name = 'molecule_structures'
+        heavy_fields = ('molfile',)
         collection_name = 'molecule_structures'
         serializer = ChEMBLApiSerializer(resource_name, {collection_name: resource_name})
 
@@ -254,6 +254,7 @@ class MoleculeResource(ChemblModelResource):
         queryset = MoleculeDictionary.objects.all() if 'downgraded' not in available_fields else \
                     MoleculeDictionary.objects.exclude(downgraded=True)
         es_join_column = 'chembl_id'
+        es_source_search = True
         excludes = ['molregno']
         resource_name = 'molecule'
         collection_name = 'molecules'
@@ -445,7 +446,7 @@ _SMILES_.
         Returns a serialized list of resources based on the identifiers
         from the URL.
 
-        Calls ``obj_get`` to fetch only the objects requested. This method
+        Calls ``cached_obj_get_many`` to fetch only the objects requested. This method
         only responds to HTTP GET.
 
         Should return a HttpResponse (200 OK).
@@ -463,18 +464,9 @@ _SMILES_.
                 obj_identifiers = value.split(';')
                 break
 
-        objects = []
-        not_found = []
         base_bundle = self.build_bundle(request=request)
-
-        for identifier in obj_identifiers:
-            try:
-                obj, _ = self.cached_obj_get(bundle=base_bundle, **{detail_uri_name: identifier})
-                bundle = self.build_bundle(obj=obj, request=request)
-                bundle = self.full_dehydrate(bundle, for_list=True, **kwargs)
-                objects.append(bundle)
-            except (ObjectDoesNotExist, Unauthorized):
-                not_found.append(identifier)
+        found = self.cached_obj_get_many(base_bundle, detail_uri_name, obj_identifiers)
+        objects, not_found = self.dehydrate_multiple(request, found, obj_identifiers, **kwargs)
 
         object_list = {
             self._meta.collection_name: objects,
@@ -503,6 +495,16 @@ _SMILES_.
         decoded_kwargs = self.decode_plus(kwargs)
         return super(MoleculeResource, self).remove_api_resource_names(decoded_kwargs)
 
+# ----------------------------------------------------------------------------------------------------------------------
+
+    def requested_heavy_fields(self, request, params):
+        included = super(MoleculeResource, self).requested_heavy_fields(request, params)
+        if included is not None and self.determine_format(request) in (MoleculeSerializer.content_types['mol'],
+                                                                        MoleculeSerializer.content_types['sdf']):
+            # the SDF of a list is made of the molfiles
+            included |= {'molfile'}
+        return included
+
 # ----------------------------------------------------------------------------------------------------------------------
 
     def alter_list_data_to_serialize(self, request, data):
@@ -517,7 +519,8 @@ _SMILES_.
         if 'molecule_structures' in data.data:
             mol_struts = data.data['molecule_structures']
             sdf_style = request.format != 'mol'
-            if mol_struts is not None and mol_struts.data is not None and sdf_style:
+            if mol_struts is not None and mol_struts.data is not None and sdf_style and \
+                    mol_struts.data.get('molfile') is not None:
                 mol_struts.data['molfile'] += '\n\n> <chembl_id>\n{0}\n\n'.format(data.data.get('molecule_chembl_id'))
                 mol_struts.data['molfile'] += '> <chembl_pref_name>\n{0}\n\n'.format(data.data.get(
                     'pref_name', 'undefined')
@@ -595,7 +598,7 @@ _SMILES_.
     def _get_cache_args(self, *args, **kwargs):
         cache_ordered_dict = super(MoleculeResource, self)._get_cache_args(*args, **kwargs)
         smooshed = []
-        filters, _ = self.build_filters(kwargs, for_cache_key=True)
+        filters = self.build_filters(kwargs, for_cache_key=True)
         for key, value in list(filters.items()):
             smooshed.append("%s=%s" % (key, value))
         cache_ordered_dict['filters'] = '|'.join(sorted(smooshed))
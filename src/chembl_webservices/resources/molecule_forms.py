@@ -8,7 +8,6 @@ from tastypie import http
 from tastypie import fields
 from tastypie.utils import trailing_slash
 from tastypie.exceptions import BadRequest
-from tastypie.exceptions import Unauthorized
 from tastypie.exceptions import ImmediateHttpResponse
 from django.conf.urls import url
 from django.db.models import Q
@@ -168,46 +167,10 @@ class MoleculeFormsResource(ChemblModelResource):
 
 # ----------------------------------------------------------------------------------------------------------------------
 
-    def get_multiple(self, request, **kwargs):
-        """
-        Returns a serialized list of resources based on the identifiers
-        from the URL.
-
-        Calls ``obj_get`` to fetch only the objects requested. This method
-        only responds to HTTP GET.
-
-        Should return a HttpResponse (200 OK).
-        """
-        self.method_check(request, allowed=['get'])
-        self.is_authenticated(request)
-        self.throttle_check(request)
-
-        # Rip apart the list then iterate.
-        kwarg_name = '%s_list' % self._meta.detail_uri_name
-        obj_identifiers = kwargs.get(kwarg_name, '').split(';')
-        objects = []
-        not_found = []
-        base_bundle = self.build_bundle(request=request)
-
-        for identifier in obj_identifiers:
-            try:
-                obj, _ = self.cached_obj_get(bundle=base_bundle, **{self._meta.detail_uri_name: identifier})
-                bundle = self.build_bundle(obj=obj, request=request)
-                bundle = self.full_dehydrate(bundle, for_list=True, **kwargs)
-                bundle = self.alter_detail_data_to_serialize(request, bundle)
-                objects.append(bundle)
-            except (ObjectDoesNotExist, Unauthorized):
-                not_found.append(identifier)
-
-        object_list = {
-            self._meta.collection_name: objects,
-        }
-
-        if len(not_found):
-            object_list['not_found'] = not_found
-
-        self.log_throttled_access(request)
-        return self.create_response(request, object_list)
+    def dehydrate_multiple(self, request, found, identifiers, **kwargs):
+        objects, not_found = super(MoleculeFormsResource, self).dehydrate_multiple(request, found, identifiers,
+                                                                                    **kwargs)
+        return [self.alter_detail_data_to_serialize(request, bundle) for bundle in objects], not_found
 
 # ----------------------------------------------------------------------------------------------------------------------
 
@@ -220,11 +183,8 @@ class MoleculeFormsResource(ChemblModelResource):
         """
         pk = filters.get(self._meta.detail_uri_name)
         if not pk:
-            applicable_filters, distinct = self.build_filters(filters=filters)
-            objects = super(MoleculeFormsResource, self).apply_filters(request, applicable_filters)
-            if distinct:
-                objects = objects.distinct()
-            return objects
+            applicable_filters = self.build_filters(filters=filters)
+            return super(MoleculeFormsResource, self).apply_filters(request, applicable_filters)
 
         objects = self.get_object_list(request).filter(Q(molecule__chembl_id=pk) |
                                                        Q(parent_molecule__chembl_id=pk)).distinct()
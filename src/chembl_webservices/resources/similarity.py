@@ -16,7 +16,6 @@ from django.urls import NoReverseMatch
 from django.core.exceptions import MultipleObjectsReturned, ObjectDoesNotExist
 from chembl_webservices.resources.molecule import MoleculeResource
 from tastypie.exceptions import InvalidSortError
-from chembl_webservices.core.utils import list_flatten
 from chembl_webservices.core.fpsim2_helper import get_similar_molregnos
 from tastypie.exceptions import ImmediateHttpResponse
 
@@ -41,6 +40,12 @@ class SimilarityResource(MoleculeResource):
         queryset = MoleculeDictionary.objects.all()
         resource_name = 'similarity'
         required_params = {'api_dispatch_detail': ['smiles', 'similarity']}
+        # no search endpoint
+        es_source_search = False
+        # the urls need a structure and a similarity, aspirin is looked up by ChEMBL id and by SMILES
+        endpoint_paths = {'list': 'CHEMBL25/70.{fmt}?limit={limit}',
+                          'detail': 'CC(=O)Oc1ccccc1C(=O)O/70.{fmt}?limit={limit}'}
+        query_budget = {'list': 20, 'detail': 20}
 
 # ----------------------------------------------------------------------------------------------------------------------
 
@@ -121,29 +126,15 @@ class SimilarityResource(MoleculeResource):
             except DatabaseError as e:
                 self._handle_database_error(e, bundle.request, {'smiles': smiles})
 
-            filters = {}
-
-            standard_filters, distinct = self.build_filters(filters=kwargs)
-
-            filters.update(standard_filters)
+            standard_filters = self.build_filters(filters=kwargs)
             try:
-                only = filters.get('only')
-                if only:
-                    del filters['only']
-                    if isinstance(only, str):
-                        only = only.split(',')
-                    only = list(set(list_flatten(only)))
-                objects = self.get_object_list(bundle.request).filter(pk__in=[sim[0] for sim in similar_molregnos])\
-                    .filter(**filters)
+                objects = self.get_object_list(bundle.request).filter(pk__in=[sim[0] for sim in similar_molregnos])
                 if chembl_id:
                     objects = objects.exclude(chembl_id=chembl_id)
-                if only:
-                    objects = objects.only(
-                        *[self.fields[field].attribute for field in only if field in self.fields and field != 'similarity'])
+                objects = self.chain_filters(objects, standard_filters)
             except ValueError:
                 raise BadRequest("Invalid resource lookup data provided (mismatched type).")
-            if distinct:
-                objects = objects.distinct()
+            objects = self.defer_heavy_fields(objects, kwargs.get('include'))
             objects = self.apply_sorting(objects, similarity_map, options=kwargs)
             return self.authorized_read_list(objects, bundle)
         except:
@@ -295,7 +286,8 @@ class SimilarityResource(MoleculeResource):
     def get_resource_uri(self, bundle_or_obj=None, url_name='dispatch_list'):
         if bundle_or_obj is not None:
             url_name = 'dispatch_detail'
-
+        if url_name == 'api_dispatch_list':
+            url_name = 'dispatch_list'
         try:
             return self._build_reverse_url(url_name, kwargs=self.resource_uri_kwargs(bundle_or_obj))
         except NoReverseMatch:
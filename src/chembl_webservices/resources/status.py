@@ -29,6 +29,8 @@ class StatusResource(ChemblModelResource):
         serializer = ChEMBLApiSerializer(resource_name)
         # This line is required to prevent Django ImproperlyConfigured: ModelResource
         object_class = None
+        # no list or detail, not measured by the query budget test
+        query_budget = None
 
 # ----------------------------------------------------------------------------------------------------------------------
 
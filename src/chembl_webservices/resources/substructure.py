@@ -6,7 +6,6 @@ from django.conf.urls import url
 from django.urls import NoReverseMatch
 from django.core.exceptions import MultipleObjectsReturned, ObjectDoesNotExist
 from chembl_webservices.resources.molecule import MoleculeResource
-from chembl_webservices.core.utils import list_flatten
 import itertools
 from django.conf import settings
 
@@ -29,6 +28,13 @@ class SubstructureResource(MoleculeResource):
     class Meta(MoleculeResource.Meta):
         queryset = MoleculeDictionary.objects.all()
         resource_name = 'substructure'
+        # unselective substructure queries scan the structure index
+        statement_timeout = dict(MoleculeResource.Meta.statement_timeout, list=120)
+        # no search endpoint
+        es_source_search = False
+        # the urls need a structure, aspirin is looked up by ChEMBL id and by SMILES
+        endpoint_paths = {'list': 'CHEMBL25.{fmt}?limit={limit}', 'detail': 'CC(=O)Oc1ccccc1C(=O)O.{fmt}?limit={limit}'}
+        query_budget = {'list': 20, 'detail': 20}
 
 # ----------------------------------------------------------------------------------------------------------------------
 
@@ -100,23 +106,8 @@ class SubstructureResource(MoleculeResource):
 
         mols = CompoundMols.objects.with_substructure(smiles).defer('molfile').values_list('molecule_id', flat=True)
 
-        filters = {}
-
-        standard_filters, distinct = self.build_filters(filters=kwargs)
-
-        filters.update(standard_filters)
-
-        only = filters.get('only')
-        if only:
-            del filters['only']
-            if isinstance(only, str):
-                only = only.split(',')
-            only = list(set(list_flatten(only)))
-        objects = self.get_object_list(bundle.request).filter(pk__in=mols).filter(**filters)
-        if only:
-            objects = objects.only(*[self.fields[field].attribute for field in only if field in self.fields])
-        if distinct:
-            objects = objects.distinct()
+        standard_filters = self.build_filters(filters=kwargs)
+        objects = self.chain_filters(self.get_object_list(bundle.request).filter(pk__in=mols), standard_filters)
         return self.authorized_read_list(objects, bundle)
 
 # ----------------------------------------------------------------------------------------------------------------------
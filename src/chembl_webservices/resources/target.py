@@ -137,6 +137,7 @@ class TargetResource(ChemblModelResource):
         queryset = TargetDictionary.objects.all() if 'downgraded' not in available_fields else \
             TargetDictionary.objects.filter(downgraded=False)
         es_join_column = 'chembl_id'
+        es_source_search = True
         excludes = ['tid']
         resource_name = 'target'
         collection_name = 'targets'
@@ -19,6 +19,8 @@ class BaseWebServiceTestCase(unittest.TestCase):
     id_property = None
     resource_expected_count = -1
     mandatory_properties = []
+    # heavy fields (Meta.heavy_fields) among the mandatory properties, lists only have them with include=
+    list_include = []
     sorting_test_props = []
 
     # ------------------------------------------------------------------------------------------------------------------
@@ -142,7 +144,8 @@ class BaseWebServiceTestCase(unittest.TestCase):
 
     def test_all(self):
         if self.resource:
-            resource_req = self.get_resource_list(self.resource)
+            resource_req = self.get_resource_list(self.resource,
+                                                  {'include': ','.join(self.list_include)} if self.list_include else None)
             total_count = resource_req['page_meta']['total_count']
             self.assertEqual(total_count, self.resource_expected_count)
             first_resources = resource_req[self.get_current_plural()]
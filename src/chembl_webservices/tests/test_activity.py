@@ -39,6 +39,7 @@ class ActivityTestCase(BaseWebServiceTestCase):
         'uo_units',
         'ligand_efficiency'
     ]
+    list_include = ['assay_description']
     sorting_test_props = ['assay_type', 'standard_type']
 
 
@@ -108,7 +109,8 @@ class ActivityTestCase(BaseWebServiceTestCase):
     def test_activity_assay_description_search(self):
         text_test = 'tg-gates'
         act_list_req = self.get_current_resource_list({
-            'assay_description__icontains': text_test.upper()
+            'assay_description__icontains': text_test.upper(),
+            'include': 'assay_description',
         })
         upper_ocunt = act_list_req['page_meta']['total_count']
         self.assertGreaterEqual(act_list_req['page_meta']['total_count'], 210700)
@@ -119,7 +121,8 @@ class ActivityTestCase(BaseWebServiceTestCase):
 
 
         act_list_req = self.get_current_resource_list({
-            'assay_description__icontains': text_test
+            'assay_description__icontains': text_test,
+            'include': 'assay_description',
         })
         self.assertEqual(act_list_req['page_meta']['total_count'], upper_ocunt,
                           'Upper and lower case search does not match')
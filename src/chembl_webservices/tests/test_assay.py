@@ -32,6 +32,7 @@ class AssayTestCase(BaseWebServiceTestCase):
         'src_id',
         'target_chembl_id',
     ]
+    list_include = ['description']
 
     def test_assay_by_id(self):
         self.assertEqual(self.get_current_resource_by_id('CHEMBL1217643')['assay_organism'], 'Homo sapiens')
@@ -0,0 +1,144 @@
+__author__ = 'mnowotka'
+
+import os
+import json
+import unittest
+from unittest import mock
+from types import SimpleNamespace
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'chembl_ws_app.settings')
+
+import django
+try:
+    django.setup()
+except (Exception, SystemExit) as e:
+    raise unittest.SkipTest('Django settings could not be loaded: {0}'.format(e))
+
+from django.db import OperationalError
+from django.test import override_settings
+from django.test import RequestFactory
+from tastypie.exceptions import BadRequest
+from chembl_webservices.resources.activities import ActivityResource
+
+
+class ParseBulkIdentifiersTestCase(unittest.TestCase):
+    """
+    Reads the identifiers of bulk request bodies.
+    """
+
+    def setUp(self):
+        self.resource = ActivityResource()
+
+    # ------------------------------------------------------------------------------------------------------------------
+    # Helper functions
+    # ------------------------------------------------------------------------------------------------------------------
+
+    def parse(self, body, content_type='text/plain'):
+        request = RequestFactory().post('/chembl/api/data/activity/bulk', body, content_type=content_type)
+        return self.resource.parse_bulk_identifiers(request)
+
+    # ------------------------------------------------------------------------------------------------------------------
+    # Tests
+    # ------------------------------------------------------------------------------------------------------------------
+
+    def test_json(self):
+        self.assertEqual(self.parse('["1", 2, " 3 ", ""]', 'application/json'), ['1', '2', '3'])
+        self.assertEqual(self.parse('  ["1", "2"]'), ['1', '2'])
+
+    def test_lines(self):
+        self.assertEqual(self.parse('1\r\n 2 \n\n"3"\n"a;b"\n'), ['1', '2', '3', 'a;b'])
+
+    def test_invalid(self):
+        for body, content_type in (('["1", ', 'application/json'), ('{"id": 1}', 'application/json'),
+                                   ('"1\n', 'text/plain'), ('\n \n', 'text/plain'), ('[]', 'application/json')):
+            with self.subTest(body=body):
+                with self.assertRaises(BadRequest):
+                    self.parse(body, content_type)
+        with self.assertRaises(BadRequest):
+            self.parse(b'\xff\xfe', 'text/plain')
+
+    @override_settings(BULK_LOOKUP_MAX_IDENTIFIERS=3)
+    def test_max_identifiers(self):
+        self.assertEqual(self.parse('1\n2\n3'), ['1', '2', '3'])
+        with self.assertRaises(BadRequest) as raised:
+            self.parse('1\n2\n3\n4')
+        self.assertIn('the maximum is 3', str(raised.exception))
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+
+class GetBulkTestCase(unittest.TestCase):
+    """
+    Streams bulk lookups two identifiers at a time, ``cached_obj_get_many`` is stubbed to serve the activities with
+    an even id and to fail on ``failing``.
+    """
+
+    def setUp(self):
+        self.resource = ActivityResource()
+        self.resource.cached_obj_get_many = self.cached_obj_get_many
+        self.resource.full_dehydrate = self.full_dehydrate
+        patcher = mock.patch('chembl_webservices.core.resource.BULK_LOOKUP_CHUNK_SIZE', 2)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.failing = None
+        self.chunks = []
+
+    # ------------------------------------------------------------------------------------------------------------------
+    # Helper functions
+    # ------------------------------------------------------------------------------------------------------------------
+
+    def cached_obj_get_many(self, bundle, identifier_name, identifiers, store=True):
+        self.chunks.append((identifier_name, list(identifiers), store))
+        if self.failing in identifiers:
+            raise OperationalError('server closed the connection unexpectedly')
+        return dict((identifier, SimpleNamespace(activity_id=int(identifier))) for identifier in identifiers
+                    if int(identifier) % 2 == 0)
+
+    @staticmethod
+    def full_dehydrate(bundle, **kwargs):
+        bundle.data = {'activity_id': bundle.obj.activity_id}
+        return bundle
+
+    def get_bulk(self, body, fmt='json'):
+        request = RequestFactory().post('/chembl/api/data/activity/bulk', body, content_type='text/plain')
+        request.format = fmt
+        request.statement_timeout = None
+        return self.resource.get_bulk(request)
+
+    @staticmethod
+    def content(response):
+        return b''.join(response.streaming_content).decode('utf-8')
+
+    # ------------------------------------------------------------------------------------------------------------------
+    # Tests
+    # ------------------------------------------------------------------------------------------------------------------
+
+    def test_stream(self):
+        data = json.loads(self.content(self.get_bulk('4\n1\n2\n3\n6')))
+        self.assertEqual([activity['activity_id'] for activity in data['activities']], [4, 2, 6])
+        self.assertEqual(data['not_found'], ['1', '3'])
+        self.assertEqual(self.chunks, [('pk', ['4', '1'], False), ('pk', ['2', '3'], False), ('pk', ['6'], False)])
+
+    def test_first_chunk_error(self):
+        # nothing is sent yet, the error is raised to be answered like those of the other views
+        self.failing = '1'
+        with self.assertRaises(OperationalError):
+            self.get_bulk('1\n2\n3')
+
+    @override_settings(TASTYPIE_CANNED_ERROR='Sorry.')
+    def test_error_tail(self):
+        self.failing = '6'
+        response = self.get_bulk('2\n3\n4\n5\n6\n8')
+        self.assertEqual(response.status_code, 200)
+        data = json.loads(self.content(response))
+        self.assertEqual([activity['activity_id'] for activity in data['activities']], [2, 4])
+        self.assertEqual(data['not_found'], ['3', '5'])
+        self.assertEqual(data['error_message'], 'Sorry.')
+        self.assertEqual(len(self.chunks), 3)
+
+    def test_other_formats(self):
+        response = self.get_bulk('2\n3\n4', fmt='xml')
+        self.assertFalse(getattr(response, 'streaming', False))
+        self.assertEqual(len(self.chunks), 2)
+
+# ----------------------------------------------------------------------------------------------------------------------
@@ -1,3 +1,5 @@
+import json
+import requests
 from requests.exceptions import RetryError
 
 from chembl_webservices.tests import BaseWebServiceTestCase
@@ -165,6 +167,16 @@ class CompoundTestCase(BaseWebServiceTestCase):
             self.assertEqual(inchi_from_ctab, mol_data['molecule_structures']['standard_inchi'])
 
 
+    def test_molfile_include(self):
+        params = {'molecule_structures__standard_inchi_key__exact': 'BSYNRYMUTXBXSQ-UHFFFAOYSA-N'}
+        molecule = self.get_current_resource_list(params)['molecules'][0]
+        self.assertNotIn('molfile', molecule['molecule_structures'])
+        molecule = self.get_current_resource_list(dict(params, include='molfile'))['molecules'][0]
+        self.assertIn('molfile', molecule['molecule_structures'])
+        self.assertIn('molfile', self.get_current_resource_by_id('CHEMBL25')['molecule_structures'])
+        sdf_file = self.get_resource_list(self.resource, params, custom_format='sdf')
+        self.assertTrue(sdf_file.startswith(self.get_current_resource_by_id('CHEMBL25', custom_format='mol')))
+
     def test_no_structure(self):
         no_structure_doc = self.get_current_resource_by_id('CHEMBL6961')
         self.assertIsNone(no_structure_doc['molecule_structures'])
@@ -310,3 +322,33 @@ class CompoundTestCase(BaseWebServiceTestCase):
             self.get_current_resource_list({'molecule_synonyms__molecule_synonym__icontains': 'bayer'})
             ['page_meta']['total_count'], 15
         )
+
+    def test_nested_only(self):
+        comp_list_req = self.get_current_resource_list({
+            'only': 'molecule_chembl_id,molecule_properties.full_mwt,molecule_structures.canonical_smiles'
+        })
+        for molecule in comp_list_req[self.get_current_plural()]:
+            self.assertEqual(set(molecule.keys()),
+                             {'molecule_chembl_id', 'molecule_properties', 'molecule_structures'})
+            if molecule['molecule_properties'] is not None:
+                self.assertEqual(list(molecule['molecule_properties'].keys()), ['full_mwt'])
+            if molecule['molecule_structures'] is not None:
+                self.assertEqual(list(molecule['molecule_structures'].keys()), ['canonical_smiles'])
+
+    def test_set_order_and_not_found(self):
+        chembl_ids = ['CHEMBL6505', 'CHEMBL999999999', 'CHEMBL6498', 'CHEMBL6505']
+        req_url = self.WS_URL + '/{0}/set/{1}.json'.format(self.resource, ';'.join(chembl_ids))
+        set_req = self.request_url(req_url)
+        self.assertEqual([mol['molecule_chembl_id'] for mol in set_req[self.get_current_plural()]],
+                         ['CHEMBL6505', 'CHEMBL6498', 'CHEMBL6505'])
+        self.assertEqual(set_req['not_found'], ['CHEMBL999999999'])
+
+    def test_bulk_order_and_not_found(self):
+        req_url = self.WS_URL + '/{0}/bulk.json'.format(self.resource)
+        chembl_ids = ['CHEMBL6505', 'chembl999999999', 'CHEMBL6498', 'CHEMBL6505']
+        for body in (json.dumps(chembl_ids), '\n'.join(chembl_ids)):
+            bulk_req = requests.post(req_url, data=body, timeout=self.TIMEOUT).json()
+            self.assertEqual([mol['molecule_chembl_id'] for mol in bulk_req[self.get_current_plural()]],
+                             ['CHEMBL6505', 'CHEMBL6498', 'CHEMBL6505'])
+            self.assertEqual(bulk_req['not_found'], ['CHEMBL999999999'])
+        self.assertEqual(requests.post(req_url, data='', timeout=self.TIMEOUT).status_code, 400)
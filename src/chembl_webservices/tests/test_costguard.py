@@ -0,0 +1,239 @@
+__author__ = 'mnowotka'
+
+import os
+import json
+import unittest
+from contextlib import ExitStack
+from unittest import mock
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'chembl_ws_app.settings')
+
+import django
+try:
+    django.setup()
+except (Exception, SystemExit) as e:
+    raise unittest.SkipTest('Django settings could not be loaded: {0}'.format(e))
+
+from django.db import connections
+from django.test import override_settings
+from django.test import RequestFactory
+from tastypie.cache import NoCache
+from tastypie.exceptions import BadRequest
+from chembl_core_model.models import OrganismClass
+from chembl_webservices.core import costguard
+from chembl_webservices.core.benchmark import resource_overrides
+from chembl_webservices.resources.organism import OrganismResource
+
+# an in-memory SQLite database registered next to the configured ones, serving the organism lists of the tests
+COST_ALIAS = 'costguard_test'
+
+FILTERS = {'l1__icontains': 'euk', 'l2__istartswith': 'mam', 'tax_id__gte': '9000'}
+
+
+class FakeCache(NoCache):
+    """
+    A resource cache keeping everything in a dictionary.
+    """
+
+    def __init__(self):
+        super(FakeCache, self).__init__()
+        self.data = {}
+
+    def get(self, key, **kwargs):
+        return self.data.get(key)
+
+    def set(self, key, value, timeout=None):
+        self.data[key] = value
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+
+def drop_alias():
+    connections[COST_ALIAS].close()
+    del connections.databases[COST_ALIAS]
+    if hasattr(connections._connections, COST_ALIAS):
+        delattr(connections._connections, COST_ALIAS)
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+
+class EstimateQueryTestCase(unittest.TestCase):
+    """
+    Runs ``estimate_query`` on an in-memory SQLite database with a stubbed estimator.
+    """
+
+    def setUp(self):
+        connections.databases[COST_ALIAS] = {'ENGINE': 'django.db.backends.sqlite3', 'NAME': ':memory:'}
+        self.addCleanup(drop_alias)
+        self.calls = []
+
+    # ------------------------------------------------------------------------------------------------------------------
+    # Helper functions
+    # ------------------------------------------------------------------------------------------------------------------
+
+    def estimator(self, cursor, sql, params):
+        self.calls.append((sql, list(params)))
+        return 42.0, 7
+
+    # ------------------------------------------------------------------------------------------------------------------
+    # Tests
+    # ------------------------------------------------------------------------------------------------------------------
+
+    def test_estimate(self):
+        objects = OrganismClass.objects.using(COST_ALIAS).filter(l1='Eukaryotes')
+        with mock.patch.dict(costguard.ESTIMATORS, {'sqlite': self.estimator}):
+            self.assertEqual(costguard.estimate_query(objects), (42.0, 7))
+        self.assertEqual(len(self.calls), 1)
+        self.assertIn('organism_class', self.calls[0][0])
+        self.assertEqual(self.calls[0][1], ['Eukaryotes'])
+
+    def test_empty_result(self):
+        objects = OrganismClass.objects.using(COST_ALIAS).filter(pk__in=[])
+        with mock.patch.dict(costguard.ESTIMATORS, {'sqlite': self.estimator}):
+            self.assertEqual(costguard.estimate_query(objects), (0.0, 0))
+        self.assertEqual(self.calls, [])
+
+    def test_no_estimator(self):
+        objects = OrganismClass.objects.using(COST_ALIAS).filter(l1='Eukaryotes')
+        self.assertNotIn('sqlite', costguard.ESTIMATORS)
+        self.assertIsNone(costguard.estimate_query(objects))
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+
+class QueryCostGuardTestCase(unittest.TestCase):
+    """
+    Checks filtered organism lists against a ``max_query_cost`` of 1000, ``estimate_query`` is stubbed to return the
+    estimates of ``self.estimates`` (keyed by the sorted filter expressions of the query) and the resource cache is a
+    ``FakeCache``.
+    """
+
+    def setUp(self):
+        connections.databases[COST_ALIAS] = {'ENGINE': 'django.db.backends.sqlite3', 'NAME': ':memory:'}
+        self.addCleanup(drop_alias)
+        with connections[COST_ALIAS].schema_editor() as schema_editor:
+            schema_editor.create_model(OrganismClass)
+        OrganismClass.objects.using(COST_ALIAS).create(oc_id=1, tax_id=9606, l1='Eukaryotes', l2='Mammalia',
+                                                       l3='Primates')
+        self.resource = OrganismResource()
+        self.cache = FakeCache()
+        stack = ExitStack()
+        self.addCleanup(stack.close)
+        stack.enter_context(resource_overrides(self.resource, queryset=OrganismClass.objects.using(COST_ALIAS).all(),
+                                               cache=self.cache, max_query_cost=1000, query_cost_action='reject'))
+        stack.enter_context(override_settings(QUERY_COST_GUARD=True, QUERY_COST_FILTER_EXPLAINS=1))
+        stack.enter_context(mock.patch('chembl_webservices.core.resource.estimate_query', self.estimate_query))
+        self.estimates = {
+            ('l1__icontains', 'l2__istartswith', 'tax_id__gte'): (5000.0, 1200),
+            ('l1__icontains',): (4000.0, 1500),
+            ('l2__istartswith',): (3000.0, 1000),
+            ('tax_id__gte',): (6000.0, 9000),
+        }
+        self.estimated = []
+
+    # ------------------------------------------------------------------------------------------------------------------
+    # Helper functions
+    # ------------------------------------------------------------------------------------------------------------------
+
+    def estimate_query(self, objects):
+        sql = str(objects.query)
+        filters = tuple(sorted(filter_expr for filter_expr, column in (('l1__icontains', '"l1" LIKE'),
+                                                                        ('l2__istartswith', '"l2" LIKE'),
+                                                                        ('tax_id__gte', '"tax_id" >='))
+                               if column in sql))
+        self.estimated.append(filters)
+        return self.estimates.get(filters)
+
+    def check(self, filters):
+        request = RequestFactory().get('/chembl/api/data/organism.json', filters)
+        objects = self.resource.apply_filters(request, self.resource.build_filters(filters=filters))
+        self.resource.check_query_cost(request, filters, objects)
+        return request
+
+    def get_list(self, filters):
+        request = RequestFactory().get('/chembl/api/data/organism.json', filters)
+        response = self.resource.wrap_view('dispatch_list')(request, api_name='data', resource_name='organism',
+                                                            format='json')
+        return response.status_code, json.loads(response.content.decode('utf-8'))
+
+    # ------------------------------------------------------------------------------------------------------------------
+    # Tests
+    # ------------------------------------------------------------------------------------------------------------------
+
+    def test_guard_off(self):
+        with override_settings(QUERY_COST_GUARD=False):
+            self.check(FILTERS)
+        self.assertEqual(self.estimated, [])
+
+    def test_under_the_limit(self):
+        self.estimates[('l1__icontains',)] = (800.0, 10)
+        request = self.check({'l1__icontains': 'euk'})
+        self.assertFalse(hasattr(request, 'estimated_count'))
+        # cached by filter set
+        self.check({'l1__icontains': 'euk'})
+        self.assertEqual(self.estimated, [('l1__icontains',)])
+
+    def test_reject(self):
+        with self.assertRaises(BadRequest) as raised:
+            self.check(FILTERS)
+        # one filter estimated on its own, the others count as free
+        self.assertIn("the filter 'l1__icontains'", str(raised.exception))
+        self.assertEqual(self.estimated, [('l1__icontains', 'l2__istartswith', 'tax_id__gte'), ('l1__icontains',)])
+
+    def test_reject_reuses_cached_estimates(self):
+        for _ in range(3):
+            with self.assertRaises(BadRequest) as raised:
+                self.check(FILTERS)
+        # a filter more is estimated by each rejection, up to the costliest one
+        self.assertIn("the filter 'tax_id__gte'", str(raised.exception))
+        self.assertEqual(self.estimated[1:], [('l1__icontains',), ('l2__istartswith',), ('tax_id__gte',)])
+        with override_settings(QUERY_COST_FILTER_EXPLAINS=0):
+            with self.assertRaises(BadRequest) as raised:
+                self.check(FILTERS)
+        self.assertIn("the filter 'tax_id__gte'", str(raised.exception))
+        self.assertEqual(len(self.estimated), 4)
+
+    def test_single_filter_is_not_estimated_again(self):
+        with self.assertRaises(BadRequest) as raised:
+            self.check({'tax_id__gte': '9000'})
+        self.assertIn("the filter 'tax_id__gte'", str(raised.exception))
+        self.assertEqual(self.estimated, [('tax_id__gte',)])
+
+    def test_estimate_count(self):
+        with resource_overrides(self.resource, query_cost_action='estimate_count', cache=self.cache):
+            request = self.check(FILTERS)
+        self.assertEqual(request.estimated_count, 1200)
+
+    def test_no_estimate_is_cached(self):
+        self.estimates = {}
+        for _ in range(2):
+            self.check(FILTERS)
+        self.assertEqual(self.estimated, [('l1__icontains', 'l2__istartswith', 'tax_id__gte')])
+        self.assertIn((), self.cache.data.values())
+        self.assertIsNone(self.resource.cached_query_estimate(FILTERS, None))
+
+    def test_total_count_estimated(self):
+        with resource_overrides(self.resource, query_cost_action='estimate_count', cache=self.cache):
+            for _ in range(2):
+                status, data = self.get_list(FILTERS)
+                self.assertEqual(status, 200)
+                self.assertEqual(len(data['organisms']), 1)
+                self.assertEqual(data['page_meta']['total_count'], 1200)
+                self.assertTrue(data['page_meta']['total_count_estimated'])
+        # the second list is read from the cache
+        self.assertEqual(len(self.estimated), 1)
+
+    def test_total_count_counted(self):
+        self.estimates[('l1__icontains',)] = (800.0, 10)
+        status, data = self.get_list({'l1__icontains': 'euk'})
+        self.assertEqual(status, 200)
+        self.assertEqual(data['page_meta']['total_count'], 1)
+        self.assertNotIn('total_count_estimated', data['page_meta'])
+
+    def test_rejected_list(self):
+        status, data = self.get_list(FILTERS)
+        self.assertEqual(status, 400)
+        self.assertIn('too expensive', json.dumps(data))
+
+# ----------------------------------------------------------------------------------------------------------------------
+
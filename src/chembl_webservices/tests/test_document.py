@@ -13,6 +13,7 @@ class DocumentTestCase(BaseWebServiceTestCase):
       'doi',
       'title',
     ]
+    list_include = ['abstract']
 
     def test_filtered_lists(self):
         doc_list_req = self.get_current_resource_list({
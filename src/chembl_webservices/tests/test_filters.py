@@ -0,0 +1,111 @@
+__author__ = 'mnowotka'
+
+import os
+import unittest
+from collections import defaultdict
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'chembl_ws_app.settings')
+
+import django
+try:
+    django.setup()
+except (Exception, SystemExit) as e:
+    raise unittest.SkipTest('Django settings could not be loaded: {0}'.format(e))
+
+from django.http import QueryDict
+from tastypie.exceptions import BadRequest
+from chembl_core_model.models import Activities
+from chembl_core_model.models import MoleculeDictionary
+from chembl_webservices.core.filters import FilterPlan
+from chembl_webservices.core.filters import filter_to_many
+from chembl_webservices.core.filters import to_many_prefix
+
+
+class FilterToManyTestCase(unittest.TestCase):
+    """
+    Runs ``filter_to_many`` against the configured database: filters crossing a to-many relation must return every
+    parent once, without a DISTINCT.
+    """
+
+    # ------------------------------------------------------------------------------------------------------------------
+    # Helper functions
+    # ------------------------------------------------------------------------------------------------------------------
+
+    def molecule_with_activities(self):
+        """
+        A molecule with several activities among the first ones of the database and their ids.
+        """
+        activities = defaultdict(list)
+        for molregno, activity_id in Activities.objects.filter(molecule__isnull=False)\
+                .values_list('molecule_id', 'activity_id')[:1000]:
+            activities[molregno].append(activity_id)
+        several = [(molregno, ids) for molregno, ids in activities.items() if len(ids) > 1]
+        if not several:
+            self.skipTest('No molecule with several activities in the configured database.')
+        return several[0]
+
+    # ------------------------------------------------------------------------------------------------------------------
+    # Tests
+    # ------------------------------------------------------------------------------------------------------------------
+
+    def test_to_many_prefix(self):
+        self.assertEqual(to_many_prefix(MoleculeDictionary, 'activities__activity_id__in'), 'activities')
+        self.assertEqual(to_many_prefix(MoleculeDictionary, 'moleculehierarchy__parent_molecule__chembl_id'), None)
+        self.assertEqual(to_many_prefix(MoleculeDictionary, 'chembl_id'), None)
+
+    def test_distinct_parents(self):
+        molregno, activity_ids = self.molecule_with_activities()
+        conditions = {'activities__activity_id__in': activity_ids}
+        # a join returns the molecule once per matching activity
+        joined = MoleculeDictionary.objects.filter(pk=molregno, **conditions)
+        self.assertEqual(joined.count(), len(activity_ids))
+
+        filtered = filter_to_many(MoleculeDictionary.objects.filter(pk=molregno), conditions)
+        self.assertFalse(filtered.query.distinct)
+        self.assertEqual(list(filtered.values_list('pk', flat=True)), [molregno])
+        self.assertEqual(filtered.count(), 1)
+
+    def test_conditions_match_the_same_related_row(self):
+        molregno, activity_ids = self.molecule_with_activities()
+        first, second = activity_ids[:2]
+        # the semantics of a single filter() call: one activity must match both conditions
+        conditions = {'activities__activity_id': first, 'activities__activity_id__in': [second]}
+        filtered = filter_to_many(MoleculeDictionary.objects.filter(pk=molregno), conditions)
+        self.assertEqual(filtered.count(), 0)
+        conditions = {'activities__activity_id': first, 'activities__activity_id__in': [first, second]}
+        filtered = filter_to_many(MoleculeDictionary.objects.filter(pk=molregno), conditions)
+        self.assertEqual(filtered.count(), 1)
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+
+class FilterPlanTestCase(unittest.TestCase):
+    """
+    Converts request values with the converter compiled into a ``FilterPlan``.
+    """
+
+    def test_scalar_values(self):
+        plan = FilterPlan('max_phase', 'exact', ['max_phase'])
+        self.assertEqual(plan.qs_filter, 'max_phase__exact')
+        self.assertIs(plan.to_python('true', {}, 'max_phase'), True)
+        self.assertIs(plan.to_python('False', {}, 'max_phase'), False)
+        self.assertIsNone(plan.to_python('none', {}, 'max_phase'))
+        self.assertEqual(plan.to_python('4', {}, 'max_phase'), '4')
+
+    def test_in_values(self):
+        plan = FilterPlan('molecule_synonyms', 'in', ['molecule_synonyms_set', 'synonyms'])
+        self.assertEqual(plan.qs_filter, 'molecule_synonyms__synonyms__in')
+        self.assertEqual(plan.to_python('a,b', {}, 'x__in'), ['a', 'b'])
+        self.assertEqual(plan.to_python(['a,b'], {}, 'x__in'), ['a', 'b'])
+        filters = QueryDict('x__in=a,b&x__in=c')
+        self.assertEqual(plan.to_python(filters['x__in'], filters, 'x__in'), ['a', 'b', 'c'])
+
+    def test_range_values(self):
+        plan = FilterPlan('max_phase', 'range', ['max_phase'])
+        self.assertEqual(plan.to_python('1,3', {}, 'max_phase__range'), ['1', '3'])
+        for value in ('1', '1,2,3', 'a,b'):
+            with self.subTest(value=value):
+                with self.assertRaises(BadRequest):
+                    plan.to_python(value, {}, 'max_phase__range')
+
+# ----------------------------------------------------------------------------------------------------------------------
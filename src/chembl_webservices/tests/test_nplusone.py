@@ -0,0 +1,151 @@
+__author__ = 'mnowotka'
+
+import os
+import unittest
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'chembl_ws_app.settings')
+
+import django
+try:
+    django.setup()
+except (Exception, SystemExit) as e:
+    raise unittest.SkipTest('Django settings could not be loaded: {0}'.format(e))
+
+from django.db import connections
+from django.db.models.constants import LOOKUP_SEP
+from chembl_core_model.models import Activities
+from chembl_core_model.models import Assays
+from chembl_core_model.models import BioassayOntology
+from chembl_webservices.core.nplusone import detect_lazy_loads
+from chembl_webservices.core.nplusone import LazyLoadError
+from chembl_webservices.core.utils import parse_only
+from chembl_webservices.resources.activities import ActivityResource
+
+# an in-memory SQLite database registered next to the configured ones, the lazy loads of the tests are run on it
+LAZY_ALIAS = 'nplusone_test'
+
+
+class DetectLazyLoadsTestCase(unittest.TestCase):
+    """
+    Dehydrates a list of activities whose assays were loaded without their BAO format, each activity then loads it
+    with a query of its own, which ``detect_lazy_loads`` reports.
+    """
+
+    def setUp(self):
+        connections.databases[LAZY_ALIAS] = {'ENGINE': 'django.db.backends.sqlite3', 'NAME': ':memory:'}
+        self.addCleanup(self.drop_alias)
+        with connections[LAZY_ALIAS].schema_editor() as schema_editor:
+            schema_editor.create_model(BioassayOntology)
+        BioassayOntology.objects.using(LAZY_ALIAS).create(bao_id='BAO_0000357', label='single protein format')
+        self.resource = ActivityResource()
+
+    # ------------------------------------------------------------------------------------------------------------------
+    # Helper functions
+    # ------------------------------------------------------------------------------------------------------------------
+
+    @staticmethod
+    def drop_alias():
+        connections[LAZY_ALIAS].close()
+        del connections.databases[LAZY_ALIAS]
+        delattr(connections._connections, LAZY_ALIAS)
+
+    @staticmethod
+    def activities(count):
+        activities = []
+        for idx in range(count):
+            # bao_format is not loaded with the assay, reading it is a lazy load
+            assay = Assays(assay_id=idx, bao_format_id='BAO_0000357')
+            assay._state.db = LAZY_ALIAS
+            activity = Activities(activity_id=idx)
+            activity._state.db = LAZY_ALIAS
+            activity.assay = assay
+            activities.append(activity)
+        return activities
+
+    def dehydrate(self, activities, mode):
+        field = self.resource.fields['bao_label']
+        with detect_lazy_loads('activity', mode=mode):
+            return [field.dehydrate(self.resource.build_bundle(obj=activity)) for activity in activities]
+
+    # ------------------------------------------------------------------------------------------------------------------
+    # Tests
+    # ------------------------------------------------------------------------------------------------------------------
+
+    def test_raise_mode(self):
+        with self.assertRaises(LazyLoadError) as raised:
+            self.dehydrate(self.activities(3), 'raise')
+        self.assertIn('3 lazy load(s) while serialising activity list', str(raised.exception))
+        self.assertIn('bioassay_ontology', str(raised.exception))
+
+    def test_log_mode(self):
+        with self.assertLogs('chembl_webservices.core.nplusone', 'WARNING') as logged:
+            labels = self.dehydrate(self.activities(2), 'log')
+        self.assertEqual(labels, ['single protein format'] * 2)
+        self.assertEqual(len(logged.records), 1)
+        self.assertEqual(len(logged.records[0].queries), 2)
+
+    def test_loaded_relations_pass(self):
+        activities = self.activities(2)
+        for activity in activities:
+            activity.assay.bao_format = BioassayOntology(bao_id='BAO_0000357', label='single protein format')
+        self.assertEqual(self.dehydrate(activities, 'raise'), ['single protein format'] * 2)
+
+    def test_disabled(self):
+        with self.assertRaises(AssertionError):
+            with self.assertLogs('chembl_webservices.core.nplusone', 'WARNING'):
+                self.dehydrate(self.activities(1), 'off')
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+
+class DerivedPrefetchPathsTestCase(unittest.TestCase):
+    """
+    The relations read by the ``ActivityResource`` fields must be loaded with the list, by the declared prefetches or
+    by the paths derived from the field attributes.
+    """
+
+    def setUp(self):
+        self.resource = ActivityResource()
+
+    # ------------------------------------------------------------------------------------------------------------------
+    # Helper functions
+    # ------------------------------------------------------------------------------------------------------------------
+
+    def loaded_paths(self, only=None):
+        objects = self.resource.prefetch_related(Activities.objects.all(), only=only)
+        paths = set(lookup if isinstance(lookup, str) else lookup.prefetch_through
+                    for lookup in objects._prefetch_related_lookups)
+
+        def walk(tree, prefix):
+            for name, subtree in tree.items():
+                paths.add(prefix + name)
+                walk(subtree, prefix + name + LOOKUP_SEP)
+
+        if isinstance(objects.query.select_related, dict):
+            walk(objects.query.select_related, '')
+        return paths
+
+    # ------------------------------------------------------------------------------------------------------------------
+    # Tests
+    # ------------------------------------------------------------------------------------------------------------------
+
+    def test_plan_covers_fields(self):
+        plan = self.resource.get_relation_plan()
+        self.assertIn('assay__bao_format', plan.select_related)
+        self.assertIn('assay__bao_format__label', plan.columns)
+        self.assertIn('assay__target', plan.select_related)
+        self.assertIn('assay__target__tax_id', plan.columns)
+
+    def test_list_loads_relations(self):
+        paths = self.loaded_paths()
+        self.assertIn('assay__bao_format', paths)
+        self.assertIn('assay__target', paths)
+
+    def test_sparse_list_loads_relations(self):
+        paths = self.loaded_paths(only='bao_label,target_tax_id')
+        self.assertIn('assay__bao_format', paths)
+        self.assertIn('assay__target', paths)
+        plan = self.resource.get_relation_plan(parse_only('bao_label,target_tax_id'))
+        self.assertEqual(plan.select_related, {'assay__bao_format', 'assay__target'})
+
+# ----------------------------------------------------------------------------------------------------------------------
@@ -0,0 +1,131 @@
+__author__ = 'mnowotka'
+
+import os
+import unittest
+from contextlib import ExitStack
+from types import SimpleNamespace
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'chembl_ws_app.settings')
+
+import django
+try:
+    django.setup()
+except (Exception, SystemExit) as e:
+    raise unittest.SkipTest('Django settings could not be loaded: {0}'.format(e))
+
+from django.core.exceptions import ObjectDoesNotExist
+from django.test import RequestFactory
+from chembl_webservices.core.benchmark import resource_overrides
+from chembl_webservices.resources.activities import ActivityResource
+
+
+class FakeCache(object):
+    """
+    Stands for the ``SimpleCache`` of a resource, ``cache`` exposes the ``get_many`` of the Django cache backend.
+    """
+
+    def __init__(self, data=None):
+        self.data = dict(data or {})
+        self.cache = self
+        self.sets = []
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def get_many(self, keys):
+        return dict((key, self.data[key]) for key in keys if key in self.data)
+
+    def set(self, key, value):
+        self.sets.append(key)
+        self.data[key] = value
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+
+class CachedObjGetManyTestCase(unittest.TestCase):
+    """
+    Resolves activity ids with ``cached_obj_get_many``, the database is replaced by a stubbed ``obj_get_many`` and
+    ``cached_obj_get`` serving the ``activities`` below, the cache by a ``FakeCache``.
+    """
+
+    def setUp(self):
+        self.resource = ActivityResource()
+        self.cache = FakeCache()
+        stack = ExitStack()
+        stack.enter_context(resource_overrides(self.resource, cache=self.cache))
+        self.addCleanup(stack.close)
+        self.activities = [SimpleNamespace(activity_id=activity_id) for activity_id in (1, 2, 3, 3)]
+        self.batched = []
+        self.single = []
+        self.resource.obj_get_many = self.obj_get_many
+        self.resource.cached_obj_get = self.cached_obj_get
+        self.bundle = self.resource.build_bundle(request=RequestFactory().get('/chembl/api/data/activity/set/1'))
+
+    # ------------------------------------------------------------------------------------------------------------------
+    # Helper functions
+    # ------------------------------------------------------------------------------------------------------------------
+
+    def obj_get_many(self, bundle, lookup, values):
+        self.batched.append((lookup, sorted(values)))
+        return [activity for activity in self.activities if activity.activity_id in values]
+
+    def cached_obj_get(self, bundle, **kwargs):
+        self.single.append(kwargs)
+        raise ObjectDoesNotExist()
+
+    def cache_key(self, identifier):
+        return self.resource.generate_cache_key('detail', pk=identifier)
+
+    def get_many(self, identifiers, store=True):
+        return self.resource.cached_obj_get_many(self.bundle, 'pk', identifiers, store=store)
+
+    # ------------------------------------------------------------------------------------------------------------------
+    # Tests
+    # ------------------------------------------------------------------------------------------------------------------
+
+    def test_input_order(self):
+        found = self.get_many(['2', '1'])
+        self.assertEqual(list(found.keys()), ['2', '1'])
+        self.assertEqual([obj.activity_id for obj in found.values()], [2, 1])
+        self.assertEqual(self.batched, [('activity_id', [1, 2])])
+        self.assertEqual(self.single, [])
+
+    def test_duplicate_identifiers(self):
+        found = self.get_many(['1', '2', '1'])
+        self.assertEqual(list(found.keys()), ['1', '2'])
+        self.assertEqual(self.batched, [('activity_id', [1, 2])])
+
+    def test_not_found(self):
+        found = self.get_many(['1', '42'])
+        self.assertEqual(list(found.keys()), ['1'])
+        self.assertEqual(self.single, [])
+        objects, not_found = self.resource.dehydrate_multiple(self.bundle.request, {}, ['42', '7'])
+        self.assertEqual((objects, not_found), ([], ['42', '7']))
+
+    def test_cache_hits(self):
+        cached = SimpleNamespace(activity_id=2)
+        self.cache.data[self.cache_key('2')] = cached
+        found = self.get_many(['1', '2'])
+        self.assertIs(found['2'], cached)
+        self.assertEqual(self.batched, [('activity_id', [1])])
+        self.assertEqual(self.cache.sets, [self.cache_key('1')])
+
+    def test_to_python_fallback(self):
+        found = self.get_many(['1', 'CHEMBL1'])
+        self.assertEqual(list(found.keys()), ['1'])
+        self.assertEqual(self.batched, [('activity_id', [1])])
+        self.assertEqual(self.single, [{'pk': 'CHEMBL1'}])
+
+    def test_multiple_matches_fallback(self):
+        found = self.get_many(['3', '1'])
+        self.assertEqual(list(found.keys()), ['1'])
+        self.assertEqual(self.single, [{'pk': '3'}])
+        self.assertNotIn(self.cache_key('3'), self.cache.sets)
+
+    def test_store(self):
+        self.get_many(['1', '2'], store=False)
+        self.assertEqual(self.cache.sets, [])
+        self.get_many(['1', '2'])
+        self.assertEqual(sorted(self.cache.sets), sorted([self.cache_key('1'), self.cache_key('2')]))
+
+# ----------------------------------------------------------------------------------------------------------------------
@@ -0,0 +1,113 @@
+__author__ = 'mnowotka'
+
+import os
+import unittest
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'chembl_ws_app.settings')
+
+import django
+try:
+    django.setup()
+except (Exception, SystemExit) as e:
+    raise unittest.SkipTest('Django settings could not be loaded: {0}'.format(e))
+
+from django.core.exceptions import ImproperlyConfigured
+try:
+    from chembl_core_db.db.backends.oracleChEmbl.base import CURSOR_DEFAULTS
+    from chembl_core_db.db.backends.oracleChEmbl.base import Database
+    from chembl_core_db.db.backends.oracleChEmbl.base import DatabaseWrapper
+    from chembl_core_db.db.backends.oracleChEmbl.base import FormatStylePlaceholderCursor
+except ImproperlyConfigured as e:
+    raise unittest.SkipTest('The Oracle backend could not be loaded: {0}'.format(e))
+
+
+class FakeCursor(object):
+
+    def __init__(self):
+        self.vars = []
+
+    def var(self, *args):
+        self.vars.append(args)
+        return args
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+
+class OldFakeCursor(object):
+    # no prefetchrows before cx_Oracle 8
+
+    __slots__ = ('numbersAsStrings', 'arraysize', 'outputtypehandler')
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+
+class FakeConnection(object):
+
+    def __init__(self, cursor_class=FakeCursor):
+        self.cursor_class = cursor_class
+
+    def cursor(self):
+        return self.cursor_class()
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+
+class OracleCursorsTestCase(unittest.TestCase):
+    """
+    Checks the cursor tuning of the Oracle backend, with fake cx_Oracle cursors: array and prefetch sizes and the
+    output type handler fetching the LOB columns inline.
+    """
+
+    # ------------------------------------------------------------------------------------------------------------------
+    # Helper functions
+    # ------------------------------------------------------------------------------------------------------------------
+
+    @staticmethod
+    def wrapper(**options):
+        settings_dict = {'NAME': 'chembl', 'USER': 'chembl', 'PASSWORD': 'chembl', 'HOST': '', 'PORT': '',
+                         'OPTIONS': options, 'TIME_ZONE': None, 'CONN_MAX_AGE': 0, 'AUTOCOMMIT': True,
+                         'ATOMIC_REQUESTS': False}
+        return DatabaseWrapper(settings_dict, 'oracle_test')
+
+    # ------------------------------------------------------------------------------------------------------------------
+    # Tests
+    # ------------------------------------------------------------------------------------------------------------------
+
+    def test_cursor_options(self):
+        self.assertEqual(self.wrapper().cursor_options, CURSOR_DEFAULTS)
+        wrapper = self.wrapper(arraysize=500, prefetchrows=501, lob_inline_size=0, threaded=True,
+                               use_returning_into=False)
+        self.assertEqual(wrapper.cursor_options, {'arraysize': 500, 'prefetchrows': 501, 'lob_inline_size': 0})
+        # cx_Oracle.connect does not know them
+        self.assertEqual(wrapper.get_connection_params(), {'threaded': True})
+
+    def test_cursor_sizes(self):
+        cursor = FormatStylePlaceholderCursor(FakeConnection(), arraysize=500, prefetchrows=501)
+        self.assertEqual(cursor.cursor.arraysize, 500)
+        self.assertEqual(cursor.cursor.prefetchrows, 501)
+        self.assertTrue(cursor.cursor.numbersAsStrings)
+
+    def test_prefetchrows_needs_cx_oracle_8(self):
+        cursor = FormatStylePlaceholderCursor(FakeConnection(OldFakeCursor), arraysize=500, prefetchrows=501)
+        self.assertEqual(cursor.cursor.arraysize, 500)
+        self.assertFalse(hasattr(cursor.cursor, 'prefetchrows'))
+
+    def test_lobs_fetched_inline(self):
+        cursor = FormatStylePlaceholderCursor(FakeConnection(), arraysize=50, lob_inline_size=1024)
+        handler = cursor.cursor.outputtypehandler
+        raw_cursor = cursor.cursor
+        self.assertEqual(handler(raw_cursor, 'MOLFILE', Database.CLOB, None, None, None),
+                         (Database.LONG_STRING, 1024, 50))
+        self.assertEqual(handler(raw_cursor, 'ABSTRACT', Database.NCLOB, None, None, None),
+                         (Database.LONG_STRING, 1024, 50))
+        self.assertEqual(handler(raw_cursor, 'IMAGE', Database.BLOB, None, None, None),
+                         (Database.LONG_BINARY, 1024, 50))
+        # the other columns keep the default variables
+        self.assertIsNone(handler(raw_cursor, 'MOLREGNO', Database.NUMBER, 9, 9, 0))
+        self.assertEqual(len(raw_cursor.vars), 3)
+
+    def test_lob_locators_kept(self):
+        cursor = FormatStylePlaceholderCursor(FakeConnection(), lob_inline_size=0)
+        self.assertFalse(hasattr(cursor.cursor, 'outputtypehandler'))
+
+# ----------------------------------------------------------------------------------------------------------------------
@@ -0,0 +1,169 @@
+__author__ = 'mnowotka'
+
+import unittest
+from unittest import mock
+
+from chembl_core_db.db.backends.pool import ConnectionPool
+from chembl_core_db.db.backends.pool import PoolExhausted
+
+
+class FakeConnection(object):
+
+    def __init__(self, number):
+        self.number = number
+        self.closed = False
+        self.usable = True
+
+    def close(self):
+        self.closed = True
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+
+class ConnectionPoolTestCase(unittest.TestCase):
+    """
+    Checks out and releases fake connections, with a fake clock, to test the reuse, bounding and expiry rules of
+    ``ConnectionPool``.
+    """
+
+    def setUp(self):
+        self.now = 1000.0
+        patcher = mock.patch('chembl_core_db.db.backends.pool.time.time', lambda: self.now)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.opened = []
+
+    # ------------------------------------------------------------------------------------------------------------------
+    # Helper functions
+    # ------------------------------------------------------------------------------------------------------------------
+
+    def make_pool(self, **options):
+        options = dict({'SIZE': 2, 'MIN_SIZE': 0, 'MAX_LIFETIME': 100, 'IDLE_TIMEOUT': 50, 'PRE_PING': 10,
+                        'TIMEOUT': 0, 'REPORT_INTERVAL': 0}, **options)
+        return ConnectionPool('default', options)
+
+    def connect(self):
+        connection = FakeConnection(len(self.opened))
+        self.opened.append(connection)
+        return connection
+
+    @staticmethod
+    def ping(connection):
+        return connection.usable
+
+    @staticmethod
+    def close(connection):
+        connection.close()
+
+    def checkout(self, pool):
+        return pool.checkout(self.connect, self.ping, self.close)
+
+    def release(self, pool, connection, reusable=True):
+        pool.release(connection, reusable, self.close)
+
+    # ------------------------------------------------------------------------------------------------------------------
+    # Tests
+    # ------------------------------------------------------------------------------------------------------------------
+
+    def test_released_connection_is_reused(self):
+        pool = self.make_pool()
+        connection, reused = self.checkout(pool)
+        self.assertFalse(reused)
+        self.release(pool, connection)
+        self.now += 1
+        self.assertEqual(self.checkout(pool), (connection, True))
+        stats = pool.stats()
+        self.assertEqual((stats['created'], stats['reused'], stats['in_use'], stats['idle']), (1, 1, 1, 0))
+
+    def test_size_bounds_checkouts(self):
+        pool = self.make_pool()
+        first, _ = self.checkout(pool)
+        self.checkout(pool)
+        with self.assertRaises(PoolExhausted):
+            self.checkout(pool)
+        self.assertEqual(pool.stats()['timeouts'], 1)
+        self.release(pool, first)
+        self.assertEqual(self.checkout(pool), (first, True))
+
+    def test_not_reusable_connection_is_closed(self):
+        pool = self.make_pool()
+        connection, _ = self.checkout(pool)
+        self.release(pool, connection, reusable=False)
+        self.assertTrue(connection.closed)
+        self.assertEqual(pool.stats()['idle'], 0)
+        self.assertIsNot(self.checkout(pool)[0], connection)
+
+    def test_foreign_connection_is_closed(self):
+        pool = self.make_pool()
+        connection = FakeConnection(-1)
+        self.release(pool, connection)
+        self.assertTrue(connection.closed)
+        self.assertEqual(pool.stats()['idle'], 0)
+
+    def test_connection_expires_after_max_lifetime(self):
+        pool = self.make_pool()
+        connection, _ = self.checkout(pool)
+        self.now += 101
+        # released too old
+        self.release(pool, connection)
+        self.assertTrue(connection.closed)
+
+        connection, _ = self.checkout(pool)
+        self.release(pool, connection)
+        self.now += 101
+        # expired while idle
+        new_connection, reused = self.checkout(pool)
+        self.assertTrue(connection.closed)
+        self.assertIsNot(new_connection, connection)
+        self.assertFalse(reused)
+
+    def test_idle_connections_above_min_size_are_reaped(self):
+        pool = self.make_pool(MIN_SIZE=1, MAX_LIFETIME=0)
+        first, _ = self.checkout(pool)
+        second, _ = self.checkout(pool)
+        self.release(pool, first)
+        self.now += 5
+        self.release(pool, second)
+        self.now += 51
+        self.assertEqual(self.checkout(pool), (second, True))
+        # the least recently used connection is closed, the other one is kept for MIN_SIZE
+        self.assertTrue(first.closed)
+        self.assertFalse(second.closed)
+
+    def test_failed_ping_replaces_the_connection(self):
+        pool = self.make_pool()
+        connection, _ = self.checkout(pool)
+        self.release(pool, connection)
+        connection.usable = False
+        # idle for less than PRE_PING, not pinged
+        self.now += 5
+        self.assertEqual(self.checkout(pool), (connection, True))
+        self.release(pool, connection)
+        self.now += 11
+        new_connection, reused = self.checkout(pool)
+        self.assertIsNot(new_connection, connection)
+        self.assertFalse(reused)
+        self.assertTrue(connection.closed)
+        self.assertEqual(pool.stats()['failed_pings'], 1)
+
+    def test_failed_connect_frees_its_slot(self):
+        pool = self.make_pool(SIZE=1)
+
+        def connect():
+            raise IOError('connection refused')
+
+        with self.assertRaises(IOError):
+            pool.checkout(connect, self.ping, self.close)
+        self.assertEqual(pool.stats()['connecting'], 0)
+        self.assertFalse(self.checkout(pool)[1])
+
+    def test_fork_drops_the_connections_of_the_parent(self):
+        pool = self.make_pool()
+        connection, _ = self.checkout(pool)
+        self.release(pool, connection)
+        pool.pid = -1
+        self.assertFalse(self.checkout(pool)[1])
+        # the socket belongs to the parent process
+        self.assertFalse(connection.closed)
+
+# ----------------------------------------------------------------------------------------------------------------------
@@ -0,0 +1,52 @@
+__author__ = 'mnowotka'
+
+import os
+import unittest
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'chembl_ws_app.settings')
+
+import django
+try:
+    django.setup()
+except (Exception, SystemExit) as e:
+    raise unittest.SkipTest('Django settings could not be loaded: {0}'.format(e))
+
+from django.core.exceptions import ImproperlyConfigured
+try:
+    from chembl_core_db.db.backends.postgresChEmbl.prepared import PreparingCursor
+    from chembl_core_db.db.backends.postgresChEmbl.prepared import SET_LOCAL_PREFIX
+    from chembl_core_db.db.backends.postgresChEmbl.prepared import positional_sql
+except (ImportError, ImproperlyConfigured) as e:
+    raise unittest.SkipTest('The PostgreSQL backend could not be loaded: {0}'.format(e))
+
+
+class PreparedStatementsTestCase(unittest.TestCase):
+    """
+    Checks the statements sent by ``PreparingCursor``: the positional form of the queries it prepares and the
+    ``EXECUTE`` calls running them.
+    """
+
+    def test_positional_sql(self):
+        self.assertEqual(positional_sql('SELECT "a"."x" FROM "a" WHERE "a"."y" = %s AND "a"."z" IN (%s, %s)'),
+                         ('SELECT "a"."x" FROM "a" WHERE "a"."y" = $1 AND "a"."z" IN ($2, $3)', 3))
+        self.assertEqual(positional_sql('SELECT 1'), ('SELECT 1', 0))
+
+    def test_positional_sql_keeps_escaped_percents(self):
+        # psycopg2 still interpolates the statement, %% stays escaped
+        self.assertEqual(positional_sql("SELECT x FROM a WHERE b LIKE '%%' || %s || '%%'"),
+                         ("SELECT x FROM a WHERE b LIKE '%%' || $1 || '%%'", 1))
+        self.assertEqual(positional_sql("SELECT x FROM a WHERE b LIKE '%%%s'"),
+                         ("SELECT x FROM a WHERE b LIKE '%%$1'", 1))
+        self.assertEqual(positional_sql('SELECT 100 %% %s'), ('SELECT 100 %% $1', 1))
+
+    def test_execute_sql(self):
+        self.assertEqual(PreparingCursor.execute_sql('chembl_ws_1', 0), 'EXECUTE chembl_ws_1')
+        self.assertEqual(PreparingCursor.execute_sql('chembl_ws_2', 3), 'EXECUTE chembl_ws_2(%s, %s, %s)')
+
+    def test_statement_timeout_prefix(self):
+        prefix, statement = SET_LOCAL_PREFIX.match('SET LOCAL statement_timeout = 1500; SELECT %s\nFROM a').groups()
+        self.assertEqual(prefix, 'SET LOCAL statement_timeout = 1500; ')
+        self.assertEqual(statement, 'SELECT %s\nFROM a')
+        self.assertIsNone(SET_LOCAL_PREFIX.match('SELECT 1'))
+
+# ----------------------------------------------------------------------------------------------------------------------
@@ -0,0 +1,74 @@
+__author__ = 'mnowotka'
+
+import os
+import json
+import tempfile
+import unittest
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'chembl_ws_app.settings')
+
+import django
+try:
+    django.setup()
+except (Exception, SystemExit) as e:
+    raise unittest.SkipTest('Django settings could not be loaded: {0}'.format(e))
+
+from django.test import Client
+from chembl_webservices.api_config import api
+from chembl_webservices.core.benchmark import endpoint_urls
+from chembl_webservices.core.benchmark import get_query_budget
+from chembl_webservices.core.benchmark import measure
+from chembl_webservices.core.benchmark import resource_overrides
+
+# Where the machine readable report of the run is written, in the temporary directory if not set.
+REPORT_PATH = os.environ.get('QUERY_BUDGET_REPORT') or os.path.join(tempfile.gettempdir(), 'query_budget_report.json')
+
+
+class QueryBudgetTestCase(unittest.TestCase):
+    """
+    Runs the list, detail, set and search endpoints of every registered resource in-process against the configured
+    database and checks the number of SQL queries against the ``query_budget`` declared in the resource ``Meta``.
+    """
+
+    results = []
+
+    # ------------------------------------------------------------------------------------------------------------------
+    # TestCase Override
+    # ------------------------------------------------------------------------------------------------------------------
+
+    @classmethod
+    def tearDownClass(cls):
+        super(QueryBudgetTestCase, cls).tearDownClass()
+        with open(REPORT_PATH, 'w') as report_file:
+            json.dump(cls.results, report_file, indent=2)
+        print('Query budget report written to {0}'.format(REPORT_PATH))
+
+    # ------------------------------------------------------------------------------------------------------------------
+    # Tests
+    # ------------------------------------------------------------------------------------------------------------------
+
+    def test_query_budgets(self):
+        client = Client()
+        for resource_name, resource in sorted(api._registry.items()):
+            if not hasattr(resource, 'get_relation_plan'):
+                continue
+            with resource_overrides(resource):
+                for kind, url in sorted(endpoint_urls(resource).items()):
+                    budget = get_query_budget(resource, kind)
+                    with self.subTest(resource=resource_name, kind=kind):
+                        if budget is None:
+                            self.skipTest('{0} has no {1} query budget.'.format(resource_name, kind))
+                        try:
+                            result = measure(url, repeat=1, client=client)
+                        except Exception as e:
+                            self.results.append({'url': url, 'resource': resource_name, 'kind': kind,
+                                                 'budget': budget, 'error': repr(e)})
+                            if kind == 'search':
+                                self.skipTest('{0} could not be measured: {1!r}'.format(url, e))
+                            raise
+                        result.update({'resource': resource_name, 'kind': kind, 'budget': budget})
+                        self.results.append(result)
+                        self.assertEqual(result['status'], 200, '{0} answered {1}.'.format(url, result['status']))
+                        self.assertLessEqual(result['queries'], budget,
+                                             '{0} issued {1} SQL queries, the budget is {2}.'
+                                             .format(url, result['queries'], budget))
@@ -0,0 +1,292 @@
+__author__ = 'mnowotka'
+
+import os
+import json
+import time
+import unittest
+from contextlib import ExitStack
+from decimal import Decimal
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'chembl_ws_app.settings')
+
+import django
+try:
+    django.setup()
+except (Exception, SystemExit) as e:
+    raise unittest.SkipTest('Django settings could not be loaded: {0}'.format(e))
+
+from django.db import connections
+from django.test import override_settings
+from django.test import RequestFactory
+from tastypie.bundle import Bundle
+from tastypie.cache import NoCache
+from chembl_core_model.models import OrganismClass
+from chembl_webservices.core.benchmark import resource_overrides
+from chembl_webservices.core.readtable import build_read_table
+from chembl_webservices.models import ActivityReadTable
+from chembl_webservices.resources.activities import ActivityReadTableResource
+from chembl_webservices.resources.activities import ActivityResource
+
+# an in-memory SQLite database registered next to the configured ones, the read tables of the tests are built in it
+READ_TABLE_ALIAS = 'read_table_test'
+
+
+class FakeCache(NoCache):
+    """
+    A resource cache keeping everything in a dictionary.
+    """
+
+    def __init__(self):
+        super(FakeCache, self).__init__()
+        self.data = {}
+
+    def get(self, key, **kwargs):
+        return self.data.get(key)
+
+    def set(self, key, value, timeout=None):
+        self.data[key] = value
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+
+class FakeSourceResource(object):
+    """
+    Stands for the ``activity`` resource, its objects are the organism classes of the test database and each one
+    dehydrates to an activity with the organism class id.
+    """
+
+    def __init__(self, failing=None):
+        self.failing = failing
+
+    @staticmethod
+    def get_object_list(request):
+        return OrganismClass.objects.all()
+
+    @staticmethod
+    def prefetch_related(objects):
+        return objects
+
+    @staticmethod
+    def build_bundle(obj=None):
+        return Bundle(obj=obj)
+
+    def full_dehydrate(self, bundle, for_list=False):
+        if bundle.obj.pk == self.failing:
+            raise ValueError('could not dehydrate {0}'.format(bundle.obj.pk))
+        bundle.data = activity_data(bundle.obj.pk, bundle.obj.l1)
+        return bundle
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+
+def activity_data(activity_id, standard_type):
+    ligand_efficiency = Bundle(data={'bei': Decimal('10.5'), 'le': Decimal(activity_id) / 10, 'lle': None,
+                                     'sei': Decimal('3.25')})
+    return {
+        'activity_id': activity_id,
+        'assay_chembl_id': 'CHEMBL{0}'.format(activity_id + 100),
+        'standard_type': standard_type,
+        'standard_value': Decimal('12.5'),
+        'potential_duplicate': False,
+        'ligand_efficiency': ligand_efficiency,
+        'activity_properties': [Bundle(data={'type': 'pH', 'value': Decimal('7.4')})],
+    }
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+
+def drop_alias():
+    connections[READ_TABLE_ALIAS].close()
+    del connections.databases[READ_TABLE_ALIAS]
+    if hasattr(connections._connections, READ_TABLE_ALIAS):
+        delattr(connections._connections, READ_TABLE_ALIAS)
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+
+class ReadTableResourceTestCase(unittest.TestCase):
+    """
+    Translates activity list requests to the columns of the activity read table.
+    """
+
+    def setUp(self):
+        self.read_table = ActivityReadTableResource()
+        # set by ChemblModelResource.get_read_table
+        self.read_table._meta.api_name = ActivityResource()._meta.api_name
+
+    # ------------------------------------------------------------------------------------------------------------------
+    # Tests
+    # ------------------------------------------------------------------------------------------------------------------
+
+    def test_column_expression(self):
+        column_expression = self.read_table.column_expression
+        self.assertEqual(column_expression('ligand_efficiency__le__gte'), 'ligand_efficiency_le__gte')
+        self.assertEqual(column_expression('ligand_efficiency__le'), 'ligand_efficiency_le')
+        self.assertEqual(column_expression('-ligand_efficiency__bei'), '-ligand_efficiency_bei')
+        self.assertEqual(column_expression('ligand_efficiency__ki'), 'ligand_efficiency__ki')
+        self.assertEqual(column_expression('standard_type__iexact'), 'standard_type__iexact')
+        self.assertEqual(column_expression('-standard_value'), '-standard_value')
+
+    def test_can_serve(self):
+        can_serve = self.read_table.can_serve
+        self.assertTrue(can_serve({}))
+        self.assertTrue(can_serve({'standard_type': 'IC50', 'pchembl_value__gte': '5', 'order_by': '-standard_value'}))
+        self.assertTrue(can_serve({'ligand_efficiency__le__gte': '0.3', 'order_by': ['ligand_efficiency__le']}))
+        self.assertTrue(can_serve({'only': 'activity_id,ligand_efficiency'}))
+
+    def test_cannot_serve(self):
+        can_serve = self.read_table.can_serve
+        # subfields of nested resources
+        self.assertFalse(can_serve({'only': 'activity_id,ligand_efficiency__le'}))
+        self.assertFalse(can_serve({'activity_properties__type': 'pH'}))
+        self.assertFalse(can_serve({'ligand_efficiency__isnull': 'true'}))
+        # the hidden columns are not fields of the source resource
+        self.assertFalse(can_serve({'order_by': 'ligand_efficiency_le'}))
+        self.assertFalse(can_serve({'order_by': 'ligand_efficiency'}))
+        self.assertFalse(can_serve({'order_by': 'molecule_chembl_id__length'}))
+        # left to the source resource to report
+        self.assertFalse(can_serve({'order_by': 'unknown'}))
+
+    def test_filters(self):
+        # filters on the hidden columns are ignored, like unknown fields by the source resource
+        filters = self.read_table.build_filters(filters={'ligand_efficiency__le__gte': '0.3',
+                                                         'standard_type__iexact': 'IC50',
+                                                         'ligand_efficiency_bei': '5'})
+        self.assertEqual(filters, {'ligand_efficiency_le__gte': '0.3', 'standard_type__iexact': 'IC50'})
+
+    def test_sorting(self):
+        objects = self.read_table.apply_sorting(ActivityReadTable.objects.all(),
+                                                options={'order_by': ['-ligand_efficiency__sei', 'standard_type']})
+        self.assertEqual(objects.query.order_by, ('-ligand_efficiency_sei', 'standard_type'))
+        objects = self.read_table.apply_sorting(ActivityReadTable.objects.all(),
+                                                options={'sort_by': 'ligand_efficiency__le'})
+        self.assertEqual(objects.query.order_by, ('ligand_efficiency_le',))
+
+    def test_read_table_row(self):
+        row = self.read_table.read_table_row(Bundle(data=activity_data(7, 'IC50')))
+        self.assertIsInstance(row, ActivityReadTable)
+        self.assertEqual((row.activity_id, row.assay_chembl_id, row.standard_type), (7, 'CHEMBL107', 'IC50'))
+        self.assertEqual((row.ligand_efficiency_bei, row.ligand_efficiency_le, row.ligand_efficiency_lle),
+                         (Decimal('10.5'), Decimal('0.7'), None))
+        self.assertEqual(json.loads(row.ligand_efficiency), {'bei': '10.5', 'le': '0.7', 'lle': None, 'sei': '3.25'})
+        self.assertEqual(json.loads(row.activity_properties), [{'type': 'pH', 'value': '7.4'}])
+        self.assertIsNone(row.molecule_chembl_id)
+
+    def test_read_table_row_without_nested(self):
+        data = activity_data(7, 'IC50')
+        data['ligand_efficiency'] = None
+        data['activity_properties'] = None
+        row = self.read_table.read_table_row(Bundle(data=data))
+        self.assertIsNone(row.ligand_efficiency)
+        self.assertIsNone(row.ligand_efficiency_le)
+        self.assertIsNone(row.activity_properties)
+
+    def test_cache_prefix(self):
+        key = self.read_table.generate_cache_key('list', standard_type='IC50')
+        self.assertTrue(key.startswith('read_table:'))
+        self.assertEqual(key, 'read_table:' + ActivityResource().generate_cache_key('list', standard_type='IC50'))
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+
+class BuildReadTableTestCase(unittest.TestCase):
+    """
+    Builds the activity read table in an in-memory SQLite database from a ``FakeSourceResource`` and serves the
+    activity lists from it.
+    """
+
+    def setUp(self):
+        connections.databases[READ_TABLE_ALIAS] = {'ENGINE': 'django.db.backends.sqlite3', 'NAME': ':memory:'}
+        self.addCleanup(drop_alias)
+        self.connection = connections[READ_TABLE_ALIAS]
+        with self.connection.schema_editor() as schema_editor:
+            schema_editor.create_model(OrganismClass)
+        for oc_id, l1 in ((1, 'IC50'), (2, 'Ki'), (3, 'IC50'), (4, 'Potency'), (5, 'IC50')):
+            OrganismClass.objects.using(READ_TABLE_ALIAS).create(oc_id=oc_id, tax_id=oc_id, l1=l1)
+        self.read_table = ActivityReadTableResource()
+
+    # ------------------------------------------------------------------------------------------------------------------
+    # Helper functions
+    # ------------------------------------------------------------------------------------------------------------------
+
+    def build(self, source=None, batch_size=2):
+        written = []
+        rows = build_read_table(source or FakeSourceResource(), self.read_table, using=READ_TABLE_ALIAS,
+                                batch_size=batch_size, progress=written.append)
+        return rows, written
+
+    def tables(self):
+        return [table for table in self.connection.introspection.table_names() if table.startswith('ws_activity')]
+
+    def rows(self):
+        return ActivityReadTable.objects.using(READ_TABLE_ALIAS).order_by('pk')
+
+    def get_list(self, resource, params):
+        request = RequestFactory().get('/chembl/api/data/activity.json', params)
+        response = resource.wrap_view('dispatch_list')(request, api_name='data', resource_name='activity',
+                                                       format='json')
+        return response.status_code, json.loads(response.content.decode('utf-8'))
+
+    # ------------------------------------------------------------------------------------------------------------------
+    # Tests
+    # ------------------------------------------------------------------------------------------------------------------
+
+    def test_build(self):
+        rows, written = self.build()
+        self.assertEqual((rows, written), (5, [2, 4, 5]))
+        self.assertEqual(self.tables(), ['ws_activity_read'])
+        self.assertEqual([row.standard_type for row in self.rows()], ['IC50', 'Ki', 'IC50', 'Potency', 'IC50'])
+        self.assertEqual(self.rows()[1].ligand_efficiency_le, Decimal('0.2'))
+        with self.connection.cursor() as cursor:
+            constraints = self.connection.introspection.get_constraints(cursor, 'ws_activity_read')
+        indexed = set(tuple(constraint['columns']) for constraint in constraints.values() if constraint['index'])
+        self.assertIn(('standard_type',), indexed)
+        self.assertIn(('assay_chembl_id',), indexed)
+        # the model the lists are served from is left as it was
+        self.assertEqual(ActivityReadTable._meta.db_table, 'ws_activity_read')
+        self.assertFalse(ActivityReadTable._meta.managed)
+
+    def test_rebuild_swaps_tables(self):
+        self.build()
+        OrganismClass.objects.using(READ_TABLE_ALIAS).filter(oc_id__gt=2).delete()
+        # a build in the same second as the previous one would reuse its index names
+        time.sleep(1)
+        rows, written = self.build(batch_size=10)
+        self.assertEqual((rows, written), (2, [2]))
+        self.assertEqual(self.tables(), ['ws_activity_read'])
+        self.assertEqual([row.activity_id for row in self.rows()], [1, 2])
+
+    def test_failed_build_keeps_live_table(self):
+        self.build()
+        time.sleep(1)
+        with self.assertRaises(ValueError):
+            self.build(FakeSourceResource(failing=3))
+        self.assertEqual(self.tables(), ['ws_activity_read'])
+        self.assertEqual(self.rows().count(), 5)
+
+    @override_settings(READ_TABLES=True)
+    def test_serve_lists(self):
+        self.build()
+        resource = ActivityResource()
+        resource._read_table = self.read_table
+        self.read_table._available = True
+        self.read_table._checked_at = time.time()
+        cache = FakeCache()
+        stack = ExitStack()
+        self.addCleanup(stack.close)
+        stack.enter_context(resource_overrides(self.read_table,
+                                               queryset=ActivityReadTable.objects.using(READ_TABLE_ALIAS).all(),
+                                               cache=cache))
+        status, data = self.get_list(resource, {'standard_type': 'IC50', 'ligand_efficiency__le__gte': '0.2',
+                                                'order_by': '-ligand_efficiency__le'})
+        self.assertEqual(status, 200)
+        activities = data['activities']
+        self.assertEqual([activity['activity_id'] for activity in activities], [5, 3])
+        self.assertEqual(activities[0]['ligand_efficiency']['le'], '0.5')
+        self.assertEqual(activities[0]['activity_properties'], [{'type': 'pH', 'value': '7.4'}])
+        self.assertNotIn('ligand_efficiency_le', activities[0])
+        self.assertEqual(data['page_meta']['total_count'], 2)
+        self.assertTrue(cache.data)
+        self.assertTrue(all(key.startswith('read_table:') for key in cache.data))
+
+# ----------------------------------------------------------------------------------------------------------------------
@@ -0,0 +1,168 @@
+__author__ = 'mnowotka'
+
+import os
+import random
+import unittest
+from collections import Counter
+from unittest import mock
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'chembl_ws_app.settings')
+
+import django
+try:
+    django.setup()
+except (Exception, SystemExit) as e:
+    raise unittest.SkipTest('Django settings could not be loaded: {0}'.format(e))
+
+from django.db import connections
+from django.db import OperationalError
+from django.http import HttpResponse
+from django.test import override_settings
+from chembl_webservices.core.routers import ReadReplicaRouter
+from chembl_webservices.core.routers import ReplicaPool
+from chembl_webservices.core.routers import eject_failed_replica
+from chembl_webservices.core.routers import pin_replica
+from chembl_webservices.core.routers import pinned_replica
+from chembl_webservices.middleware import ReplicaPinningMiddleware
+
+# in-memory SQLite databases registered next to the configured ones, standing for the read replicas
+REPLICAS = {'replica_test_a': 3, 'replica_test_b': 1}
+
+
+class ReplicaPoolTestCase(unittest.TestCase):
+    """
+    Picks, checks and ejects the replicas of ``REPLICAS`` with a fake clock. The pool used by the router and the
+    middleware is replaced by a new one, whose health checker thread is not started.
+    """
+
+    def setUp(self):
+        self.now = 1000.0
+        self.pool = ReplicaPool()
+        patchers = [
+            mock.patch('chembl_webservices.core.routers.time.time', lambda: self.now),
+            mock.patch.object(ReplicaPool, 'start_checker'),
+            mock.patch('chembl_webservices.core.routers.replica_pool', self.pool),
+            mock.patch('chembl_webservices.middleware.replica_pool', self.pool),
+        ]
+        for patcher in patchers:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        replica_settings = override_settings(DATABASE_REPLICAS=REPLICAS, DATABASE_REPLICA_SELECTION='weighted',
+                                             DATABASE_REPLICA_EJECT_SECONDS=30, DATABASE_REPLICA_MAX_LAG=10)
+        replica_settings.enable()
+        self.addCleanup(replica_settings.disable)
+        for alias in REPLICAS:
+            connections.databases[alias] = {'ENGINE': 'django.db.backends.sqlite3', 'NAME': ':memory:'}
+        self.addCleanup(self.drop_aliases)
+        self.addCleanup(pin_replica, None)
+
+    # ------------------------------------------------------------------------------------------------------------------
+    # Helper functions
+    # ------------------------------------------------------------------------------------------------------------------
+
+    @staticmethod
+    def drop_aliases():
+        for alias in REPLICAS:
+            connections[alias].close()
+            del connections.databases[alias]
+            if hasattr(connections._connections, alias):
+                delattr(connections._connections, alias)
+
+    def choices(self, times=4000):
+        random.seed(0)
+        return Counter(self.pool.choose() for _ in range(times))
+
+    # ------------------------------------------------------------------------------------------------------------------
+    # Tests
+    # ------------------------------------------------------------------------------------------------------------------
+
+    def test_weighted(self):
+        counts = self.choices()
+        self.assertEqual(set(counts), set(REPLICAS))
+        self.assertAlmostEqual(counts['replica_test_a'] / float(counts['replica_test_b']), 3, delta=0.5)
+
+    def test_zero_weight(self):
+        with override_settings(DATABASE_REPLICAS={'replica_test_a': 1, 'replica_test_b': 0}):
+            self.assertEqual(self.choices(100), Counter({'replica_test_a': 100}))
+        with override_settings(DATABASE_REPLICAS={}):
+            self.assertEqual(self.pool.choose(), 'default')
+
+    @override_settings(DATABASE_REPLICA_SELECTION='least_connections')
+    def test_least_connections(self):
+        self.assertEqual(self.pool.choose(), 'replica_test_a')
+        for _ in range(3):
+            self.pool.acquire('replica_test_a')
+        # 4 / 3 requests per weight against 1 / 1
+        self.assertEqual(self.pool.choose(), 'replica_test_b')
+        self.pool.acquire('replica_test_b')
+        self.pool.acquire('replica_test_b')
+        self.assertEqual(self.pool.choose(), 'replica_test_a')
+        self.pool.release('replica_test_a')
+        self.pool.release('replica_test_a')
+        self.assertEqual(self.pool.in_flight, {'replica_test_a': 1, 'replica_test_b': 2})
+
+    def test_ejection_expires(self):
+        self.pool.eject('replica_test_a', 'test')
+        self.assertEqual(self.pool.healthy(), ['replica_test_b'])
+        self.assertEqual(self.choices(100), Counter({'replica_test_b': 100}))
+        self.now += 20
+        # already ejected, the ejection is not extended
+        self.pool.eject('replica_test_a', 'test')
+        self.now += 10
+        self.assertEqual(sorted(self.pool.healthy()), sorted(REPLICAS))
+
+    def test_all_ejected(self):
+        for alias in REPLICAS:
+            self.pool.eject(alias, 'test')
+        self.pool.eject('default', 'not a replica')
+        self.assertEqual(self.pool.healthy(), [])
+        self.assertEqual(self.pool.choose(), 'default')
+        self.assertNotIn('default', self.pool.ejected_until)
+
+    def test_lag_checks(self):
+        # SQLite has no replication lag, the connection only has to answer
+        self.assertTrue(self.pool.check('replica_test_a'))
+        with mock.patch.object(ReplicaPool, 'replication_lag', return_value=5.0):
+            self.assertTrue(self.pool.check('replica_test_a'))
+        with mock.patch.object(ReplicaPool, 'replication_lag', return_value=12.5):
+            self.assertFalse(self.pool.check('replica_test_a'))
+        with mock.patch.object(ReplicaPool, 'replication_lag', side_effect=OperationalError('connection refused')):
+            self.assertFalse(self.pool.check('replica_test_b'))
+        self.assertEqual(self.pool.healthy(), [])
+
+    def test_pinning(self):
+        router = ReadReplicaRouter()
+        seen = []
+
+        def get_response(request):
+            seen.append((pinned_replica(), router.db_for_read(None), dict(self.pool.in_flight)))
+            return HttpResponse('ok')
+
+        response = ReplicaPinningMiddleware(get_response)(None)
+        alias = seen[0][0]
+        self.assertIn(alias, REPLICAS)
+        self.assertEqual(seen, [(alias, alias, {alias: 1})])
+        self.assertEqual(router.db_for_write(None), 'default')
+        # still pinned while the content is generated, until the response is closed
+        self.assertEqual(pinned_replica(), alias)
+        response.close()
+        self.assertIsNone(pinned_replica())
+        self.assertEqual(self.pool.in_flight, {alias: 0})
+
+    def test_unpin_on_exception(self):
+        def get_response(request):
+            raise OperationalError('server closed the connection unexpectedly')
+
+        with self.assertRaises(OperationalError):
+            ReplicaPinningMiddleware(get_response)(None)
+        self.assertIsNone(pinned_replica())
+        self.assertEqual(set(self.pool.in_flight.values()), {0})
+
+    def test_eject_failed_replica(self):
+        pin_replica('replica_test_a')
+        eject_failed_replica(ValueError('not a database error'))
+        self.assertEqual(self.pool.ejected_until, {})
+        eject_failed_replica(OperationalError('server closed the connection unexpectedly'))
+        self.assertEqual(list(self.pool.ejected_until), ['replica_test_a'])
+
+# ----------------------------------------------------------------------------------------------------------------------
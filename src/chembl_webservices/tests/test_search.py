@@ -0,0 +1,355 @@
+__author__ = 'mnowotka'
+
+import os
+import pickle
+import unittest
+from array import array
+from collections import OrderedDict
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'chembl_ws_app.settings')
+
+import django
+try:
+    django.setup()
+except (Exception, SystemExit) as e:
+    raise unittest.SkipTest('Django settings could not be loaded: {0}'.format(e))
+
+from django.db import NotSupportedError
+from django.db import connection
+from django.db.utils import ConnectionHandler
+from django.http import HttpRequest
+from chembl_core_model.models import Docs
+from chembl_core_model.models import Journals
+from chembl_core_model.models import MoleculeDictionary
+from chembl_webservices.core.fields import HEAVY_FIELDS_ATTRIBUTE
+from chembl_webservices.core.search import SearchRank
+from chembl_webservices.core.search import SearchRanking
+from chembl_webservices.core.search import SearchResults
+from chembl_webservices.core.search import differences
+from chembl_webservices.core.search import source_data
+from chembl_webservices.core.search import source_paths
+from chembl_webservices.core.search import source_servable
+from chembl_webservices.resources.docs import DocsResource
+
+# A document of the ElasticSearch index of the documents, as fetched for a search.
+DOCUMENT_SOURCE = {
+    'abstract': 'The synthesis and the SAR of a series of thiazoles are described.',
+    'authors': 'Smith J, Jones K',
+    'doc_type': 'PUBLICATION',
+    'document_chembl_id': 'CHEMBL1139451',
+    'doi': '10.1021/jm800877m',
+    'doi_chembl': None,
+    'first_page': '1012',
+    'issue': '3',
+    'journal': 'J. Med. Chem.',
+    'journal_full_title': 'Journal of medicinal chemistry.',
+    'last_page': '1024',
+    'patent_id': None,
+    'pubmed_id': 19125620,
+    'src_id': 1,
+    'title': 'Thiazoles as kinase inhibitors.',
+    'volume': '52',
+    'year': 2009,
+    '_metadata': {'similar_documents': ['CHEMBL1139452']},
+}
+
+
+class PostgresConnection(object):
+    # compiles the expressions with their as_postgresql, no PostgreSQL driver needed
+
+    vendor = 'postgresql'
+
+    def __init__(self, connection):
+        self.connection = connection
+
+    def __getattr__(self, name):
+        return getattr(self.connection, name)
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+
+class FakeIndex(object):
+    """
+    Hits ranked by ElasticSearch, recording the windows asked for.
+    """
+
+    def __init__(self, hits):
+        self.hits = hits
+        self.windows = []
+
+    def fetch(self, offset, size):
+        self.windows.append((offset, size))
+        return OrderedDict((pk, 100.0 - pk) for pk in self.hits[offset:offset + size]), len(self.hits)
+
+    @staticmethod
+    def load(scores):
+        return list(scores.keys())
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+
+class SearchResultsTestCase(unittest.TestCase):
+    """
+    Slices ``SearchResults`` over a fake index and checks the windows of hits it asks ElasticSearch for.
+    """
+
+    # ------------------------------------------------------------------------------------------------------------------
+    # Helper functions
+    # ------------------------------------------------------------------------------------------------------------------
+
+    @staticmethod
+    def results(hits=25, **kwargs):
+        index = FakeIndex(list(range(hits)))
+        return SearchResults(index.fetch, index.load, **kwargs), index
+
+    # ------------------------------------------------------------------------------------------------------------------
+    # Tests
+    # ------------------------------------------------------------------------------------------------------------------
+
+    def test_slice_fetches_its_window(self):
+        results, index = self.results()
+        self.assertEqual(results[5:10], [5, 6, 7, 8, 9])
+        self.assertEqual(index.windows, [(5, 5)])
+
+    def test_count_comes_with_the_window(self):
+        results, index = self.results()
+        results[0:20]
+        self.assertEqual(results.count(), 25)
+        self.assertEqual(len(results), 25)
+        self.assertEqual(index.windows, [(0, 20)])
+
+    def test_count_before_any_slice(self):
+        results, index = self.results()
+        self.assertEqual(results.count(), 25)
+        self.assertEqual(index.windows, [(0, 0)])
+
+    def test_known_total_bounds_the_window(self):
+        results, index = self.results()
+        results[0:20]
+        self.assertEqual(results[20:40], [20, 21, 22, 23, 24])
+        self.assertEqual(index.windows[-1], (20, 5))
+        # past the last hit nothing is asked for
+        self.assertEqual(results[30:40], [])
+        self.assertEqual(len(index.windows), 2)
+
+    def test_max_results(self):
+        results, index = self.results(max_results=10)
+        self.assertEqual(results[8:20], [8, 9])
+        self.assertEqual(index.windows, [(8, 2)])
+        self.assertEqual(results.count(), 10)
+        self.assertEqual(list(results), list(range(10)))
+
+    def test_open_slice(self):
+        results, index = self.results(max_results=15)
+        self.assertEqual(results[12:], [12, 13, 14])
+        self.assertEqual(index.windows, [(12, 3)])
+
+    def test_index(self):
+        results, index = self.results()
+        self.assertEqual(results[3], 3)
+        self.assertEqual(index.windows, [(3, 1)])
+        with self.assertRaises(IndexError):
+            results[30]
+
+    def test_no_hits(self):
+        results, index = self.results(total=0)
+        self.assertEqual(results[0:20], [])
+        self.assertEqual(results.count(), 0)
+        self.assertEqual(index.windows, [])
+
+    def test_unsupported_slices(self):
+        results, index = self.results()
+        with self.assertRaises(ValueError):
+            results[0:10:2]
+        with self.assertRaises(ValueError):
+            results[-5:]
+        self.assertEqual(index.windows, [])
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+
+class SearchRankingTestCase(unittest.TestCase):
+    """
+    Checks the compact ranking cached for a search and the windows sliced from it.
+    """
+
+    def test_integer_primary_keys(self):
+        ranking = SearchRanking.from_scores(OrderedDict([(30, 9.5), (10, 7.25), (20, 1.0)]), hits=4)
+        self.assertEqual(ranking.pks, array('q', [30, 10, 20]))
+        self.assertEqual(ranking.scores, array('f', [9.5, 7.25, 1.0]))
+        self.assertEqual(len(ranking), 3)
+        self.assertEqual(ranking.hits, 4)
+
+    def test_string_primary_keys(self):
+        ranking = SearchRanking.from_scores(OrderedDict([('CHEMBL25', 2.0), (7, 1.0)]))
+        self.assertEqual(ranking.pks, ('CHEMBL25', '7'))
+        self.assertEqual(ranking.hits, 2)
+
+    def test_sort_values(self):
+        # the hits of sorted searches have sort values, not scores
+        ranking = SearchRanking.from_scores(OrderedDict([(1, 'a-:-1'), (2, 'b-:-2')]))
+        self.assertEqual(ranking.scores, ['a-:-1', 'b-:-2'])
+
+    def test_window(self):
+        ranking = SearchRanking.from_scores(OrderedDict((pk, 100.0 - pk) for pk in range(10)))
+        self.assertEqual(ranking.window(3, 3), OrderedDict([(3, 97.0), (4, 96.0), (5, 95.0)]))
+        self.assertEqual(list(ranking.window(8, 5).keys()), [8, 9])
+        self.assertEqual(ranking.window(20, 5), OrderedDict())
+
+    def test_by_pk(self):
+        ranking = SearchRanking.from_scores(OrderedDict([(30, 9.5), (10, 7.25)]))
+        self.assertEqual(ranking.by_pk(), {'30': (30, 9.5), '10': (10, 7.25)})
+
+    def test_cached_form(self):
+        ranking = SearchRanking.from_scores(OrderedDict((pk, float(pk)) for pk in range(1000)), hits=1002)
+        cached = pickle.loads(pickle.dumps(ranking))
+        self.assertEqual((cached.pks, cached.scores, cached.hits), (ranking.pks, ranking.scores, 1002))
+
+    def test_order(self):
+        ranking = SearchRanking.from_scores(OrderedDict((pk, 100.0 - pk) for pk in range(10)))
+        # rows as ordered in SQL by max_phase, then by rank among the rows of equal max_phase
+        rows = [(7, 4), (2, 4), (5, 4), (9, 3), (8, None), (1, None)]
+        self.assertEqual(ranking.order(rows), [2, 5, 7, 9, 1, 8])
+        self.assertEqual(ranking.order(rows, reverse=True), [7, 5, 2, 9, 8, 1])
+        # with no values the rows are in rank order
+        self.assertEqual(ranking.order([(6,), (0,), (3,)]), [0, 3, 6])
+
+    def test_order_string_primary_keys(self):
+        ranking = SearchRanking.from_scores(OrderedDict([('CHEMBL2', 2.0), ('CHEMBL10', 1.0)]))
+        self.assertEqual(ranking.order([('CHEMBL10', 'a'), ('CHEMBL2', 'a')]), ['CHEMBL2', 'CHEMBL10'])
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+
+class SearchRankTestCase(unittest.TestCase):
+    """
+    Compiles the ``SearchRank`` expression ordering the hits of a search in SQL.
+    """
+
+    # ------------------------------------------------------------------------------------------------------------------
+    # Helper functions
+    # ------------------------------------------------------------------------------------------------------------------
+
+    @staticmethod
+    def rank_sql(pks, db_connection):
+        query = MoleculeDictionary.objects.all().query
+        compiler = query.get_compiler(connection=db_connection)
+        return compiler.compile(SearchRank(pks).resolve_expression(query))
+
+    # ------------------------------------------------------------------------------------------------------------------
+    # Tests
+    # ------------------------------------------------------------------------------------------------------------------
+
+    def test_postgres_binds_a_single_array(self):
+        sql, params = self.rank_sql(array('q', range(1000)), PostgresConnection(connection))
+        self.assertTrue(sql.startswith('array_position(%s::text[], ('))
+        self.assertEqual(len(params), 1)
+        self.assertEqual(params[0][:3], ['0', '1', '2'])
+        self.assertEqual(len(params[0]), 1000)
+
+    def test_other_databases_are_not_supported(self):
+        # an in-memory SQLite connection, whatever the configured engine
+        sqlite = ConnectionHandler({'default': {'ENGINE': 'django.db.backends.sqlite3', 'NAME': ':memory:'}})['default']
+        self.addCleanup(sqlite.close)
+        with self.assertRaises(NotSupportedError):
+            self.rank_sql([3, 1, 2], sqlite)
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+
+class TitledDocsResource(DocsResource):
+
+    def dehydrate_title(self, bundle):
+        return bundle.data['title'].upper()
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+
+class DehydratedDocsResource(DocsResource):
+
+    def dehydrate(self, bundle):
+        bundle.data['cited'] = True
+        return bundle
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+
+class SearchSourceTestCase(unittest.TestCase):
+    """
+    Builds the data of a search from the ``_source`` of an ElasticSearch document and compares it with the data
+    dehydrated from the database object of the document.
+    """
+
+    # ------------------------------------------------------------------------------------------------------------------
+    # Helper functions
+    # ------------------------------------------------------------------------------------------------------------------
+
+    @staticmethod
+    def document():
+        journal = Journals(title=DOCUMENT_SOURCE['journal_full_title'])
+        document = Docs(doc_id=1, chembl_id=DOCUMENT_SOURCE['document_chembl_id'], journal_id=journal)
+        for name in ('abstract', 'authors', 'doc_type', 'doi', 'doi_chembl', 'first_page', 'issue', 'journal',
+                     'last_page', 'patent_id', 'pubmed_id', 'src_id', 'title', 'volume', 'year'):
+            setattr(document, name, DOCUMENT_SOURCE[name])
+        document.score = 12.0
+        return document
+
+    @staticmethod
+    def request(included=None):
+        request = HttpRequest()
+        request.format = 'json'
+        if included is not None:
+            setattr(request, HEAVY_FIELDS_ATTRIBUTE, included)
+        return request
+
+    @staticmethod
+    def simple(resource, bundle):
+        data = resource.alter_detail_data_to_serialize(bundle.request, bundle)
+        return resource._meta.serializer.to_simple(data, {})
+
+    def compare(self, included, excluded):
+        resource = DocsResource()
+        request = self.request(included)
+        expected = resource.full_dehydrate(resource.build_bundle(obj=self.document(), request=request),
+                                           for_search=True)
+        data = source_data(resource, DOCUMENT_SOURCE, ('all', 'search'), excluded=excluded)
+        data['score'] = resource.source_score(12.0)
+        actual = resource.build_bundle(data=data, request=request)
+        expected, actual = self.simple(resource, expected), self.simple(resource, actual)
+        self.assertEqual(list(differences(expected, actual)), [])
+        return actual
+
+    # ------------------------------------------------------------------------------------------------------------------
+    # Tests
+    # ------------------------------------------------------------------------------------------------------------------
+
+    def test_source_data_matches_the_database(self):
+        actual = self.compare(None, frozenset())
+        self.assertEqual(actual['abstract'], DOCUMENT_SOURCE['abstract'])
+        self.assertNotIn('_metadata', actual)
+
+    def test_heavy_fields_left_out(self):
+        actual = self.compare(frozenset(), frozenset(['abstract']))
+        self.assertNotIn('abstract', actual)
+        self.compare(frozenset(['abstract']), frozenset())
+
+    def test_source_paths(self):
+        resource = DocsResource()
+        paths = source_paths(resource, ('all', 'search'))
+        self.assertIn('abstract', paths)
+        self.assertIn('score', paths)
+        self.assertNotIn('_metadata', paths)
+        self.assertEqual(source_paths(resource, ('all', 'search'), excluded=frozenset(['abstract'])),
+                         [path for path in paths if path != 'abstract'])
+        self.assertEqual(source_paths(resource, ('all', 'search'), only={'title': None, 'year': None}),
+                         ['title', 'year'])
+
+    def test_source_servable(self):
+        self.assertTrue(source_servable(DocsResource(), ('all', 'search')))
+        self.assertFalse(source_servable(TitledDocsResource(), ('all', 'search')))
+        self.assertFalse(source_servable(DehydratedDocsResource(), ('all', 'search')))
+        resource = DocsResource()
+        resource.fields['title'].use_in = lambda bundle: True
+        self.assertFalse(source_servable(resource, ('all', 'search')))
+
+# ----------------------------------------------------------------------------------------------------------------------
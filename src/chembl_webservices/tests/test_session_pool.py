@@ -0,0 +1,161 @@
+__author__ = 'mnowotka'
+
+import unittest
+from unittest import mock
+
+try:
+    from chembl_core_db.db.backends.oracleChEmbl import sessionpool
+    from chembl_core_db.db.backends.oracleChEmbl.sessionpool import SESSION_TAG
+    from chembl_core_db.db.backends.oracleChEmbl.sessionpool import SessionPool
+    from chembl_core_db.db.backends.oracleChEmbl.sessionpool import get_session_pool
+except ImportError as e:
+    raise unittest.SkipTest('cx_Oracle could not be loaded: {0}'.format(e))
+
+Database = sessionpool.Database
+
+
+class FakeSession(object):
+
+    def __init__(self, tag=None):
+        self.tag = tag
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+
+class FakeSessionPool(object):
+
+    def __init__(self, user, password, dsn, **kwargs):
+        self.kwargs = kwargs
+        self.min = kwargs['min']
+        self.max = kwargs['max']
+        self.opened = self.min
+        self.busy = 0
+        self.sessions = []
+        self.released = []
+        self.dropped = []
+        self.fail = None
+
+    def acquire(self, tag=None):
+        if self.fail is not None:
+            raise self.fail
+        self.busy += 1
+        return self.sessions.pop() if self.sessions else FakeSession()
+
+    def release(self, session):
+        if self.fail is not None:
+            raise self.fail
+        self.busy -= 1
+        self.released.append(session)
+
+    def drop(self, session):
+        self.busy -= 1
+        self.dropped.append(session)
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+
+class OldFakeSessionPool(FakeSessionPool):
+    # no ping_interval before cx_Oracle 8.2
+
+    @property
+    def ping_interval(self):
+        raise AttributeError('ping_interval')
+
+    @ping_interval.setter
+    def ping_interval(self, value):
+        raise AttributeError('ping_interval')
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+
+class SessionPoolTestCase(unittest.TestCase):
+    """
+    Runs ``SessionPool`` over a fake cx_Oracle session pool: the options given to the driver, the reuse of
+    initialised sessions and the release rules.
+    """
+
+    # ------------------------------------------------------------------------------------------------------------------
+    # Helper functions
+    # ------------------------------------------------------------------------------------------------------------------
+
+    @staticmethod
+    def make_pool(options=None, driver_pool=FakeSessionPool):
+        with mock.patch.object(Database, 'SessionPool', driver_pool):
+            return SessionPool('oracle_test', dict({'REPORT_INTERVAL': 0}, **(options or {})), 'chembl', 'chembl',
+                               'dsn', {'encoding': 'UTF-8'})
+
+    # ------------------------------------------------------------------------------------------------------------------
+    # Tests
+    # ------------------------------------------------------------------------------------------------------------------
+
+    def test_driver_options(self):
+        pool = self.make_pool({'MIN': 2, 'MAX': 8, 'WAIT_TIMEOUT': 1.5, 'IDLE_TIMEOUT': 120, 'PING_INTERVAL': 30,
+                               'STMT_CACHE_SIZE': 50})
+        kwargs = pool.pool.kwargs
+        self.assertEqual((kwargs['min'], kwargs['max'], kwargs['increment']), (2, 8, 1))
+        self.assertEqual(kwargs['getmode'], Database.SPOOL_ATTRVAL_TIMEDWAIT)
+        self.assertEqual(kwargs['waitTimeout'], 1500)
+        self.assertTrue(kwargs['threaded'])
+        self.assertEqual(kwargs['encoding'], 'UTF-8')
+        self.assertEqual((pool.pool.timeout, pool.pool.ping_interval, pool.pool.stmtcachesize), (120, 30, 50))
+
+        kwargs = self.make_pool({'WAIT_TIMEOUT': 0}).pool.kwargs
+        self.assertEqual(kwargs['getmode'], Database.SPOOL_ATTRVAL_WAIT)
+        self.assertNotIn('waitTimeout', kwargs)
+
+    def test_missing_driver_attributes_are_skipped(self):
+        pool = self.make_pool(driver_pool=OldFakeSessionPool)
+        self.assertEqual(pool.pool.timeout, 300)
+
+    def test_tagged_sessions_are_reused(self):
+        pool = self.make_pool()
+        session, reused = pool.acquire()
+        self.assertFalse(reused)
+        pool.pool.sessions.append(FakeSession(SESSION_TAG))
+        session, reused = pool.acquire()
+        self.assertTrue(reused)
+        stats = pool.stats()
+        self.assertEqual((stats['acquired'], stats['reused'], stats['busy'], stats['max_busy']), (2, 1, 2, 2))
+
+    def test_release(self):
+        pool = self.make_pool()
+        first, _ = pool.acquire()
+        second, _ = pool.acquire()
+        pool.release(first, True)
+        pool.release(second, False)
+        self.assertEqual(pool.pool.released, [first])
+        self.assertEqual(pool.pool.dropped, [second])
+        stats = pool.stats()
+        self.assertEqual((stats['released'], stats['dropped'], stats['busy']), (1, 1, 0))
+
+    def test_failed_release_counts_as_dropped(self):
+        pool = self.make_pool()
+        session, _ = pool.acquire()
+        pool.pool.fail = Database.DatabaseError('DPI-1010: not connected')
+        pool.release(session, True)
+        self.assertEqual(pool.stats()['dropped'], 1)
+
+    def test_failed_acquire_is_raised(self):
+        pool = self.make_pool()
+        pool.pool.fail = Database.DatabaseError('ORA-24459: timeout waiting for pool to create new connections')
+        with self.assertRaises(Database.DatabaseError):
+            pool.acquire()
+        self.assertEqual(pool.stats()['errors'], 1)
+
+    def test_one_pool_per_process(self):
+        key = ('chembl', 'chembl', 'test-host', '1521')
+        self.addCleanup(sessionpool._session_pools.pop, ('oracle_test', key), None)
+        created = []
+
+        def create():
+            created.append(self.make_pool())
+            return created[-1]
+
+        pool = get_session_pool('oracle_test', key, create)
+        self.assertIs(get_session_pool('oracle_test', key, create), pool)
+        # after a fork the sessions of the parent are not used
+        pool.pid = -1
+        self.assertIsNot(get_session_pool('oracle_test', key, create), pool)
+        self.assertEqual(len(created), 2)
+
+# ----------------------------------------------------------------------------------------------------------------------
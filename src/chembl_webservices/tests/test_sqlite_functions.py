@@ -0,0 +1,122 @@
+__author__ = 'mnowotka'
+
+import os
+import sqlite3
+import tempfile
+import unittest
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'chembl_ws_app.settings')
+
+import django
+try:
+    django.setup()
+except (Exception, SystemExit) as e:
+    raise unittest.SkipTest('Django settings could not be loaded: {0}'.format(e))
+
+from chembl_core_db.db.backends.sqliteChEmbl.base import SQLITE_DEFAULTS
+from chembl_core_db.db.backends.sqliteChEmbl.base import DatabaseWrapper
+from chembl_core_db.db.backends.sqliteChEmbl.base import database_uri
+from chembl_core_db.db.backends.sqliteChEmbl.functions import STRUCTURE_FUNCTIONS
+from chembl_core_db.db.backends.sqliteChEmbl.functions import regexp
+from chembl_core_db.db.backends.sqliteChEmbl.functions import register_functions
+
+
+class SQLiteFunctionsTestCase(unittest.TestCase):
+    """
+    Checks the SQL functions and the connection URI of the SQLite backend serving a ChEMBL release file.
+    """
+
+    # ------------------------------------------------------------------------------------------------------------------
+    # Helper functions
+    # ------------------------------------------------------------------------------------------------------------------
+
+    @staticmethod
+    def functions(connection):
+        return {row[0] for row in connection.execute('SELECT name FROM pragma_function_list')}
+
+    @staticmethod
+    def wrapper(name=':memory:', **options):
+        settings_dict = {'NAME': name, 'SQLITE': options, 'OPTIONS': {}, 'TIME_ZONE': None, 'CONN_MAX_AGE': 0,
+                         'AUTOCOMMIT': True, 'ATOMIC_REQUESTS': False}
+        return DatabaseWrapper(settings_dict, 'sqlite_test')
+
+    # ------------------------------------------------------------------------------------------------------------------
+    # Tests
+    # ------------------------------------------------------------------------------------------------------------------
+
+    def test_regexp(self):
+        self.assertTrue(regexp('^CHEMBL[0-9]+$', 'CHEMBL25'))
+        self.assertFalse(regexp('^CHEMBL[0-9]+$', 'chembl25'))
+        self.assertTrue(regexp('(?i)^chembl', 'CHEMBL25'))
+        self.assertTrue(regexp('^[0-9]+$', 25))
+        self.assertFalse(regexp('a', None))
+        self.assertFalse(regexp(None, 'a'))
+
+    def test_regexp_posix_syntax(self):
+        self.assertTrue(regexp('^[[:upper:]]+[[:digit:]]+$', 'CHEMBL25'))
+        self.assertFalse(regexp('^[[:lower:]]+$', 'CHEMBL'))
+        self.assertTrue(regexp('[[:punct:]]', 'a-b'))
+        self.assertTrue(regexp('[[:space:]]', 'a b'))
+        # word boundaries
+        self.assertTrue(regexp('\\yaspirin\\y', 'aspirin tablets'))
+        self.assertFalse(regexp('\\yaspirin\\y', 'aspirinate'))
+        self.assertTrue(regexp('\\maspirin', 'aspirin'))
+        self.assertFalse(regexp('\\Yaspirin', 'aspirin'))
+
+    def test_regexp_in_sql(self):
+        connection = sqlite3.connect(':memory:')
+        self.addCleanup(connection.close)
+        register_functions(connection)
+        rows = connection.execute("SELECT x FROM (SELECT 'CHEMBL25' AS x UNION SELECT 'CHEMBL1a' UNION SELECT NULL) "
+                                  "WHERE x REGEXP '^CHEMBL[[:digit:]]+$'").fetchall()
+        self.assertEqual(rows, [('CHEMBL25',)])
+
+    def test_structure_functions_need_the_option(self):
+        connection = sqlite3.connect(':memory:')
+        self.addCleanup(connection.close)
+        register_functions(connection)
+        self.assertNotIn('chembl_has_substructure', self.functions(connection))
+        self.assertFalse(self.wrapper().structure_functions)
+        self.assertEqual(self.wrapper(STRUCTURE_SEARCH=True).structure_functions, STRUCTURE_FUNCTIONS)
+        if STRUCTURE_FUNCTIONS:
+            register_functions(connection, structure_search=True)
+            self.assertIn('chembl_has_substructure', self.functions(connection))
+
+    def test_database_uri(self):
+        path = os.path.abspath('chembl.db')
+        self.assertEqual(database_uri('chembl.db', SQLITE_DEFAULTS), 'file:' + path + '?mode=ro&immutable=1')
+        options = dict(SQLITE_DEFAULTS, IMMUTABLE=False)
+        self.assertEqual(database_uri('chembl.db', options), 'file:' + path + '?mode=ro')
+        options = dict(SQLITE_DEFAULTS, READ_ONLY=False)
+        self.assertEqual(database_uri('chembl.db', options), 'file:' + path + '?immutable=1')
+        options = dict(SQLITE_DEFAULTS, READ_ONLY=False, IMMUTABLE=False)
+        self.assertEqual(database_uri('chembl.db', options), 'file:' + path)
+
+    def test_database_uri_quoting(self):
+        self.assertEqual(database_uri('/data/chembl 30/chembl?.db', SQLITE_DEFAULTS),
+                         'file:/data/chembl%2030/chembl%3F.db?mode=ro&immutable=1')
+
+    def test_database_uri_left_as_is(self):
+        self.assertEqual(database_uri(':memory:', SQLITE_DEFAULTS), ':memory:')
+        self.assertEqual(database_uri('file:chembl.db?mode=ro', SQLITE_DEFAULTS), 'file:chembl.db?mode=ro')
+
+    def test_read_only_connection(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        name = os.path.join(directory.name, 'chembl.db')
+        connection = sqlite3.connect(name)
+        with connection:
+            connection.execute('CREATE TABLE chembl (x INTEGER)')
+            connection.execute('INSERT INTO chembl VALUES (25)')
+        connection.close()
+
+        wrapper = self.wrapper(name)
+        connection = wrapper.open_connection(wrapper.get_connection_params())
+        self.addCleanup(connection.close)
+        self.assertEqual(connection.execute('SELECT x FROM chembl').fetchall(), [(25,)])
+        with self.assertRaises(sqlite3.OperationalError):
+            connection.execute('INSERT INTO chembl VALUES (1)')
+        # immutable: no journal or lock file is created next to the database
+        self.assertEqual(os.listdir(directory.name), ['chembl.db'])
+
+# ----------------------------------------------------------------------------------------------------------------------
@@ -0,0 +1,81 @@
+__author__ = 'mnowotka'
+
+import os
+import threading
+import unittest
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'chembl_ws_app.settings')
+
+import django
+try:
+    django.setup()
+except (Exception, SystemExit) as e:
+    raise unittest.SkipTest('Django settings could not be loaded: {0}'.format(e))
+
+from django.test import override_settings
+from chembl_webservices.core.telemetry import FilterTelemetry
+from chembl_webservices.core.telemetry import load_filter_telemetry
+from chembl_webservices.core.telemetry import reset_filter_telemetry
+
+TELEMETRY_CACHES = {
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+    'telemetry': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'test-filter-telemetry'},
+}
+
+
+class FilterTelemetryTestCase(unittest.TestCase):
+    """
+    Records filter shapes into a local memory cache and checks that no timing is lost when threads record and
+    flush concurrently.
+    """
+
+    def setUp(self):
+        caches = override_settings(CACHES=TELEMETRY_CACHES, FILTER_TELEMETRY_CACHE='telemetry')
+        caches.enable()
+        self.addCleanup(caches.disable)
+        reset_filter_telemetry()
+
+    def tearDown(self):
+        reset_filter_telemetry()
+
+    # ------------------------------------------------------------------------------------------------------------------
+    # Helper functions
+    # ------------------------------------------------------------------------------------------------------------------
+
+    @staticmethod
+    def record(telemetry, filters, times):
+        for _ in range(times):
+            telemetry.record('molecule', 'chembl_core_model.MoleculeDictionary', filters, ['-pk'],
+                             {filters[0]: 'x'}, 0.001)
+
+    # ------------------------------------------------------------------------------------------------------------------
+    # Tests
+    # ------------------------------------------------------------------------------------------------------------------
+
+    @override_settings(FILTER_TELEMETRY_FLUSH_INTERVAL=3600)
+    def test_shapes_are_aggregated(self):
+        telemetry = FilterTelemetry()
+        self.record(telemetry, ['pref_name__icontains', 'max_phase'], 2)
+        self.record(telemetry, ['max_phase', 'pref_name__icontains'], 1)
+        self.record(telemetry, ['max_phase'], 1)
+        self.assertEqual(load_filter_telemetry(), [])
+        telemetry.flush()
+        shapes = load_filter_telemetry()
+        self.assertEqual([shape['count'] for shape in shapes], [3, 1])
+        self.assertEqual(shapes[0]['filters'], ['max_phase', 'pref_name__icontains'])
+        self.assertAlmostEqual(shapes[0]['total_ms'], 3.0)
+
+    @override_settings(FILTER_TELEMETRY_FLUSH_INTERVAL=0)
+    def test_concurrent_flushes_lose_nothing(self):
+        telemetry = FilterTelemetry()
+        threads = [threading.Thread(target=self.record, args=(telemetry, ['max_phase'], 200)) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        telemetry.flush()
+        shapes = load_filter_telemetry()
+        self.assertEqual(len(shapes), 1)
+        self.assertEqual(shapes[0]['count'], 8 * 200)
+
+# ----------------------------------------------------------------------------------------------------------------------
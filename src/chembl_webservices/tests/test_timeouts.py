@@ -0,0 +1,210 @@
+__author__ = 'mnowotka'
+
+import os
+import unittest
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'chembl_ws_app.settings')
+
+import django
+try:
+    django.setup()
+except (Exception, SystemExit) as e:
+    raise unittest.SkipTest('Django settings could not be loaded: {0}'.format(e))
+
+from django.db import DatabaseError
+from django.db import OperationalError
+from django.db import connections
+from django.test import override_settings
+from chembl_webservices.core.timeouts import _oracle_timeout
+from chembl_webservices.core.timeouts import _postgres_timeout
+from chembl_webservices.core.timeouts import get_statement_timeout
+from chembl_webservices.core.timeouts import is_statement_timeout
+from chembl_webservices.core.timeouts import statement_timeout
+
+# an in-memory SQLite database registered next to the configured ones, the slow statements of the tests are run on it
+TIMEOUT_ALIAS = 'timeout_test'
+
+# Counts to 10 million, seconds of SQLite virtual machine instructions.
+SLOW_SQLITE_QUERY = 'WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n WHERE i < 10000000) ' \
+                    'SELECT COUNT(*) FROM n'
+
+
+class FakeDatabase(object):
+
+    class Error(Exception):
+        pass
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+
+class FakeCursor(object):
+
+    def __init__(self, executed, name=None):
+        self.executed = executed
+        self.name = name
+
+    def execute(self, sql):
+        self.executed.append(sql)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        pass
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+
+class FakeRawConnection(object):
+
+    def __init__(self):
+        self.executed = []
+        self.callTimeout = 0
+
+    def cursor(self):
+        return FakeCursor(self.executed)
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+
+class FakeWrapper(object):
+
+    Database = FakeDatabase
+
+    def __init__(self):
+        self.connection = FakeRawConnection()
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+
+class FakeResource(object):
+
+    def __init__(self, statement_timeout):
+        self._meta = type('Meta', (object,), {'statement_timeout': statement_timeout})
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+
+class StatementTimeoutTestCase(unittest.TestCase):
+    """
+    Runs the execute wrappers of ``statement_timeout`` against fake connections and checks the SQL they send, and
+    interrupts a slow statement on an in-memory SQLite database.
+    """
+
+    # ------------------------------------------------------------------------------------------------------------------
+    # Helper functions
+    # ------------------------------------------------------------------------------------------------------------------
+
+    @staticmethod
+    def context(cursor_name=None):
+        wrapper = FakeWrapper()
+        return {'connection': wrapper, 'cursor': type('Cursor', (object,), {'cursor': FakeCursor([], cursor_name)})}
+
+    @staticmethod
+    def recording_execute(calls, error=None):
+
+        def execute(sql, params, many, context):
+            calls.append((sql, params, many))
+            if error is not None:
+                raise error
+            return 'result'
+
+        return execute
+
+    @staticmethod
+    def drop_alias():
+        connections[TIMEOUT_ALIAS].close()
+        del connections.databases[TIMEOUT_ALIAS]
+        if hasattr(connections._connections, TIMEOUT_ALIAS):
+            delattr(connections._connections, TIMEOUT_ALIAS)
+
+    # ------------------------------------------------------------------------------------------------------------------
+    # Tests
+    # ------------------------------------------------------------------------------------------------------------------
+
+    def test_postgres_prefixes_the_statement(self):
+        calls = []
+        context = self.context()
+        result = _postgres_timeout(1500)(self.recording_execute(calls), 'SELECT 1 WHERE x = %s', [2], False, context)
+        self.assertEqual(result, 'result')
+        self.assertEqual(calls, [('SET LOCAL statement_timeout = 1500; SELECT 1 WHERE x = %s', [2], False)])
+        self.assertEqual(context['connection'].connection.executed, [])
+
+    def test_postgres_leaves_executemany_alone(self):
+        calls = []
+        _postgres_timeout(1500)(self.recording_execute(calls), 'INSERT %s', [[1], [2]], True, self.context())
+        self.assertEqual(calls, [('INSERT %s', [[1], [2]], True)])
+
+    def test_postgres_server_side_cursor_sets_and_resets_the_timeout(self):
+        calls = []
+        context = self.context(cursor_name='_django_curs_1')
+        _postgres_timeout(1500)(self.recording_execute(calls), 'SELECT 1', None, False, context)
+        self.assertEqual(calls, [('SELECT 1', None, False)])
+        self.assertEqual(context['connection'].connection.executed,
+                         ['SET statement_timeout = 1500', 'SET statement_timeout = DEFAULT'])
+
+        context = self.context(cursor_name='_django_curs_2')
+        with self.assertRaises(DatabaseError):
+            _postgres_timeout(1500)(self.recording_execute([], DatabaseError()), 'SELECT 1', None, False, context)
+        self.assertEqual(context['connection'].connection.executed[-1], 'SET statement_timeout = DEFAULT')
+
+    def test_oracle_sets_and_restores_the_call_timeout(self):
+        context = self.context()
+        raw_connection = context['connection'].connection
+        raw_connection.callTimeout = 100
+        seen = []
+
+        def execute(sql, params, many, context):
+            seen.append(raw_connection.callTimeout)
+
+        _oracle_timeout(1500)(execute, 'SELECT 1 FROM dual', None, False, context)
+        self.assertEqual(seen, [1500])
+        self.assertEqual(raw_connection.callTimeout, 100)
+
+    def test_oracle_without_call_timeout_runs_unlimited(self):
+        calls = []
+        context = self.context()
+        context['connection'].connection = object()
+        _oracle_timeout(1500)(self.recording_execute(calls), 'SELECT 1 FROM dual', None, False, context)
+        self.assertEqual(calls, [('SELECT 1 FROM dual', None, False)])
+
+    def test_get_statement_timeout(self):
+        with override_settings(STATEMENT_TIMEOUTS=True):
+            self.assertEqual(get_statement_timeout(FakeResource(5), 'get_detail'), 5)
+            resource = FakeResource({'list': 10, 'search': 20})
+            self.assertEqual(get_statement_timeout(resource, 'get_list'), 10)
+            self.assertEqual(get_statement_timeout(resource, 'get_search'), 20)
+            self.assertIsNone(get_statement_timeout(resource, 'get_detail'))
+            self.assertIsNone(get_statement_timeout(resource, 'get_schema'))
+        with override_settings(STATEMENT_TIMEOUTS=False):
+            self.assertIsNone(get_statement_timeout(FakeResource(5), 'get_detail'))
+
+    def test_is_statement_timeout(self):
+        cancelled = Exception('canceling statement due to statement timeout')
+        cancelled.pgcode = '57014'
+        error = DatabaseError('canceling statement due to statement timeout')
+        error.__cause__ = cancelled
+        self.assertTrue(is_statement_timeout(error))
+        self.assertTrue(is_statement_timeout(DatabaseError('DPI-1067: call timeout of 1500 ms exceeded')))
+        self.assertTrue(is_statement_timeout(DatabaseError('ORA-01013: user requested cancel of current operation')))
+        self.assertFalse(is_statement_timeout(DatabaseError('relation "x" does not exist')))
+
+    def test_sqlite_statement_is_interrupted(self):
+        connections.databases[TIMEOUT_ALIAS] = {'ENGINE': 'django.db.backends.sqlite3', 'NAME': ':memory:'}
+        self.addCleanup(self.drop_alias)
+        connection = connections[TIMEOUT_ALIAS]
+        with statement_timeout(0.05):
+            with connection.cursor() as cursor:
+                with self.assertRaises(OperationalError) as raised:
+                    cursor.execute(SLOW_SQLITE_QUERY)
+            self.assertTrue(is_statement_timeout(raised.exception))
+            # the deadline is per statement
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT 1')
+                self.assertEqual(cursor.fetchone(), (1,))
+        # and the handler is gone with the block
+        with connection.cursor() as cursor:
+            cursor.execute(SLOW_SQLITE_QUERY.replace('10000000', '300000'))
+            self.assertEqual(cursor.fetchone(), (300000,))
+
+# ----------------------------------------------------------------------------------------------------------------------
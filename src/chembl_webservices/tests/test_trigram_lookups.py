@@ -0,0 +1,120 @@
+__author__ = 'mnowotka'
+
+import os
+import unittest
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'chembl_ws_app.settings')
+
+import django
+try:
+    django.setup()
+except (Exception, SystemExit) as e:
+    raise unittest.SkipTest('Django settings could not be loaded: {0}'.format(e))
+
+from django.db import connection
+from django.db.utils import ConnectionHandler
+from django.db.models.lookups import IContains
+from django.db.models.lookups import IExact
+from chembl_core_db.db.models.lookups import TrigramIContains
+from chembl_core_db.db.models.lookups import TrigramIEndsWith
+from chembl_core_db.db.models.lookups import TrigramIExact
+from chembl_core_db.db.models.lookups import TrigramIStartsWith
+from chembl_core_model.models import MoleculeDictionary
+
+
+class PostgresOperations(object):
+    # PostgreSQL compares iexact values with = UPPER(%s), they are not escaped
+
+    def __init__(self, ops):
+        self.ops = ops
+
+    def prep_for_iexact_query(self, value):
+        return value
+
+    def __getattr__(self, name):
+        return getattr(self.ops, name)
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+
+class PostgresConnection(object):
+    # compiles the lookups with their as_postgresql, no PostgreSQL driver needed
+
+    vendor = 'postgresql'
+
+    def __init__(self, connection):
+        self.connection = connection
+        self.ops = PostgresOperations(connection.ops)
+
+    def __getattr__(self, name):
+        return getattr(self.connection, name)
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+
+class TrigramLookupsTestCase(unittest.TestCase):
+    """
+    Checks the ILIKE lookups of the trigram indexed columns and that the other columns keep Django's lookups.
+    """
+
+    # ------------------------------------------------------------------------------------------------------------------
+    # Helper functions
+    # ------------------------------------------------------------------------------------------------------------------
+
+    @staticmethod
+    def where_sql(queryset, db_connection):
+        query = queryset.query
+        compiler = query.get_compiler(connection=db_connection)
+        return compiler.compile(query.where)
+
+    def postgres_sql(self, **filters):
+        return self.where_sql(MoleculeDictionary.objects.filter(**filters), PostgresConnection(connection))
+
+    # ------------------------------------------------------------------------------------------------------------------
+    # Tests
+    # ------------------------------------------------------------------------------------------------------------------
+
+    def test_registered_on_trigram_columns_only(self):
+        indexed = MoleculeDictionary._meta.get_field('pref_name')
+        self.assertIs(indexed.get_lookup('iexact'), TrigramIExact)
+        self.assertIs(indexed.get_lookup('icontains'), TrigramIContains)
+        self.assertIs(indexed.get_lookup('istartswith'), TrigramIStartsWith)
+        self.assertIs(indexed.get_lookup('iendswith'), TrigramIEndsWith)
+        plain = MoleculeDictionary._meta.get_field('structure_type')
+        self.assertIs(plain.get_lookup('iexact'), IExact)
+        self.assertIs(plain.get_lookup('icontains'), IContains)
+
+    def test_pattern_lookups_use_ilike(self):
+        sql, params = self.postgres_sql(pref_name__icontains='aspirin')
+        self.assertTrue(sql.endswith('ILIKE %s'), sql)
+        self.assertNotIn('UPPER', sql)
+        self.assertEqual(params, ['%aspirin%'])
+        self.assertEqual(self.postgres_sql(pref_name__istartswith='asp')[1], ['asp%'])
+        self.assertEqual(self.postgres_sql(pref_name__iendswith='rin')[1], ['%rin'])
+
+    def test_pattern_lookups_escape_wildcards(self):
+        self.assertEqual(self.postgres_sql(pref_name__icontains='50%_a')[1], ['%50\\%\\_a%'])
+
+    def test_iexact_escapes_wildcards(self):
+        sql, params = self.postgres_sql(pref_name__iexact='50%_a\\b')
+        self.assertTrue(sql.endswith('ILIKE %s'), sql)
+        self.assertEqual(params, ['50\\%\\_a\\\\b'])
+
+    def test_other_backends_unchanged(self):
+        # an in-memory SQLite connection, whatever the configured engine
+        sqlite = ConnectionHandler({'default': {'ENGINE': 'django.db.backends.sqlite3', 'NAME': ':memory:'}})['default']
+        self.addCleanup(sqlite.close)
+        sql, params = self.where_sql(MoleculeDictionary.objects.filter(pref_name__icontains='aspirin'), sqlite)
+        self.assertIn('LIKE', sql)
+        self.assertNotIn('ILIKE', sql)
+        self.assertEqual(params, ['%aspirin%'])
+
+    def test_iexact_matches_the_value_only(self):
+        names = list(MoleculeDictionary.objects.exclude(pref_name__isnull=True)
+                     .values_list('pref_name', flat=True)[:1])
+        if not names:
+            self.skipTest('No named molecule in the configured database.')
+        self.assertTrue(MoleculeDictionary.objects.filter(pref_name__iexact=names[0].lower()).exists())
+        self.assertFalse(MoleculeDictionary.objects.filter(pref_name__iexact='%').exists())
+
+# ----------------------------------------------------------------------------------------------------------------------
@@ -186,7 +186,7 @@ if LOAD_FPSIM2_FILE:
 
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.postgresql',
+        'ENGINE': os.environ.get('SQL_ENGINE', 'django.db.backends.postgresql'),
         'NAME': os.environ.get('SQL_DATABASE'),
         'USER': os.environ.get('SQL_USER'),
         'PASSWORD': os.environ.get('SQL_PASSWORD'),
@@ -195,6 +195,131 @@ DATABASES = {
     }
 }
 
+# Oracle Backend Settings ----------------------------------------------------------------------------------------------
+
+if DATABASES['default']['ENGINE'] == 'chembl_core_db.db.backends.oracleChEmbl':
+    # rows fetched per round trip (and with the execute call), LOB values fetched inline through buffers of this size
+    DATABASES['default']['OPTIONS'] = {
+        'arraysize': int(os.environ.get('ORACLE_ARRAYSIZE', 100)),
+        'prefetchrows': int(os.environ['ORACLE_PREFETCHROWS']) if os.environ.get('ORACLE_PREFETCHROWS') else None,
+        'lob_inline_size': int(os.environ.get('ORACLE_LOB_INLINE_SIZE', 64 * 1024)),
+    }
+    # sessions per process kept by a cx_Oracle session pool, replacing the connection pool below, 0 disables it
+    ORACLE_SESSION_POOL_MAX = int(os.environ.get('ORACLE_SESSION_POOL_MAX', 0))
+    if ORACLE_SESSION_POOL_MAX > 0:
+        DATABASES['default']['SESSION_POOL'] = {
+            'MIN': int(os.environ.get('ORACLE_SESSION_POOL_MIN', 1)),
+            'MAX': ORACLE_SESSION_POOL_MAX,
+            'INCREMENT': int(os.environ.get('ORACLE_SESSION_POOL_INCREMENT', 1)),
+            'STMT_CACHE_SIZE': int(os.environ.get('ORACLE_STMT_CACHE_SIZE', 20)),
+            'PING_INTERVAL': int(os.environ.get('ORACLE_SESSION_POOL_PING_INTERVAL', 60)),
+            'IDLE_TIMEOUT': int(os.environ.get('ORACLE_SESSION_POOL_IDLE_TIMEOUT', 300)),
+            'WAIT_TIMEOUT': float(os.environ.get('ORACLE_SESSION_POOL_WAIT_TIMEOUT', 10)),
+        }
+
+# SQLite Backend Settings ----------------------------------------------------------------------------------------------
+
+if DATABASES['default']['ENGINE'] == 'chembl_core_db.db.backends.sqliteChEmbl':
+    # SQL_DATABASE is the path of the SQLite file of a ChEMBL release, served read only and memory mapped
+    DATABASES['default']['SQLITE'] = {
+        'IMMUTABLE': os.environ.get('SQLITE_IMMUTABLE', 'true').lower() not in ('0', 'false', 'no'),
+        'MMAP_SIZE': int(os.environ.get('SQLITE_MMAP_SIZE', 1 << 30)),
+        'CACHE_SIZE': int(os.environ.get('SQLITE_CACHE_SIZE', -64 * 1024)),
+        # RDKit structure searches scan every molfile of the release, off unless enabled
+        'STRUCTURE_SEARCH': os.environ.get('SQLITE_STRUCTURE_SEARCH', 'false').lower() in ('1', 'true', 'yes'),
+    }
+    # the structure searches read the molfiles of compound_structures, the release has no RDKit cartridge table
+    COMPOUND_MOLS_TABLE = 'compound_structures'
+    CTAB_COLUMN = 'molfile'
+
+# Connection Pool Settings ---------------------------------------------------------------------------------------------
+
+# connections per process and database kept open across requests, off by default, size it to the worker threads
+SQL_POOL_SIZE = int(os.environ.get('SQL_POOL_SIZE', 0))
+
+if SQL_POOL_SIZE > 0 and 'SESSION_POOL' not in DATABASES['default']:
+    # Django hands the connection back at the end of every request (CONN_MAX_AGE = 0), the pool keeps it open
+    DATABASES['default']['POOL'] = {
+        'SIZE': SQL_POOL_SIZE,
+        'MIN_SIZE': int(os.environ.get('SQL_POOL_MIN_SIZE', 1)),
+        'MAX_LIFETIME': float(os.environ.get('SQL_POOL_MAX_LIFETIME', 1800)),
+        'IDLE_TIMEOUT': float(os.environ.get('SQL_POOL_IDLE_TIMEOUT', 300)),
+        'PRE_PING': float(os.environ.get('SQL_POOL_PRE_PING', 30)),
+        'TIMEOUT': float(os.environ.get('SQL_POOL_TIMEOUT', 10)),
+        'REPORT_INTERVAL': float(os.environ.get('SQL_POOL_REPORT_INTERVAL', 300)),
+    }
+else:
+    # plain Django persistent connections, one per thread
+    DATABASES['default']['CONN_MAX_AGE'] = int(os.environ.get('SQL_CONN_MAX_AGE', 0))
+
+# Prepared Statements Settings -----------------------------------------------------------------------------------------
+
+# SELECT statements kept prepared per connection, once run SQL_PREPARED_STATEMENTS_THRESHOLD times, 0 disables them
+SQL_PREPARED_STATEMENTS = int(os.environ.get('SQL_PREPARED_STATEMENTS', 0))
+
+if (SQL_POOL_SIZE > 0 or SQL_PREPARED_STATEMENTS > 0) and \
+        DATABASES['default']['ENGINE'] == 'django.db.backends.postgresql':
+    # the pool and the prepared statements need the ChEMBL PostgreSQL backend
+    DATABASES['default']['ENGINE'] = 'chembl_core_db.db.backends.postgresChEmbl'
+
+if SQL_PREPARED_STATEMENTS > 0 and DATABASES['default']['ENGINE'] == 'chembl_core_db.db.backends.postgresChEmbl':
+    DATABASES['default']['PREPARED_STATEMENTS'] = {
+        'SIZE': SQL_PREPARED_STATEMENTS,
+        'THRESHOLD': int(os.environ.get('SQL_PREPARED_STATEMENTS_THRESHOLD', 3)),
+    }
+
+# Read Replicas Settings -----------------------------------------------------------------------------------------------
+
+# space separated host[:port[:weight]] of the read replicas of the default database, all reads go to default if not set
+SQL_REPLICA_HOSTS = os.environ.get('SQL_REPLICA_HOSTS', '').split()
+
+DATABASE_REPLICAS = {}
+for replica_idx, replica_host in enumerate(SQL_REPLICA_HOSTS):
+    replica_bits = replica_host.split(':')
+    replica_alias = 'replica_{0}'.format(replica_idx)
+    DATABASES[replica_alias] = dict(DATABASES['default'], HOST=replica_bits[0], TEST={'MIRROR': 'default'})
+    if len(replica_bits) > 1 and replica_bits[1]:
+        DATABASES[replica_alias]['PORT'] = replica_bits[1]
+    DATABASE_REPLICAS[replica_alias] = int(replica_bits[2]) if len(replica_bits) > 2 else 1
+
+if DATABASE_REPLICAS:
+    DATABASE_ROUTERS = ['chembl_webservices.core.routers.ReadReplicaRouter']
+
+# 'weighted' or 'least_connections'
+DATABASE_REPLICA_SELECTION = os.environ.get('DATABASE_REPLICA_SELECTION', 'weighted')
+# replicas failing their health check or lagging more than DATABASE_REPLICA_MAX_LAG seconds are ejected for a while
+DATABASE_REPLICA_MAX_LAG = float(os.environ.get('DATABASE_REPLICA_MAX_LAG', 30))
+DATABASE_REPLICA_CHECK_INTERVAL = float(os.environ.get('DATABASE_REPLICA_CHECK_INTERVAL', 10))
+DATABASE_REPLICA_EJECT_SECONDS = float(os.environ.get('DATABASE_REPLICA_EJECT_SECONDS', 30))
+
+# Statement Timeouts Settings ------------------------------------------------------------------------------------------
+
+# SQL statements running longer than the statement_timeout of their resource Meta are cancelled and answered with 503
+STATEMENT_TIMEOUTS = os.environ.get('STATEMENT_TIMEOUTS', 'true').lower() not in ('0', 'false', 'no')
+
+# Query Cost Guard Settings --------------------------------------------------------------------------------------------
+
+# EXPLAIN filtered lists of resources declaring a max_query_cost before running them, off by default
+QUERY_COST_GUARD = os.environ.get('QUERY_COST_GUARD', 'false').lower() in ('1', 'true', 'yes')
+# filters of a rejected list estimated on their own (EXPLAIN) to name the costliest one, cached estimates aside
+QUERY_COST_FILTER_EXPLAINS = int(os.environ.get('QUERY_COST_FILTER_EXPLAINS', 3))
+
+# Read Tables Settings -------------------------------------------------------------------------------------------------
+
+# serve the lists of resources declaring a Meta.read_table from their flattened table (manage.py build_read_table)
+READ_TABLES = os.environ.get('READ_TABLES', 'false').lower() in ('1', 'true', 'yes')
+
+# Filter Telemetry Settings --------------------------------------------------------------------------------------------
+
+# aggregate the time spent per filter shape of the lists in the cache, for manage.py advise_indexes
+FILTER_TELEMETRY = os.environ.get('FILTER_TELEMETRY', 'false').lower() in ('1', 'true', 'yes')
+FILTER_TELEMETRY_FLUSH_INTERVAL = int(os.environ.get('FILTER_TELEMETRY_FLUSH_INTERVAL', 60))
+
+# Heavy Fields Settings ------------------------------------------------------------------------------------------------
+
+# leave the Meta.heavy_fields (molfile, abstract...) out of the lists unless requested with include=
+DEFER_HEAVY_FIELDS = os.environ.get('DEFER_HEAVY_FIELDS', 'true').lower() not in ('0', 'false', 'no')
+
 # Local time zone for this installation. Choices can be found here:
 # http://en.wikipedia.org/wiki/List_of_tz_zones_by_name
 # although not all choices may be available on all operating systems.
@@ -272,6 +397,10 @@ MIDDLEWARE = (
     # 'django.middleware.clickjacking.XFrameOptionsMiddleware',
     )
 
+if DATABASE_REPLICAS:
+    # pins every request to one read replica, see chembl_webservices.core.routers
+    MIDDLEWARE += ('chembl_webservices.middleware.ReplicaPinningMiddleware',)
+
 # Templates Settings ---------------------------------------------------------------------------------------------------
 
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -314,6 +443,10 @@ LOGGING = {
             'handlers': ['console'],
             'level': 'INFO',
         },
+        'chembl_core_db.db.backends.pool': {
+            'handlers': ['console'],
+            'level': 'INFO',
+        },
     },
 }
 
@@ -372,3 +505,19 @@ CACHE_MIDDLEWARE_SECONDS = 3000000
 
 ELASTICSEARCH_INDEXES_PREFIX = os.environ.get('ELASTICSEARCH_INDEXES_PREFIX')
 ELASTICSEARCH_CONNECTION_URL = os.environ.get('ELASTICSEARCH_CONNECTION_URL')
+# hits of a search that can be paged through, not above the index.max_result_window of the indexes
+SEARCH_MAX_RESULTS = int(os.environ.get('SEARCH_MAX_RESULTS', 10000))
+# unfiltered searches of the resources with Meta.es_source_search served from the _source of the documents, no SQL,
+# check the documents against the database with the check_search_source command first
+SEARCH_FROM_SOURCE = os.environ.get('SEARCH_FROM_SOURCE', 'false').lower() in ('1', 'true', 'yes')
+
+# N+1 Detection Settings -----------------------------------------------------------------------------------------------
+
+# 'log' or 'raise' when a relation is lazily loaded while serialising a list, disabled when not set
+N_PLUS_ONE_DETECTION = os.environ.get('N_PLUS_ONE_DETECTION')
+
+# Bulk Lookup Settings -------------------------------------------------------------------------------------------------
+
+# maximum number of identifiers accepted by a bulk request and number of identifiers resolved per query
+BULK_LOOKUP_MAX_IDENTIFIERS = int(os.environ.get('BULK_LOOKUP_MAX_IDENTIFIERS', 50000))
+BULK_LOOKUP_CHUNK_SIZE = int(os.environ.get('BULK_LOOKUP_CHUNK_SIZE', 1000))